@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#   bench_cryptage.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |-----Mesure du débit cryptage/décryptage----|   #
+#   |--------------------------------------------|   #
+# Usage (depuis la racine du dépôt) :
+#   python benchmarks/bench_cryptage.py [taille_en_Mo ...]
+# --Imports-- #
+import sys
+
+from commun import meilleur_temps
+from cryptage_decryptage import caracteres_preserves, cryptage, decryptage
+
+# --Constantes-- #
+LIGNE_TYPE = "OPE*12/01/2022*Pharmacie*Compte Épargne*-37.41*CB*True*Santé\n"
+# À partir de 23 (CLE_CRYPTAGE), l'image de 'é' sort de Latin-1 : ces clés suivent un autre chemin
+CLES = (13, 23, 25)
+
+
+# --Fonctions-- #
+def cryptage_caractere_par_caractere(chaine: str, cle: int) -> str:
+    """Ancienne implémentation (concaténation caractère par caractère), conservée comme référence."""
+    crypte = ''
+    for char in chaine:
+        if char in caracteres_preserves:
+            crypte += char
+        else:
+            crypte += chr((ord(char) + cle) % 1114112)
+    return crypte
+
+
+def decryptage_caractere_par_caractere(chaine: str, cle: int) -> str:
+    """Ancienne implémentation du décryptage, conservée comme référence."""
+    return cryptage_caractere_par_caractere(chaine, -cle)
+
+
+# --Programme principal-- #
+if __name__ == '__main__':
+    tailles_mo = [float(arg) for arg in sys.argv[1:]] or [1, 4, 16]
+
+    print(f"{'Sens':>10} | {'Clé':>3} | {'Taille':>8} | {'avant (Mo/s)':>12} | {'après (Mo/s)':>12} | {'gain':>6}")
+    for taille_mo in tailles_mo:
+        texte = LIGNE_TYPE * int(taille_mo * 1_000_000 / len(LIGNE_TYPE))
+        taille_reelle = len(texte.encode('utf-8')) / 1_000_000
+        for cle in CLES:
+            chiffre = cryptage(texte, cle)
+
+            # Vérification de la compatibilité des sorties avant de mesurer
+            assert chiffre == cryptage_caractere_par_caractere(texte, cle)
+            assert decryptage(chiffre, cle) == texte
+
+            for sens, entree, avant, apres in [
+                ('cryptage', texte, cryptage_caractere_par_caractere, cryptage),
+                ('décryptage', chiffre, decryptage_caractere_par_caractere, decryptage),
+            ]:
+                temps_avant = meilleur_temps(lambda: avant(entree, cle), repetitions=1)
+                temps_apres = meilleur_temps(lambda: apres(entree, cle), repetitions=3)
+                print(f"{sens:>10} | {cle:>3} | {taille_reelle:>6.1f}Mo | {taille_reelle / temps_avant:>12.1f} | "
+                      f"{taille_reelle / temps_apres:>12.1f} | {temps_avant / temps_apres:>5.0f}x")
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#   bench_format_binaire.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |---Chargement : format texte / binaire------|   #
+#   |--------------------------------------------|   #
+# Usage (depuis la racine du dépôt) :
+#   python benchmarks/bench_format_binaire.py [nb_operations] [nb_repetitions]
+# --Imports-- #
+import os
+import sys
+import tempfile
+import time
+
+from commun import CLE, IDENTIFIANT, donnees_utilisateur
+from constantes import FORMAT_BINAIRE, FORMAT_TEXTE
+from import_donnees import import_donnees_utilisateur
+from utils import enregistrement_modif
+
+
+# --Fonctions-- #
+def mesurer_chargement(dossier: str, nb_repetitions: int) -> tuple:
+    """Renvoie (meilleur temps de chargement, données chargées) sur nb_repetitions essais."""
+    meilleur, donnees = float('inf'), None
+    for _ in range(nb_repetitions):
+        debut = time.perf_counter()
+        donnees = import_donnees_utilisateur(IDENTIFIANT, CLE, dossier_users=dossier)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur, donnees
+
+
+# --Programme principal-- #
+if __name__ == '__main__':
+    nb_operations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    nb_repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    lst_cpt, lst_ope, lst_bud = donnees_utilisateur(nb_operations)
+
+    print(f"{nb_operations} opérations, meilleur temps sur {nb_repetitions} chargements")
+    resultats = {}
+    for format_fichier, extension in ((FORMAT_TEXTE, '.txt'), (FORMAT_BINAIRE, '.bin')):
+        with tempfile.TemporaryDirectory() as dossier:
+            debut = time.perf_counter()
+            enregistrement_modif(lst_cpt, lst_ope, lst_bud, IDENTIFIANT, CLE,
+                                 dossier_users=dossier, format_fichier=format_fichier)
+            duree_ecriture = time.perf_counter() - debut
+            taille = os.path.getsize(os.path.join(dossier, IDENTIFIANT + extension))
+            duree, resultats[format_fichier] = mesurer_chargement(dossier, nb_repetitions)
+        print(f"  {format_fichier:8}: chargement {duree * 1000:7.1f} ms, écriture {duree_ecriture * 1000:7.1f} ms, "
+              f"{taille / 1e6:5.1f} Mo")
+
+    # Les deux formats doivent redonner exactement les mêmes données
+    assert resultats[FORMAT_TEXTE][:3] == resultats[FORMAT_BINAIRE][:3]
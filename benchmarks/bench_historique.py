@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#   bench_historique.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |---Ouverture d'un historique volumineux-----|   #
+#   |--------------------------------------------|   #
+# Usage (depuis la racine du dépôt) :
+#   python benchmarks/bench_historique.py [nb_operations]
+# --Imports-- #
+import datetime
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from commun import CLE, IDENTIFIANT, donnees_utilisateur
+from historique import HistoriqueOperations, chemin_historique
+from import_donnees import import_donnees_utilisateur
+from session import SessionUtilisateur
+from utils import enregistrement_modif
+
+
+# --Fonctions-- #
+def chronometrer(fonction) -> tuple:
+    """Exécute fonction() et renvoie (résultat, durée en secondes)."""
+    debut = time.perf_counter()
+    resultat = fonction()
+    return resultat, time.perf_counter() - debut
+
+
+def pic_memoire(fonction) -> float:
+    """Exécute fonction() (à part : tracemalloc la ralentit) et renvoie son pic mémoire en Mo."""
+    tracemalloc.start()
+    resultat = fonction()
+    pic = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    del resultat
+    return pic
+
+
+def session_complete(dossier: str) -> SessionUtilisateur:
+    lst_cpt, lst_ope, lst_bud, etat_journal = import_donnees_utilisateur(IDENTIFIANT, CLE, dossier_users=dossier)
+    return SessionUtilisateur(IDENTIFIANT, CLE, "Client", lst_cpt, lst_ope, lst_bud,
+                              etat_journal=etat_journal, dossier_users=dossier)
+
+
+def session_historique(dossier: str) -> SessionUtilisateur:
+    historique = HistoriqueOperations(os.path.join(dossier, f"{IDENTIFIANT}.txt"), CLE)
+    return SessionUtilisateur(IDENTIFIANT, CLE, "Client", historique.comptes, historique, historique.budgets,
+                              etat_journal=(historique.hash, historique.hash, 0, False), dossier_users=dossier)
+
+
+def consultation(session: SessionUtilisateur) -> int:
+    """Parcours type d'un écran : les opérations d'un compte sur un mois, puis un rapport de budget."""
+    nb = sum(1 for _ in session.index.plage("Compte A", datetime.date(2020, 3, 1), datetime.date(2020, 3, 31)))
+    session.rapport_budget(session.lst_bud[0], datetime.date(2020, 3, 1))
+    return nb
+
+
+# --Programme principal-- #
+if __name__ == '__main__':
+    nb_operations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lst_cpt, lst_ope, lst_bud = donnees_utilisateur(nb_operations, triees=True)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        enregistrement_modif(lst_cpt, lst_ope, lst_bud, IDENTIFIANT, CLE, dossier_users=dossier)
+        del lst_ope
+        print(f"{nb_operations} opérations")
+
+        pic = pic_memoire(lambda: session_complete(dossier))
+        complete, duree = chronometrer(lambda: session_complete(dossier))
+        _, duree_consultation = chronometrer(lambda: consultation(complete))
+        print(f"  chargement complet           : {duree * 1000:8.1f} ms, pic {pic:7.1f} Mo, "
+              f"consultation {duree_consultation * 1000:6.2f} ms")
+        soldes = complete.dict_soldes
+        del complete
+
+        chemin_index = chemin_historique(os.path.join(dossier, f"{IDENTIFIANT}.txt"))
+        pic_construction = pic_memoire(lambda: session_historique(dossier).lst_ope.fermer())
+        os.remove(chemin_index)
+        for libelle in ("historique (construction)", "historique (index à jour)"):
+            pic = pic_construction if not os.path.exists(chemin_index) else pic_memoire(
+                lambda: session_historique(dossier).lst_ope.fermer())
+            paresseuse, duree = chronometrer(lambda: session_historique(dossier))
+            _, duree_consultation = chronometrer(lambda: consultation(paresseuse))
+            print(f"  {libelle:29}: {duree * 1000:8.1f} ms, pic {pic:7.1f} Mo, "
+                  f"consultation {duree_consultation * 1000:6.2f} ms")
+            assert paresseuse.dict_soldes == soldes
+            paresseuse.lst_ope.fermer()
+        print(f"  taille de l'index : {os.path.getsize(chemin_index) / 1e6:.1f} Mo")
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#   bench_modeles.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |--Tuples et listes / Operation et Budget----|   #
+#   |--------------------------------------------|   #
+# Usage (depuis la racine du dépôt) :
+#   python benchmarks/bench_modeles.py [nb_operations]
+# Compare, pour les mêmes valeurs (partagées), la mémoire occupée par les enregistrements eux-mêmes
+# (tuples et listes / objets modeles.Operation et modeles.Budget), puis le temps d'un calcul de soldes
+# selon le mode d'accès aux champs (indice ou nom).
+# --Imports-- #
+import datetime
+import random
+import sys
+
+from commun import BUDGETS, COMPTES, DEBUT_PERIODE, LIBELLES, MODES, NB_JOURS, meilleur_temps, memoire
+from constantes import IDX_OPE_CPT, IDX_OPE_MONTANT
+from modeles import Budget, Operation
+
+
+# --Fonctions-- #
+def champs_operations(nb_operations: int, graine: int = 42) -> list:
+    """Génère les champs (tuples) de nb_operations opérations ; dates et montants sont partagés, comme à l'import."""
+    alea = random.Random(graine)
+    dates = [DEBUT_PERIODE + datetime.timedelta(days=jour) for jour in range(NB_JOURS)]
+    montants = list(range(-30_000, 30_001, 7))
+    return [(alea.choice(dates), alea.choice(LIBELLES), alea.choice(COMPTES), alea.choice(montants),
+             alea.choice(MODES), alea.random() < 0.8, alea.choice(BUDGETS))
+            for _ in range(nb_operations)]
+
+
+def soldes_par_indice(lst_ope) -> dict:
+    soldes = {}
+    for ope in lst_ope:
+        soldes[ope[IDX_OPE_CPT]] = soldes.get(ope[IDX_OPE_CPT], 0) + ope[IDX_OPE_MONTANT]
+    return soldes
+
+
+def soldes_par_nom(lst_ope) -> dict:
+    soldes = {}
+    for ope in lst_ope:
+        soldes[ope.compte] = soldes.get(ope.compte, 0) + ope.montant
+    return soldes
+
+
+# --Programme principal-- #
+if __name__ == '__main__':
+    nb_operations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    champs = champs_operations(nb_operations)
+    # Le générateur de champs_operations ne doit pas être compté : on part d'une copie des champs
+    tuples, taille_tuples = memoire(lambda: [tuple(list(ope)) for ope in champs])
+    objets, taille_objets = memoire(lambda: [Operation(*ope) for ope in champs])
+    assert tuples == objets
+    listes, taille_listes = memoire(lambda: [[nom, 50_000, COMPTES[0]] for nom in BUDGETS * 1000])
+    budgets, taille_budgets = memoire(lambda: [Budget(nom, 50_000, COMPTES[0]) for nom in BUDGETS * 1000])
+
+    print(f"{nb_operations} opérations, {len(listes)} budgets")
+    print(f"  opérations : tuple {taille_tuples / nb_operations:6.1f} / Operation {taille_objets / nb_operations:6.1f}"
+          f" octets par enregistrement")
+    print(f"  budgets    : liste {taille_listes / len(listes):6.1f} / Budget    {taille_budgets / len(budgets):6.1f}"
+          f" octets par enregistrement")
+
+    assert soldes_par_indice(tuples) == soldes_par_nom(objets) == soldes_par_indice(objets)
+    print(f"  soldes : tuple[indice] {meilleur_temps(lambda: soldes_par_indice(tuples)) * 1000:7.1f} ms"
+          f" / Operation.nom {meilleur_temps(lambda: soldes_par_nom(objets)) * 1000:7.1f} ms"
+          f" / Operation[indice] {meilleur_temps(lambda: soldes_par_indice(objets)) * 1000:7.1f} ms")
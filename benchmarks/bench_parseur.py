@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#   bench_parseur.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |--Analyse des lignes : ancienne / parseur---|   #
+#   |--------------------------------------------|   #
+# Usage (depuis la racine du dépôt) :
+#   python benchmarks/bench_parseur.py [nb_operations]
+# Compare l'analyse des lignes en clair d'un fichier utilisateur par l'ancien code d'import_donnees
+# (reproduit ci-dessous) et par parseur.ParseurEnregistrements : temps et mémoire des données obtenues.
+# --Imports-- #
+import datetime
+import sys
+
+from commun import lignes_fichier, meilleur_temps, memoire
+from montants import en_centimes
+from parseur import ParseurEnregistrements
+
+# --Fonctions-- #
+def ancienne_analyse(lignes) -> tuple:
+    """Analyse des lignes telle qu'elle était faite par import_donnees avant parseur.py (référence)."""
+    liste_comptes, liste_ope, liste_bud = [], [], []
+    for ligne in lignes:
+        champs = ligne.strip().split('*')
+        match champs[0]:
+            case 'CPT':
+                if len(champs) >= 2:
+                    liste_comptes.append(champs[1])
+            case 'OPE':
+                if len(champs) == 8:
+                    champs.pop(0)
+                    champs[0] = datetime.date(year=int(champs[0][6:]), month=int(champs[0][3:5]),
+                                              day=int(champs[0][0:2]))
+                    champs[3] = en_centimes(champs[3])
+                    champs[5] = champs[5] == 'True'
+                    liste_ope.append(tuple(champs))
+            case 'BUD':
+                if len(champs) == 4:
+                    champs.pop(0)
+                    champs[1] = en_centimes(champs[1])
+                    liste_bud.append(champs)
+    return liste_comptes, liste_ope, liste_bud
+
+
+# --Programme principal-- #
+if __name__ == '__main__':
+    nb_operations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lignes = lignes_fichier(nb_operations)
+
+    assert ancienne_analyse(lignes) == ParseurEnregistrements().analyser_lignes(lignes)
+
+    temps_ancien = meilleur_temps(lambda: ancienne_analyse(lignes))
+    temps_parseur = meilleur_temps(lambda: ParseurEnregistrements().analyser_lignes(lignes))
+    _, memoire_ancien = memoire(lambda: ancienne_analyse(lignes))
+    _, memoire_parseur = memoire(lambda: ParseurEnregistrements().analyser_lignes(lignes))
+
+    print(f"{nb_operations} opérations")
+    print(f"  ancienne analyse : {temps_ancien * 1000:8.1f} ms  {memoire_ancien / nb_operations:6.1f} octets/opération")
+    print(f"  parseur          : {temps_parseur * 1000:8.1f} ms  {memoire_parseur / nb_operations:6.1f} octets/opération"
+          f"  ({temps_ancien / temps_parseur:.1f}x plus rapide, {memoire_ancien / memoire_parseur:.1f}x moins de mémoire)")
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#   bench_points_reprise.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |---Soldes : points de reprise / rejeu-------|   #
+#   |--------------------------------------------|   #
+# Usage (depuis la racine du dépôt) :
+#   python benchmarks/bench_points_reprise.py [nb_operations] [nb_requetes]
+# --Imports-- #
+import datetime
+import random
+import sys
+import tempfile
+import time
+
+from commun import CLE, COMPTES, IDENTIFIANT, date_aleatoire, donnees_utilisateur
+from comptes import calcul_dict_soldes
+from import_donnees import import_donnees_utilisateur
+from points_reprise import PointsReprise
+from session import SessionUtilisateur
+from utils import enregistrement_modif
+
+
+# --Fonctions-- #
+def solde_par_rejeu(lst_ope: list, compte: str, date: datetime.date) -> int:
+    """Solde d'un compte à une date en rejouant toutes les opérations depuis zéro (méthode de référence)."""
+    return sum(operation.montant for operation in lst_ope if operation.compte == compte and operation.date <= date)
+
+
+# --Programme principal-- #
+if __name__ == '__main__':
+    nb_operations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    nb_requetes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    alea = random.Random(42)
+    lst_cpt, lst_ope, lst_bud = donnees_utilisateur(nb_operations, alea)
+    requetes = [(alea.choice(COMPTES), date_aleatoire(alea)) for _ in range(nb_requetes)]
+
+    with tempfile.TemporaryDirectory() as dossier:
+        enregistrement_modif(lst_cpt, lst_ope, lst_bud, IDENTIFIANT, CLE, dossier_users=dossier)
+        print(f"{nb_operations} opérations, {len(PointsReprise.calculer(lst_ope))} points de reprise")
+
+        lst_cpt, lst_ope, lst_bud, etat_journal = import_donnees_utilisateur(IDENTIFIANT, CLE, dossier_users=dossier)
+        debut_mesure = time.perf_counter()
+        calcul_dict_soldes(lst_cpt, lst_ope)
+        print(f"  soldes par rejeu (calcul_dict_soldes)   : {(time.perf_counter() - debut_mesure) * 1000:8.2f} ms")
+
+        points_reprise = PointsReprise()
+        lst_cpt, lst_ope, lst_bud, etat_journal = import_donnees_utilisateur(IDENTIFIANT, CLE, dossier_users=dossier,
+                                                                             points_reprise=points_reprise)
+        debut_mesure = time.perf_counter()
+        session = SessionUtilisateur(IDENTIFIANT, CLE, "Client", lst_cpt, list(lst_ope), lst_bud,
+                                     etat_journal=etat_journal, points_reprise=points_reprise)
+        duree_session = time.perf_counter() - debut_mesure
+        debut_mesure = time.perf_counter()
+        sans_points = SessionUtilisateur(IDENTIFIANT, CLE, "Client", lst_cpt, list(lst_ope), lst_bud,
+                                         etat_journal=etat_journal)
+        print(f"  ouverture de session, soldes rejoués    : {(time.perf_counter() - debut_mesure) * 1000:8.2f} ms")
+        print(f"  ouverture de session, points de reprise : {duree_session * 1000:8.2f} ms")
+        assert session.dict_soldes == sans_points.dict_soldes
+
+        debut_mesure = time.perf_counter()
+        attendus = [solde_par_rejeu(lst_ope, compte, date) for compte, date in requetes]
+        duree_rejeu = time.perf_counter() - debut_mesure
+        debut_mesure = time.perf_counter()
+        obtenus = [session.solde_au(compte, date) for compte, date in requetes]
+        duree_points = time.perf_counter() - debut_mesure
+        assert obtenus == attendus
+        print(f"  solde à une date, par rejeu             : {duree_rejeu / nb_requetes * 1000:8.3f} ms / requête")
+        print(f"  solde à une date, points de reprise     : {duree_points / nb_requetes * 1000:8.3f} ms / requête")
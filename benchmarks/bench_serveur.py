@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#   bench_serveur.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |----Charge du serveur : sessions/s et p99---|   #
+#   |--------------------------------------------|   #
+# Usage (depuis la racine du dépôt) :
+#   python benchmarks/bench_serveur.py [nb_sessions] [nb_clients_simultanes] [nb_operations_par_utilisateur]
+#
+# Les utilisateurs sont générés dans un dossier temporaire : les fichiers du dépôt ne sont pas modifiés.
+# --Imports-- #
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from commun import donnees_utilisateur
+from constantes import CLE_CRYPTAGE
+from cryptage_decryptage import cryptage
+from index_idents import IndexIdentifiants
+from serveur import ServeurBanque
+from utils import enregistrement_modif
+
+# --Constantes-- #
+NB_UTILISATEURS = 50
+
+
+# --Fonctions-- #
+def generer_utilisateurs(dossier: str, nb_operations: int, graine: int = 42) -> dict:
+    """
+    Crée NB_UTILISATEURS fichiers utilisateurs chiffrés et le fichier ident.txt correspondant,
+    puis renvoie leurs identifiants {id: [mdp, nom, clé]}.
+    """
+    alea = random.Random(graine)
+    idents = {}
+    for numero in range(NB_UTILISATEURS):
+        # Clé > 10 : avec la clé 10, l'espace serait chiffré en '*' (caractère préservé par le chiffrement)
+        identifiant, cle = f"{10_000_000 + numero}", alea.randint(11, 25)
+        idents[identifiant] = [f"{alea.randrange(10 ** 6):06d}", f"Client {numero}", cle]
+        lst_cpt, lst_ope, lst_bud = donnees_utilisateur(nb_operations, alea)
+        enregistrement_modif(lst_cpt, lst_ope, lst_bud, identifiant, cle, dossier_users=dossier)
+    with open(os.path.join(dossier, "ident.txt"), "w", encoding="utf-8") as fichier:
+        fichier.writelines(cryptage(f"{identifiant}*{mdp}*{nom}*{cle:02d}", CLE_CRYPTAGE) + "\n"
+                           for identifiant, (mdp, nom, cle) in idents.items())
+    return idents
+
+
+async def requete(lecteur, ecrivain, **contenu) -> dict:
+    ecrivain.write(json.dumps(contenu).encode('utf-8') + b'\n')
+    await ecrivain.drain()
+    reponse = json.loads(await lecteur.readline())
+    assert reponse['ok'], reponse
+    return reponse
+
+
+async def session_client(port: int, identifiant: str, mdp: str) -> float:
+    """Déroule une session type (connexion, consultation, ajout, déconnexion) et renvoie sa durée."""
+    debut = time.perf_counter()
+    lecteur, ecrivain = await asyncio.open_connection('127.0.0.1', port)
+    await requete(lecteur, ecrivain, action='connexion', identifiant=identifiant, mdp=mdp)
+    await requete(lecteur, ecrivain, action='tableau_bord')
+    await requete(lecteur, ecrivain, action='operations', compte="Compte A", debut="01/01/2020", fin="31/01/2020")
+    await requete(lecteur, ecrivain, action='ajouter_operation', date="15/01/2020", libelle="cafe",
+                  compte="Compte A", montant="-3.50", mode="CB", passee=True, budget="sorties")
+    await requete(lecteur, ecrivain, action='rapport_budget', nom="sorties", mois="01/2020")
+    await requete(lecteur, ecrivain, action='deconnexion')
+    ecrivain.close()
+    await ecrivain.wait_closed()
+    return time.perf_counter() - debut
+
+
+async def charge(idents: dict, dossier: str, nb_sessions: int, nb_clients: int) -> None:
+    serveur = ServeurBanque(idents=IndexIdentifiants(os.path.join(dossier, "ident.txt")), dossier_users=dossier)
+    ecoute = await serveur.demarrer(port=0)
+    port = ecoute.sockets[0].getsockname()[1]
+    identifiants = list(idents)
+    durees = []
+    limite = asyncio.Semaphore(nb_clients)
+
+    async def client(numero: int) -> None:
+        identifiant = identifiants[numero % len(identifiants)]
+        async with limite:
+            durees.append(await session_client(port, identifiant, idents[identifiant][0]))
+
+    debut = time.perf_counter()
+    await asyncio.gather(*(client(numero) for numero in range(nb_sessions)))
+    total = time.perf_counter() - debut
+
+    ecoute.close()
+    await ecoute.wait_closed()
+    await serveur.arreter()
+    metriques = serveur.persistance.metriques()
+
+    durees.sort()
+    print(f"{nb_sessions} sessions, {nb_clients} clients simultanés")
+    print(f"  débit   : {nb_sessions / total:8.1f} sessions/s")
+    print(f"  latence : p50 {durees[len(durees) // 2] * 1000:7.1f} ms / "
+          f"p99 {durees[min(len(durees) - 1, int(len(durees) * 0.99))] * 1000:7.1f} ms")
+    print(f"  persistance : file max. {metriques['profondeur_max']} tâches ({metriques['nb_threads']} threads), "
+          f"{metriques['enregistrements_fusionnes']} enregistrements fusionnés")
+    for phase, statistique in metriques['phases'].items():
+        print(f"    {phase:26} {statistique['nombre']:>6} x  moy. {statistique['moyenne_s'] * 1000:7.2f} ms"
+              f"  max. {statistique['max_s'] * 1000:7.2f} ms")
+
+
+# --Programme principal-- #
+if __name__ == '__main__':
+    nb_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    nb_clients = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    nb_operations = int(sys.argv[3]) if len(sys.argv) > 3 else 2_000
+    with tempfile.TemporaryDirectory() as dossier:
+        idents = generer_utilisateurs(dossier, nb_operations)
+        asyncio.run(charge(idents, dossier, nb_sessions, nb_clients))
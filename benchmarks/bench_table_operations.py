@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+#   bench_table_operations.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |--Mémoire : liste / table en colonnes------|   #
+#   |--------------------------------------------|   #
+# Usage (depuis la racine du dépôt) :
+#   python benchmarks/bench_table_operations.py [nb_operations]
+# --Imports-- #
+import sys
+import time
+
+from commun import COMPTES, lignes_operations, memoire
+from comptes import calcul_dict_soldes
+from parseur import ParseurEnregistrements
+from table_operations import TableOperations
+
+
+# --Programme principal-- #
+if __name__ == '__main__':
+    nb_operations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lignes = lignes_operations(nb_operations)
+
+    parseur = ParseurEnregistrements()
+    lst_ope, taille_liste = memoire(lambda: [parseur.operation(ligne.split('*')) for ligne in lignes])
+    table, taille_table = memoire(lambda: TableOperations(lst_ope))
+
+    print(f"{nb_operations} opérations")
+    print(f"  liste d'objets  : {taille_liste / nb_operations:7.1f} octets/opération")
+    print(f"  table colonnes  : {taille_table / nb_operations:7.1f} octets/opération "
+          f"({taille_liste / taille_table:.1f}x moins)")
+
+    debut = time.perf_counter()
+    soldes_liste = calcul_dict_soldes(COMPTES, lst_ope)
+    temps_liste = time.perf_counter() - debut
+    debut = time.perf_counter()
+    soldes_table = table.soldes()
+    temps_table = time.perf_counter() - debut
+    assert all(soldes_liste[c] == soldes_table[c] for c in COMPTES)
+    print(f"  soldes : liste {temps_liste * 1000:.1f} ms / table {temps_table * 1000:.1f} ms")
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#   commun.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |---Données et outils communs aux mesures----|   #
+#   |--------------------------------------------|   #
+# Importé en premier par chaque script de benchmarks/ : ajoute src/ au chemin d'import et en fait
+# le dossier courant (les modules de l'application ouvrent ./ident.txt et users/ en relatif).
+# Les données générées sont les mêmes pour tous les scripts : trois comptes, des opérations tirées
+# au hasard (graine fixe) sur dix ans à partir de 2015, un budget par catégorie.
+# --Imports-- #
+import datetime
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+DOSSIER_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, DOSSIER_SRC)
+os.chdir(DOSSIER_SRC)
+
+from modeles import Budget, Operation  # noqa: E402
+from montants import formater_montant  # noqa: E402
+from utils import formater_ligne_operation  # noqa: E402
+
+# --Constantes-- #
+IDENTIFIANT = "10000000"
+CLE = 17
+COMPTES = ["Compte A", "Compte B", "Compte C"]
+LIBELLES = ["cinema", "restaurant", "courses", "essence", "salaire", "remboursement"]
+BUDGETS = ["sorties", "alimentation", "transport", "santé", "divers"]
+MODES = ['CB', 'CHE', 'VIR']
+DEBUT_PERIODE = datetime.date(2015, 1, 1)
+NB_JOURS = 3650
+REPETITIONS = 5
+
+
+# --Fonctions-- #
+def date_aleatoire(alea: random.Random) -> datetime.date:
+    """Tire une date au hasard dans la période des données générées (dix ans à partir de DEBUT_PERIODE)."""
+    return datetime.date.fromordinal(DEBUT_PERIODE.toordinal() + alea.randrange(NB_JOURS))
+
+
+def donnees_utilisateur(nb_operations: int, alea: random.Random = None, triees: bool = False) -> tuple:
+    """
+    Génère les données aléatoires d'un utilisateur.
+
+    Args:
+        nb_operations (int): Nombre d'opérations.
+        alea (random.Random, optional): Générateur à utiliser (par défaut : random.Random(42)). Le passer
+                                        permet d'en tirer d'autres valeurs ensuite, ou plusieurs utilisateurs.
+        triees (bool): Si True, les opérations sont triées par date.
+
+    Returns:
+        tuple: (liste_comptes, liste_operations, liste_budgets)
+    """
+    alea = alea or random.Random(42)
+    lst_ope = [Operation(date_aleatoire(alea), alea.choice(LIBELLES), alea.choice(COMPTES),
+                         alea.randint(-30_000, 30_000), alea.choice(MODES), alea.random() < 0.8, alea.choice(BUDGETS))
+               for _ in range(nb_operations)]
+    if triees:
+        lst_ope.sort(key=lambda operation: operation.date)
+    return list(COMPTES), lst_ope, [Budget(budget, 50_000, alea.choice(COMPTES)) for budget in BUDGETS]
+
+
+def lignes_operations(nb_operations: int, graine: int = 42) -> list:
+    """Génère les lignes 'OPE*...' en clair des opérations de donnees_utilisateur."""
+    return [formater_ligne_operation(operation)
+            for operation in donnees_utilisateur(nb_operations, random.Random(graine))[1]]
+
+
+def lignes_fichier(nb_operations: int, graine: int = 42) -> list:
+    """Génère les lignes en clair d'un fichier utilisateur (comptes, opérations, budgets), sans la ligne 'HASH*'."""
+    lst_cpt, lst_ope, lst_bud = donnees_utilisateur(nb_operations, random.Random(graine))
+    return ([f"CPT*{compte}" for compte in lst_cpt]
+            + [formater_ligne_operation(operation) for operation in lst_ope]
+            + [f"BUD*{budget.nom}*{formater_montant(budget.montant)}*{budget.compte}" for budget in lst_bud])
+
+
+def meilleur_temps(fonction, repetitions: int = REPETITIONS) -> float:
+    """Meilleur temps (en secondes) de repetitions appels de fonction()."""
+    meilleur = float('inf')
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def memoire(fabrique) -> tuple:
+    """Renvoie (objet construit, mémoire allouée en octets et encore occupée) pour une fabrique donnée."""
+    tracemalloc.start()
+    objet = fabrique()
+    taille, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objet, taille
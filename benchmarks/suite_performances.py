@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+#   suite_performances.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |--Suite de performances : charger / calculer|   #
+#   |----------------/ enregistrer---------------|   #
+#   |--------------------------------------------|   #
+# Usage (depuis la racine du dépôt) :
+#   python benchmarks/suite_performances.py                       # 1k, 10k, 100k et 1M opérations
+#   python benchmarks/suite_performances.py --tailles 1000 10000 --sortie resultats.json
+#   python benchmarks/suite_performances.py --enregistrer-reference    # mémorise les temps comme référence
+#   python benchmarks/suite_performances.py --seuil 0.25               # échoue si > 25 % plus lent que la référence
+#   python benchmarks/suite_performances.py --sans-reference --sortie resultats.json   # mesure seulement
+#
+# Chaque fonction est chronométrée sur un fichier utilisateur généré (meilleur temps sur plusieurs essais).
+# Les résultats sont écrits en JSON et comparés à la référence : le programme se termine avec le code 1
+# dès qu'une mesure dépasse la référence de plus du seuil (hors mesures trop courtes pour être fiables,
+# voir --plancher). Une référence n'a de sens que sur la machine qui l'a produite : aucune n'est donc
+# fournie avec le dépôt. Sans fichier de référence, le programme s'arrête avec le code 2 avant toute
+# mesure, sauf avec --enregistrer-reference ou --sans-reference.
+# --Imports-- #
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from commun import CLE, COMPTES, IDENTIFIANT, donnees_utilisateur  # en premier : ajoute src/ au chemin d'import
+from budgets import rapport_bud_depenses
+from comptes import afficher_operations, calcul_dict_soldes
+from cryptage_decryptage import cryptage, decryptage
+from import_donnees import import_budgets, import_comptes, import_operations
+from utils import enregistrement_modif, verifier_integrite_fichier
+
+# --Constantes-- #
+TAILLES = [1_000, 10_000, 100_000, 1_000_000]
+CHEMIN_REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference_performances.json")
+DUREE_MESURE = 1.0      # durée cumulée (en secondes) au-delà de laquelle on cesse de répéter une mesure
+
+
+# --Fonctions-- #
+def chronometrer(fonction, repetitions: int = 20) -> float:
+    """
+    Renvoie le meilleur temps (en secondes) de fonction(), répétée au moins 3 fois, puis jusqu'à
+    repetitions fois tant que la durée cumulée reste sous DUREE_MESURE. Comme timeit, le ramasse-miettes
+    est suspendu pendant chaque essai pour ne pas mesurer ses passages.
+    """
+    meilleur, cumul = float('inf'), 0.0
+    for essai in range(repetitions):
+        gc.disable()
+        try:
+            debut = time.perf_counter()
+            fonction()
+            duree = time.perf_counter() - debut
+        finally:
+            gc.enable()
+        meilleur, cumul = min(meilleur, duree), cumul + duree
+        if cumul >= DUREE_MESURE and essai >= 2:
+            break
+    return meilleur
+
+
+def mesurer_taille(nb_operations: int) -> dict:
+    """Chronomètre chaque fonction du parcours charger / calculer / enregistrer pour une taille de fichier."""
+    lst_cpt, lst_ope, lst_bud = donnees_utilisateur(nb_operations, triees=True)
+    mesures = {}
+    with tempfile.TemporaryDirectory() as dossier:
+        enregistrement_modif(lst_cpt, lst_ope, lst_bud, IDENTIFIANT, CLE, dossier_users=dossier)
+        chemin = os.path.join(dossier, f"{IDENTIFIANT}.txt")
+        with open(chemin, encoding='utf-8') as fichier:
+            texte_chiffre = fichier.read()
+        texte_clair = decryptage(texte_chiffre, CLE)
+
+        # Chargement
+        mesures['cryptage'] = chronometrer(lambda: cryptage(texte_clair, CLE))
+        mesures['decryptage'] = chronometrer(lambda: decryptage(texte_chiffre, CLE))
+        mesures['verifier_integrite_fichier'] = chronometrer(lambda: verifier_integrite_fichier(chemin, CLE))
+        mesures['import_comptes'] = chronometrer(lambda: import_comptes(chemin, CLE))
+        mesures['import_operations'] = chronometrer(lambda: import_operations(chemin, CLE))
+        mesures['import_budgets'] = chronometrer(lambda: import_budgets(chemin, CLE))
+
+        # Calculs (sur la liste d'opérations, sans index ni cube : le cas le plus coûteux)
+        mesures['calcul_dict_soldes'] = chronometrer(lambda: calcul_dict_soldes(lst_cpt, lst_ope))
+        mesures['rapport_bud_depenses'] = chronometrer(
+            lambda: rapport_bud_depenses(lst_bud[0], lst_ope, datetime.date(2020, 6, 1)))
+        with contextlib.redirect_stdout(io.StringIO()):
+            mesures['afficher_operations'] = chronometrer(lambda: afficher_operations(lst_ope, COMPTES[0]))
+
+        # Enregistrement
+        mesures['enregistrement_modif'] = chronometrer(
+            lambda: enregistrement_modif(lst_cpt, lst_ope, lst_bud, IDENTIFIANT, CLE, dossier_users=dossier))
+    return mesures
+
+
+def comparer(resultats: dict, reference: dict, seuil: float, plancher: float) -> list:
+    """
+    Compare des résultats à une référence.
+
+    Args:
+        resultats (dict): {taille: {fonction: durée}} des mesures en cours.
+        reference (dict): Même structure, pour la référence.
+        seuil (float): Ralentissement toléré (ex : 0.25 pour 25 %).
+        plancher (float): Durée (en secondes) sous laquelle une mesure n'est pas comparée.
+
+    Returns:
+        list: Régressions (taille, fonction, durée de référence, durée mesurée), les plus fortes d'abord.
+    """
+    regressions = []
+    for taille, mesures in resultats.items():
+        for fonction, duree in mesures.items():
+            duree_reference = reference.get(taille, {}).get(fonction)
+            if duree_reference is None or max(duree, duree_reference) < plancher:
+                continue
+            if duree > duree_reference * (1 + seuil):
+                regressions.append((taille, fonction, duree_reference, duree))
+    return sorted(regressions, key=lambda regression: regression[3] / regression[2], reverse=True)
+
+
+# --Programme principal-- #
+if __name__ == '__main__':
+    parseur = argparse.ArgumentParser(description="Suite de performances du parcours charger / calculer / enregistrer.")
+    parseur.add_argument('--tailles', type=int, nargs='+', default=TAILLES, help="nombres d'opérations à mesurer")
+    parseur.add_argument('--sortie', help="fichier JSON où écrire les résultats")
+    parseur.add_argument('--reference', default=CHEMIN_REFERENCE, help="fichier JSON de référence")
+    parseur.add_argument('--enregistrer-reference', action='store_true',
+                         help="écrit les résultats dans le fichier de référence au lieu de les y comparer")
+    parseur.add_argument('--seuil', type=float, default=0.25, help="ralentissement toléré (0.25 : 25 %%)")
+    parseur.add_argument('--plancher', type=float, default=0.001,
+                         help="durée (s) sous laquelle une mesure n'est pas comparée")
+    parseur.add_argument('--sans-reference', action='store_true',
+                         help="mesure sans comparer à la référence (aucune détection de régression)")
+    arguments = parseur.parse_args()
+
+    comparaison = not (arguments.enregistrer_reference or arguments.sans_reference)
+    if comparaison and not os.path.exists(arguments.reference):
+        parseur.error(f"référence absente : {arguments.reference} (la créer sur cette machine avec "
+                      f"--enregistrer-reference, ou mesurer sans comparaison avec --sans-reference)")
+
+    resultats = {}
+    for taille in arguments.tailles:
+        print(f"{taille} opérations")
+        resultats[str(taille)] = mesures = mesurer_taille(taille)
+        for fonction, duree in mesures.items():
+            print(f"  {fonction:28}: {duree * 1000:10.2f} ms")
+
+    document = {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(), 'machine': platform.platform(),
+                'resultats': resultats}
+    if arguments.sortie:
+        with open(arguments.sortie, 'w', encoding='utf-8') as fichier:
+            json.dump(document, fichier, indent=2)
+
+    if arguments.enregistrer_reference:
+        with open(arguments.reference, 'w', encoding='utf-8') as fichier:
+            json.dump(document, fichier, indent=2)
+        print(f"Référence enregistrée : {arguments.reference}")
+    elif comparaison:
+        with open(arguments.reference, encoding='utf-8') as fichier:
+            reference = json.load(fichier)['resultats']
+        regressions = comparer(resultats, reference, arguments.seuil, arguments.plancher)
+        for taille, fonction, duree_reference, duree in regressions:
+            print(f"RÉGRESSION {fonction} ({taille} opérations) : {duree_reference * 1000:.2f} ms → "
+                  f"{duree * 1000:.2f} ms (+{(duree / duree_reference - 1) * 100:.0f} %)")
+        if regressions:
+            sys.exit(1)
+        print(f"Aucune régression au-delà de {arguments.seuil:.0%} par rapport à {arguments.reference}")
@@ -0,0 +1,158 @@
+# Génération d'un jeu de données volumineux (tests de charge et de non-régression).
+# Usage (depuis gen_users/) :
+#   python gen_donnees_masse.py --utilisateurs 100 --operations 10000 --annees 5 --processus 4
+# Produit, dans le dossier de sortie :
+#   - ident.txt (crypté avec CLE_CRYPTAGE) et ident_clair.txt (mêmes lignes en clair, pour se connecter)
+#   - users/<identifiant>.txt (ou .bin) : fichiers utilisateurs cryptés avec la clé de chaque utilisateur,
+#     avec leur ligne HASH* (écrits par utils.enregistrement_modif, comme par l'application)
+# À graine égale, le jeu de données est identique quel que soit le nombre de processus.
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from constantes import CLE_CRYPTAGE, FORMAT_BINAIRE, FORMAT_TEXTE  # noqa: E402
+from cryptage_decryptage import cryptage  # noqa: E402
+from modeles import Budget, Operation  # noqa: E402
+from utils import enregistrement_modif  # noqa: E402
+
+# Comptes, libellés et budgets possibles (mêmes listes que gen_id_users.py)
+comptes_lettres = ["Compte A", "Compte B", "Compte C", "Compte D", "Compte E"]
+comptes_speciaux = ["Compte Épargne", "Compte Enfant", "Compte Jeune", "Compte Salaire", "Compte Pro"]
+libelles_depenses = ["cinema", "restaurant", "courses", "essence", "cadeau", "pharmacie"]
+libelles_revenus = ["salaire", "remboursement", "virement", "revenu", "prime", "vente"]
+types_ope = ["CB", "CHE", "VIR"]
+budgets_possibles = ["sorties", "alimentation", "transport", "santé", "divertissement", "divers"]
+prenoms_mixes = [
+    "Jean", "Marie", "Luc", "Claire", "Paul", "Julie",
+    "Louis", "Camille", "Hugo", "Chloe", "Thomas", "Emma",
+    "Youssef", "Nadia", "Amine", "Leila", "Ali", "Amina",
+    "Zara", "Omar", "Imane", "Samir"
+]
+
+PREMIER_IDENTIFIANT = 10_000_000
+# Clés de 11 à 25 : avec une clé de 10, l'espace serait chiffré en '*' (caractère préservé par le chiffrement)
+CLE_MIN, CLE_MAX = 11, 25
+
+
+def generateur(graine: int, numero: int) -> random.Random:
+    """Générateur aléatoire propre à un utilisateur : ses données ne dépendent que de la graine et de son numéro."""
+    return random.Random(f"{graine}-{numero}")
+
+
+def generate_ident(graine: int, numero: int) -> tuple:
+    """Renvoie (identifiant, mot de passe, prénom, clé) du numero-ième utilisateur."""
+    alea = generateur(graine, numero)
+    return (f"{PREMIER_IDENTIFIANT + numero:08d}", f"{alea.randrange(10 ** 6):06d}",
+            alea.choice(prenoms_mixes), alea.randint(CLE_MIN, CLE_MAX))
+
+
+def generate_comptes(nb_comptes: int) -> list:
+    comptes = (comptes_lettres + comptes_speciaux)[:nb_comptes]
+    # Au-delà des comptes prédéfinis, les comptes sont simplement numérotés
+    comptes += [f"Compte {numero}" for numero in range(len(comptes) + 1, nb_comptes + 1)]
+    return comptes
+
+
+def generate_budgets(alea: random.Random, comptes: list, nb_budgets: int) -> list:
+    noms = budgets_possibles[:nb_budgets]
+    noms += [f"Budget {numero}" for numero in range(len(noms) + 1, nb_budgets + 1)]
+    # Budget par défaut présent dans tous les fichiers (voir gen_id_users.py)
+    return [Budget("Autres", 0, "Autres")] + [Budget(nom, alea.choice([100, 200, 300, 500, 1000]) * 100,
+                                                     alea.choice(comptes))
+                                              for nom in noms]
+
+
+def generate_operations(alea: random.Random, comptes: list, budgets: list, nb_operations: int,
+                        debut: int, nb_jours: int) -> list:
+    """Génère nb_operations opérations (montants en centimes) réparties sur nb_jours, triées par date."""
+    noms_budgets = [budget.nom for budget in budgets]
+    dates = {}
+    operations = []
+    for _ in range(nb_operations):
+        ordinal = debut + alea.randrange(nb_jours)
+        date = dates.get(ordinal)
+        if date is None:
+            date = dates[ordinal] = datetime.date.fromordinal(ordinal)
+        # Même répartition que gen_id_users.py : environ 45 % de dépenses
+        if alea.random() < 0.45:
+            libelle, montant = alea.choice(libelles_depenses), -alea.randint(500, 10_000)
+        else:
+            libelle, montant = alea.choice(libelles_revenus), alea.randint(5_000, 30_000)
+        operations.append(Operation(date, libelle, alea.choice(comptes), montant, alea.choice(types_ope),
+                                    alea.random() < 0.8, alea.choice(noms_budgets)))
+    operations.sort(key=lambda operation: operation.date)
+    return operations
+
+
+def generate_utilisateurs(numeros: range, parametres: dict) -> int:
+    """Génère et écrit les fichiers d'une tranche d'utilisateurs ; renvoie le nombre d'octets écrits."""
+    debut = datetime.date(parametres['annee_fin'] - parametres['annees'] + 1, 1, 1).toordinal()
+    nb_jours = datetime.date(parametres['annee_fin'], 12, 31).toordinal() - debut + 1
+    comptes = generate_comptes(parametres['comptes'])
+    taille = 0
+    for numero in numeros:
+        identifiant, _, _, cle = generate_ident(parametres['graine'], numero)
+        alea = generateur(parametres['graine'], numero)
+        alea.random()   # décale le générateur par rapport à generate_ident
+        budgets = generate_budgets(alea, comptes, parametres['budgets'])
+        operations = generate_operations(alea, comptes, budgets, parametres['operations'], debut, nb_jours)
+        if enregistrement_modif(list(comptes), operations, budgets, identifiant, cle,
+                                dossier_users=parametres['dossier_users'], format_fichier=parametres['format']) is None:
+            raise RuntimeError(f"Échec de l'écriture du fichier de l'utilisateur {identifiant}")
+        extension = '.bin' if parametres['format'] == FORMAT_BINAIRE else '.txt'
+        taille += os.path.getsize(os.path.join(parametres['dossier_users'], identifiant + extension))
+    return taille
+
+
+parser = argparse.ArgumentParser(description="Génération d'utilisateurs et d'opérations en grand nombre.")
+parser.add_argument('--utilisateurs', type=int, default=100, help="nombre d'utilisateurs")
+parser.add_argument('--operations', type=int, default=10_000, help="nombre d'opérations par utilisateur")
+parser.add_argument('--annees', type=int, default=5, help="nombre d'années couvertes par les opérations")
+parser.add_argument('--annee-fin', type=int, default=2025, help="dernière année couverte")
+parser.add_argument('--comptes', type=int, default=3, help="nombre de comptes par utilisateur")
+parser.add_argument('--budgets', type=int, default=4, help="nombre de budgets par utilisateur (hors 'Autres')")
+parser.add_argument('--graine', type=int, default=42)
+parser.add_argument('--processus', type=int, default=os.cpu_count() or 1)
+parser.add_argument('--format', choices=[FORMAT_TEXTE, FORMAT_BINAIRE], default=FORMAT_TEXTE)
+parser.add_argument('--dossier', default=os.path.join(os.getcwd(), "dossier_masse"), help="dossier de sortie")
+
+if __name__ == '__main__':
+    arguments = parser.parse_args()
+    dossier_users = os.path.join(arguments.dossier, "users")
+    os.makedirs(dossier_users, exist_ok=True)
+
+    # Fichiers d'identification (en clair et crypté), générés dans le processus principal
+    idents = [generate_ident(arguments.graine, numero) for numero in range(arguments.utilisateurs)]
+    lignes = [f"{identifiant}*{mdp}*{prenom}*{cle:02d}" for identifiant, mdp, prenom, cle in idents]
+    with open(os.path.join(arguments.dossier, "ident_clair.txt"), "w", encoding="utf-8") as f:
+        f.writelines(ligne + "\n" for ligne in lignes)
+    with open(os.path.join(arguments.dossier, "ident.txt"), "w", encoding="utf-8") as f:
+        f.writelines(cryptage(ligne, CLE_CRYPTAGE) + "\n" for ligne in lignes)
+
+    parametres = {'graine': arguments.graine, 'operations': arguments.operations, 'annees': arguments.annees,
+                  'annee_fin': arguments.annee_fin, 'comptes': arguments.comptes, 'budgets': arguments.budgets,
+                  'format': arguments.format, 'dossier_users': dossier_users}
+    # Tranches de quelques utilisateurs : assez pour répartir la charge, assez peu pour suivre l'avancement
+    taille_tranche = max(1, min(50, arguments.utilisateurs // (4 * arguments.processus) or 1))
+    tranches = [range(debut, min(debut + taille_tranche, arguments.utilisateurs))
+                for debut in range(0, arguments.utilisateurs, taille_tranche)]
+
+    debut_generation = time.perf_counter()
+    nb_faits, taille_totale = 0, 0
+    with ProcessPoolExecutor(max_workers=arguments.processus) as executeur:
+        for tranche, taille in zip(tranches, executeur.map(generate_utilisateurs, tranches,
+                                                           [parametres] * len(tranches))):
+            nb_faits += len(tranche)
+            taille_totale += taille
+            print(f"\r{nb_faits}/{arguments.utilisateurs} utilisateurs", end="", flush=True)
+
+    duree = time.perf_counter() - debut_generation
+    print(f"\n[OK] {arguments.utilisateurs} utilisateurs, {arguments.utilisateurs * arguments.operations} opérations, "
+          f"{taille_totale / 1e6:.1f} Mo en {duree:.1f} s ({taille_totale / 1e6 / duree:.1f} Mo/s) "
+          f"dans : {arguments.dossier}")
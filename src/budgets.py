@@ -10,11 +10,11 @@ from datetime import datetime
 from constantes import (
     IDX_BUD_NOM,
     IDX_BUD_MONTANT,
-    IDX_OPE_DATE,
-    IDX_BUD_CPT,
-    IDX_OPE_MONTANT,
-    IDX_OPE_BUD
+    IDX_BUD_CPT
 )
+from instrumentation import chronometre
+from modeles import Budget, Operation
+from montants import en_centimes, formater_montant
 from shared import saisir_choix
 
 
@@ -29,7 +29,7 @@ def selection_budget(lst_bud: list) -> list:
     L'utilisateur saisit un choix, et la fonction retourne le budget sélectionné.
 
     Args:
-        lst_bud (list): Liste des budgets, chacun sous forme [nom, montant, compte associé].
+        lst_bud (list): Liste des budgets, chacun sous forme [nom, montant en centimes, compte associé].
 
     Returns:
         list: Le budget sélectionné (sous forme de liste).
@@ -43,13 +43,13 @@ def selection_budget(lst_bud: list) -> list:
     return lst_bud[choix]
 
 
-def creation_budget(lst_cpt: list, lst_bud: list) -> list:
+def creation_budget(lst_cpt: list, lst_bud: list) -> Budget:
     """
-    Crée un nouveau budget à partir des saisies utilisateur, et le retourne sous forme de liste.
+    Crée un nouveau budget à partir des saisies utilisateur, et le retourne sous forme de Budget (voir modeles.py).
 
     La fonction demande :
     - un libellé unique (non présent dans lst_bud)
-    - un montant strictement positif (float)
+    - un montant strictement positif (en centimes)
     - un compte associé (choisi dans lst_cpt)
 
     Args:
@@ -57,7 +57,7 @@ def creation_budget(lst_cpt: list, lst_bud: list) -> list:
         lst_bud (list): Liste des budgets existants (pour éviter les doublons de nom).
 
     Returns:
-        list: [libellé (str), montant (float), compte associé (str)]
+        Budget: (libellé (str), montant en centimes (int), compte associé (str))
     """
     from comptes import selection_compte
 
@@ -72,7 +72,7 @@ def creation_budget(lst_cpt: list, lst_bud: list) -> list:
     while not saisie_seuil_valide:
         saisie_seuil = input("Montant en € du budget (doit être supérieur à 0 €) : ")
         try:
-            seuil = float(saisie_seuil)
+            seuil = en_centimes(saisie_seuil)
             if seuil > 0:
                 saisie_seuil_valide = True
             else:
@@ -81,27 +81,32 @@ def creation_budget(lst_cpt: list, lst_bud: list) -> list:
             print("Veuillez entrer un montant en € correct.")
 
     compte = selection_compte(lst_cpt, courant=False)
-    return [libelle.capitalize(), seuil, compte]
+    return Budget(libelle.capitalize(), seuil, compte)
 
 
-def ajout_budget(lst_bud: list, budget: list) -> None:
+def ajout_budget(lst_bud: list, budget: Budget) -> None:
     """
     Ajoute un budget à la liste des budgets existants de l'utilisateur,
     et affiche un message de confirmation.
 
-    Le budget ajouté doit être une liste contenant :
-        [libellé (str), montant (float), compte associé (str)]
+    Le budget ajouté est un Budget (voir modeles.py) ; une liste de ses 3 champs
+        [libellé (str), montant en centimes (int), compte associé (str)]
+    est aussi acceptée, et convertie.
 
     Args:
         lst_bud (list): Liste des budgets de l'utilisateur.
-        budget (list): Le budget à ajouter (sous forme de liste).
+        budget (Budget | list): Le budget à ajouter.
 
     Returns:
         None
+
+    Raises:
+        TypeError: Si le budget n'a pas 3 champs du type attendu.
     """
-    assert isinstance(budget, list) and len(budget) == 3, "Le budget doit être une liste de 3 éléments"
+    if not isinstance(budget, Budget):
+        budget = Budget(*budget)
     lst_bud.append(budget)
-    print(f"Le budget : {budget[IDX_BUD_NOM]} a été ajouté avec succès.")
+    print(f"Le budget : {budget.nom} a été ajouté avec succès.")
 
 
 def modifier_budget(lst_bud: list, lst_cpt: list) -> None:
@@ -116,7 +121,7 @@ def modifier_budget(lst_bud: list, lst_cpt: list) -> None:
 
     Args:
         lst_bud (list): Liste des budgets de l'utilisateur. Chaque budget est une liste :
-                        [libellé (str), montant (float), compte associé (str)]
+                        [libellé (str), montant en centimes (int), compte associé (str)]
         lst_cpt (list): Liste des comptes de l'utilisateur (pour l'affectation du compte).
 
     Returns:
@@ -132,33 +137,89 @@ def modifier_budget(lst_bud: list, lst_cpt: list) -> None:
         nouveau_libelle = input("Nouveau nom du libellé : ").strip().capitalize()
         while nouveau_libelle.casefold() == budget_a_modifier[IDX_BUD_NOM].casefold():
             nouveau_libelle = input("Le nouveau nom doit être différent.\nNouveau nom du libellé : ")
-        budget_a_modifier[IDX_BUD_NOM] = nouveau_libelle
+        budget_a_modifier.nom = nouveau_libelle
         print(f"Libellé mis à jour : {nouveau_libelle}")
 
     elif choix == 2:
         saisie_valide = False
         while not saisie_valide:
             saisie = input(f"Nouveau montant du budget {budget_a_modifier[IDX_BUD_NOM]} "
-                           f"(actuel : {budget_a_modifier[IDX_BUD_MONTANT]:.2f} €) : ")
+                           f"(actuel : {formater_montant(budget_a_modifier[IDX_BUD_MONTANT])} €) : ")
             try:
-                nouveau_montant = float(saisie)
+                nouveau_montant = en_centimes(saisie)
                 if nouveau_montant > 0 and nouveau_montant != budget_a_modifier[IDX_BUD_MONTANT]:
                     saisie_valide = True
                 else:
                     print("Le montant doit être supérieur à 0 et différent de l'actuel.")
             except ValueError:
                 print("Veuillez entrer un montant en € valide.")
-        budget_a_modifier[1] = nouveau_montant
-        print(f"Montant mis à jour : {nouveau_montant:.2f} €")
+        budget_a_modifier.montant = nouveau_montant
+        print(f"Montant mis à jour : {formater_montant(nouveau_montant)} €")
 
     elif choix == 3:
         print(f"Compte actuel : {budget_a_modifier[IDX_BUD_CPT]}")
         nouveau_compte = selection_compte(lst_cpt, courant=False)
-        budget_a_modifier[2] = nouveau_compte
+        budget_a_modifier.compte = nouveau_compte
         print(f"Compte associé mis à jour : {nouveau_compte}")
 
 
-def rapport_bud_depenses(budget: list, lst_ope: list, date_reference: datetime.date) -> float:
+def maj_cube_depenses(cube: dict, operation: Operation) -> None:
+    """
+    Répercute une opération sur le cube des dépenses par budget et par mois.
+
+    Seules les dépenses (montant négatif) sont prises en compte, en valeur absolue.
+
+    Args:
+        cube (dict): Cube des dépenses {budget: {(année, mois): total}} (modifié sur place).
+        operation (Operation): L'opération à répercuter.
+
+    Returns:
+        None
+    """
+    montant = operation.montant
+    if montant < 0:
+        date_ope = operation.date
+        depenses = cube.setdefault(operation.budget, {})
+        cle_mois = (date_ope.year, date_ope.month)
+        depenses[cle_mois] = depenses.get(cle_mois, 0) + abs(montant)
+
+
+@chronometre()
+def calcul_cube_depenses(lst_ope: list) -> dict:
+    """
+    Calcule, en une seule passe, le total des dépenses de chaque budget pour chaque mois.
+
+    Le cube obtenu permet ensuite de produire un rapport (budget, mois) en O(1),
+    au lieu de reparcourir toutes les opérations (voir rapport_bud_depenses).
+
+    Args:
+        lst_ope (list): Liste des opérations de l'utilisateur.
+
+    Returns:
+        dict: Cube des dépenses {budget (str): {(année, mois): total des dépenses en centimes (int)}}.
+    """
+    cube = {}
+    for operation in lst_ope:
+        maj_cube_depenses(cube, operation)
+    return cube
+
+
+def depenses_par_mois(cube: dict, nom_budget: str) -> dict:
+    """
+    Renvoie les dépenses d'un budget pour chacun des mois où il a été utilisé (vue d'évolution).
+
+    Args:
+        cube (dict): Cube des dépenses (voir calcul_cube_depenses).
+        nom_budget (str): Libellé du budget.
+
+    Returns:
+        dict: {(année, mois): total des dépenses}, dans l'ordre chronologique.
+    """
+    return dict(sorted(cube.get(nom_budget, {}).items()))
+
+
+@chronometre()
+def rapport_bud_depenses(budget: list, lst_ope: list, date_reference: datetime.date, cube: dict = None) -> float:
     """
     Calcule le rapport entre les dépenses effectuées sur un budget donné
     et le montant alloué à ce budget pour un mois et une année spécifiés.
@@ -168,10 +229,14 @@ def rapport_bud_depenses(budget: list, lst_ope: list, date_reference: datetime.d
     - dont le montant est négatif (dépense),
     - et dont la date correspond au mois et à l'année extraits de date_reference.
 
+    Si le cube des dépenses est fourni (voir calcul_cube_depenses), le total est lu directement
+    dans le cube, sans parcourir les opérations.
+
     Args:
-        budget (list): Le budget concerné sous la forme [libellé (str), montant (float), compte (str)].
+        budget (list): Le budget concerné sous la forme [libellé (str), montant en centimes (int), compte (str)].
         lst_ope (list): Liste des opérations de l'utilisateur.
         date_reference (datetime.date): Date cible contenant le mois et l'année du rapport (jour ignoré).
+        cube (dict, optional): Cube des dépenses à jour pour ces opérations.
 
     Returns:
         float: Le rapport entre les dépenses et le budget (ex : 0.75 pour 75%).
@@ -179,15 +244,19 @@ def rapport_bud_depenses(budget: list, lst_ope: list, date_reference: datetime.d
     nom_budget = budget[IDX_BUD_NOM]
     montant_budget = budget[IDX_BUD_MONTANT]
 
-    depenses_budget = 0.0
+    if cube is not None:
+        depenses_budget = cube.get(nom_budget, {}).get((date_reference.year, date_reference.month), 0)
+        return depenses_budget / montant_budget if montant_budget else 0.0
+
+    depenses_budget = 0
     for operation in lst_ope:
         if (
-            operation[IDX_OPE_BUD] == nom_budget
-            and operation[IDX_OPE_MONTANT] < 0
-            and operation[IDX_OPE_DATE].month == date_reference.month
-            and operation[IDX_OPE_DATE].year == date_reference.year
+            operation.budget == nom_budget
+            and operation.montant < 0
+            and operation.date.month == date_reference.month
+            and operation.date.year == date_reference.year
         ):
-            depenses_budget += abs(operation[IDX_OPE_MONTANT])
+            depenses_budget += abs(operation.montant)
 
     return depenses_budget / montant_budget if montant_budget else 0.0
 
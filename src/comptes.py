@@ -8,17 +8,13 @@
 # --Imports-- #
 import datetime
 from copy import copy
+from historique import HistoriqueOperations
+from index_operations import IndexOperations
+from instrumentation import chronometre
+from modeles import Operation
+from montants import en_centimes, formater_montant
 from shared import saisir_choix, saisir_date
-from constantes import (
-    IDX_OPE_DATE,
-    IDX_OPE_LIB,
-    IDX_OPE_CPT,
-    IDX_OPE_MONTANT,
-    IDX_OPE_MODE,
-    IDX_OPE_ETAT,
-    IDX_OPE_BUD,
-    IDX_BUD_NOM
-)
+from constantes import IDX_BUD_NOM
 
 
 # --Constantes-- #
@@ -61,7 +57,8 @@ def selection_compte(lst_cpt: list, courant: bool = True, exclude_self: bool = F
     return lst_affichee[choix]
 
 
-def calcul_solde(lst_ope: list, compte: str) -> float:
+@chronometre()
+def calcul_solde(lst_ope: list, compte: str) -> int:
     """
     Calcule le solde actuel d’un compte donné à partir de la liste des opérations.
 
@@ -72,19 +69,17 @@ def calcul_solde(lst_ope: list, compte: str) -> float:
     sont prises en compte dans le calcul du solde.
 
     Args:
-        lst_ope (list): Liste des opérations sous forme de tuples
-                        (date, libellé, compte, montant, mode_paiement, état, budget).
+        lst_ope (list): Liste des opérations (voir modeles.Operation).
         compte (str): Nom du compte dont on souhaite calculer le solde.
 
     Returns:
-        float: Solde total du compte (somme des montants des opérations passées).
+        int: Solde total du compte en centimes (somme des montants des opérations passées).
     """
     solde = 0
     for ope in lst_ope:
-        # ope[IDX_OPE_CPT] représente la case contenant le compte associé à une opération donnée.
-        # On vérifie l'état de l'opération avec ope[IDX_OPE_ETAT], si elle est passé, on la prend en compte
-        if ope[IDX_OPE_CPT] == compte and ope[IDX_OPE_ETAT]:
-            solde += ope[IDX_OPE_MONTANT]  # ope[IDX_OPE_MONTANT] correspond au montant (+/-) de l'opération.
+        # On vérifie l'état de l'opération avec ope.passee, si elle est passée, on la prend en compte
+        if ope.compte == compte and ope.passee:
+            solde += ope.montant  # ope.montant correspond au montant (+/-) de l'opération.
     return solde
 
 
@@ -120,16 +115,16 @@ def ajout_compte(lst_cpt: list, nom: str) -> bool:
         return True
 
 
-def creation_operation(lst_cpt: list, lst_bud: list) -> tuple:
+def creation_operation(lst_cpt: list, lst_bud: list) -> Operation:
     """
     Crée une opération bancaire à partir des saisies utilisateur, 
-    et la retourne sous forme de tuple structuré.
+    et la retourne sous forme d'Operation (voir modeles.py).
 
     Les informations demandées sont :
         - date de l'opération (via saisir_date)
         - libellé de l'opération
         - compte concerné (choisi dans la liste lst_cpt)
-        - montant (float, positif ou négatif)
+        - montant (int en centimes, positif ou négatif)
         - mode de paiement (CB, CHE, VIR, etc.)
         - état de l'opération (passée ou non)
         - budget associé (sélectionné dans lst_bud)
@@ -139,7 +134,7 @@ def creation_operation(lst_cpt: list, lst_bud: list) -> tuple:
         lst_bud (list): Liste des budgets définis par l'utilisateur.
 
     Returns:
-        tuple: Un tuple contenant toutes les informations de l'opération sous la forme :
+        Operation: L'opération, dont les champs sont dans l'ordre :
             (date, libellé, compte, montant, mode_paiement, état, budget)
     """
     from budgets import selection_budget
@@ -152,7 +147,7 @@ def creation_operation(lst_cpt: list, lst_bud: list) -> tuple:
     while not saisie_montant_valide:
         saisie_montant = input("Montant en € (-montant si négatif) : ")
         try:
-            montant = float(saisie_montant)
+            montant = en_centimes(saisie_montant)
             if montant != 0:
                 saisie_montant_valide = True
             else:
@@ -175,25 +170,31 @@ def creation_operation(lst_cpt: list, lst_bud: list) -> tuple:
     # car nous n'utilisons que son nom dans l'enregistrement de l'opération
     budget = selection_budget(lst_bud)[IDX_BUD_NOM]
 
-    operation = date_op, libelle, compte, montant, mode_paiement, etat, budget
+    operation = Operation(date_op, libelle, compte, montant, mode_paiement, etat, budget)
     return operation
 
 
-def ajout_operation(lst_ope: list, operation: tuple) -> None:
+def ajout_operation(lst_ope: list, operation: Operation) -> None:
     """
     Ajoute une opération bancaire à la liste des opérations existantes de l'utilisateur.
 
-    L'opération est représentée par un tuple structuré contenant :
+    L'opération est une Operation (voir modeles.py) ; un tuple de ses 7 champs
         (date, libellé, compte, montant, mode_paiement, état, budget)
+    est aussi accepté, et converti.
 
     Args:
-        lst_ope (list): Liste actuelle des opérations de l'utilisateur.
-        operation (tuple): Tuple représentant une opération à ajouter à la liste.
+        lst_ope (list | IndexOperations): Liste actuelle des opérations de l'utilisateur
+                                          (ou index, l'opération étant alors insérée à sa place chronologique).
+        operation (Operation | tuple): L'opération à ajouter à la liste.
 
     Returns:
         None
+
+    Raises:
+        TypeError: Si l'opération n'a pas 7 champs du type attendu.
     """
-    assert isinstance(operation, tuple) and len(operation) == 7, "L'opération doit être un tuple de 7 éléments"
+    if not isinstance(operation, Operation):
+        operation = Operation(*operation)
     lst_ope.append(operation)
 
 
@@ -214,14 +215,14 @@ def creer_virement(lst_cpt: list, dict_soldes: dict,
 
     Args:
         lst_cpt (list): Liste des noms de comptes disponibles de l'utilisateur.
-        dict_soldes (dict): Dictionnaire associant chaque nom de compte à son solde actuel.
+        dict_soldes (dict): Dictionnaire associant chaque nom de compte à son solde actuel (en centimes).
         is_nouveau_compte (bool): Indique s'il s'agit d'un virement vers un nouveau compte (dans ce cas,
                                   le compte bénéficiaire est imposé et correspond à nouveau_compte).
         nouveau_compte (str): Nom du compte récemment créé (utilisé uniquement si is_nouveau_compte est True).
 
     Returns:
         tuple: Tuple contenant les informations du virement sous la forme
-               (compte_emetteur, compte_beneficiaire, montant).
+               (compte_emetteur, compte_beneficiaire, montant en centimes).
     """
 
     print("Sélectionnez le compte émetteur : ")
@@ -234,7 +235,7 @@ def creer_virement(lst_cpt: list, dict_soldes: dict,
 
     # Tant que le solde du compte émetteur est nul ou négatif, on redemande un autre compte
     while solde_emetteur <= 0:
-        print(f"Le solde de ce compte ({solde_emetteur:.2f} €) ne permet pas de faire un virement. "
+        print(f"Le solde de ce compte ({formater_montant(solde_emetteur)} €) ne permet pas de faire un virement. "
               f"Veuillez choisir un autre compte émetteur.")
         compte_emetteur = selection_compte(lst_cpt, courant=False)
         solde_emetteur = dict_soldes[compte_emetteur]
@@ -256,9 +257,9 @@ def creer_virement(lst_cpt: list, dict_soldes: dict,
     # Demande à l'utilisateur de saisir un montant valide (> 0)
     while not saisie_montant_valide:
         saisie_montant = input(f"Saisissez le montant du virement à effectuer "
-                               f"(solde : {solde_emetteur:.2f} €) : ")
+                               f"(solde : {formater_montant(solde_emetteur)} €) : ")
         try:
-            montant = float(saisie_montant)
+            montant = en_centimes(saisie_montant)
             if montant > 0:
                 saisie_montant_valide = True
         except ValueError:
@@ -267,13 +268,13 @@ def creer_virement(lst_cpt: list, dict_soldes: dict,
     # Vérifie que le montant ne dépasse pas le solde du compte émetteur
     while montant > dict_soldes[compte_emetteur]:
         print(f"Il n'y a pas assez de provisions sur ce compte pour effectuer ce virement. "
-              f"({montant:.2f} € > {dict_soldes[compte_emetteur]:.2f} €)")
+              f"({formater_montant(montant)} € > {formater_montant(dict_soldes[compte_emetteur])} €)")
         saisie_montant_valide = False
         while not saisie_montant_valide:
             saisie_montant = input(f"Saisissez le montant du virement à effectuer "
-                                   f"(solde : {solde_emetteur:.2f} €) : ")
+                                   f"(solde : {formater_montant(solde_emetteur)} €) : ")
             try:
-                montant = float(saisie_montant)
+                montant = en_centimes(saisie_montant)
                 if montant > 0:
                     saisie_montant_valide = True
             except ValueError:
@@ -284,40 +285,54 @@ def creer_virement(lst_cpt: list, dict_soldes: dict,
     return virement
 
 
+def operations_virement(virement: tuple) -> tuple:
+    """
+    Construit les deux opérations (débit et crédit) correspondant à un virement entre comptes.
+
+    Args:
+        virement (tuple): Tuple contenant (compte_emetteur (str), compte_beneficiaire (str), montant (int, en centimes))
+
+    Returns:
+        tuple: (opération de débit du compte émetteur, opération de crédit du compte bénéficiaire)
+    """
+    # Crée une opération de débit pour le compte émetteur
+    ope_emetteur = Operation(datetime.date.today(),
+                             f"Virement - émetteur",
+                             virement[0],  # Compte émetteur
+                             -virement[2],  # Montant du débit (négatif)
+                             "VIR",
+                             True,
+                             "...")
+    # Crée une opération de crédit pour le compte bénéficiaire
+    ope_benef = Operation(datetime.date.today(),
+                          f"Virement - bénéficiaire",
+                          virement[1],  # Compte émetteur
+                          virement[2],  # Montant du crédit (positif)
+                          "VIR",
+                          True,
+                          "...")
+    return ope_emetteur, ope_benef
+
+
 def ajout_virement(virement: tuple, lst_ope: list, dict_soldes: dict) -> None:
     """
     Effectue un virement entre deux comptes en mettant à jour :
     - la liste des opérations (ajout débit/crédit)
     - le dictionnaire des soldes (mise à jour des montants)
 
-    Deux opérations sont créées :
+    Deux opérations sont créées (voir operations_virement) :
         - Une pour le compte émetteur (montant négatif)
         - Une pour le compte bénéficiaire (montant positif)
 
     Args:
-        virement (tuple): Tuple contenant (compte_emetteur (str), compte_beneficiaire (str), montant (float))
+        virement (tuple): Tuple contenant (compte_emetteur (str), compte_beneficiaire (str), montant (int, en centimes))
         lst_ope (list): Liste des opérations de l'utilisateur à mettre à jour.
         dict_soldes (dict): Dictionnaire des soldes des comptes de l'utilisateur.
 
     Returns:
         None
     """
-    # Crée une opération de débit pour le compte émetteur
-    ope_emetteur = (datetime.date.today(),
-                    f"Virement - émetteur",
-                    virement[0],  # Compte émetteur
-                    -virement[2],  # Montant du débit (négatif)
-                    "VIR",
-                    True,
-                    "...")
-    # Crée une opération de crédit pour le compte bénéficiaire
-    ope_benef = (datetime.date.today(),
-                 f"Virement - bénéficiaire",
-                 virement[1],  # Compte émetteur
-                 virement[2],  # Montant du crédit (positif)
-                 "VIR",
-                 True,
-                 "...")
+    ope_emetteur, ope_benef = operations_virement(virement)
 
     ajout_operation(lst_ope, operation=ope_emetteur)
     ajout_operation(lst_ope, operation=ope_benef)
@@ -327,6 +342,7 @@ def ajout_virement(virement: tuple, lst_ope: list, dict_soldes: dict) -> None:
     dict_soldes[virement[1]] = dict_soldes.get(virement[1], 0) + virement[2]
 
 
+@chronometre()
 def calcul_dict_soldes(lst_cpt, lst_ope) -> dict:
     """
     Calcule le solde de chaque compte de l'utilisateur à partir de la liste des opérations,
@@ -336,17 +352,16 @@ def calcul_dict_soldes(lst_cpt, lst_ope) -> dict:
     est traitée pour mettre à jour le solde du compte concerné, en ajoutant ou soustrayant
     le montant de l’opération.
 
-    Convention utilisée pour les opérations (tuple) :
-        - ope[2] : nom du compte concerné
-        - ope[3] : montant de l’opération (positif ou négatif)
+    Convention utilisée pour les opérations (voir modeles.Operation) :
+        - ope.compte : nom du compte concerné
+        - ope.montant : montant de l’opération (positif ou négatif)
 
     Args:
         lst_cpt (list): Liste des noms des comptes de l'utilisateur.
-        lst_ope (list): Liste des opérations, où chaque opération est un tuple contenant
-                        au moins les éléments aux indices 2 (compte) et 3 (montant).
+        lst_ope (list): Liste des opérations de l'utilisateur.
 
     Returns:
-        dict: Dictionnaire avec comme clés les noms de comptes et comme valeurs leurs soldes respectifs.
+        dict: Dictionnaire avec comme clés les noms de comptes et comme valeurs leurs soldes respectifs (en centimes).
     """
     # Initialise le dictionnaire avec un solde de 0 pour chaque compte de la liste
     dict_soldes = dict(zip(lst_cpt, [0 for _ in lst_cpt]))
@@ -355,12 +370,13 @@ def calcul_dict_soldes(lst_cpt, lst_ope) -> dict:
     for ope in lst_ope:
         # Ajout (ou soustraction) du montant de l'opération au solde du compte concerné
         # Utilisation get(..., 0) pour éviter une erreur si une opération concerne un compte non listé initialement
-        dict_soldes[ope[2]] = dict_soldes.get(ope[2], 0) + ope[3]
+        dict_soldes[ope.compte] = dict_soldes.get(ope.compte, 0) + ope.montant
 
     # Retourne le dictionnaire final contenant les soldes à jour
     return dict_soldes
 
 
+@chronometre()
 def afficher_operations(lst_ope: list, compte: str, filtre_date: bool = False) -> None:
     """
     Affiche les opérations associées à un compte spécifique, avec ou sans filtrage par date.
@@ -369,8 +385,12 @@ def afficher_operations(lst_ope: list, compte: str, filtre_date: bool = False) -
     Seules les opérations comprises dans cette plage seront affichées.
     Si filtre_date est False, toutes les opérations du compte spécifié sont affichées sans restriction.
 
+    Si lst_ope est un IndexOperations (ou un HistoriqueOperations), seules les opérations du compte dans
+    la période sont parcourues (recherche dichotomique), au lieu de toute la liste ; pour un historique,
+    seules ces opérations sont décodées.
+
     Args:
-        lst_ope (list): Liste des opérations de l'utilisateur.
+        lst_ope (list | IndexOperations | HistoriqueOperations): Liste (ou index) des opérations de l'utilisateur.
         compte (str): Nom du compte dont on souhaite afficher les opérations.
         filtre_date (bool, optional): Si True, filtre les opérations par date. Sinon, affiche toutes les opérations.
 
@@ -388,33 +408,39 @@ def afficher_operations(lst_ope: list, compte: str, filtre_date: bool = False) -
                 break
             print("La date limite doit être supérieure ou égale à la date de début.")
 
+    if isinstance(lst_ope, (IndexOperations, HistoriqueOperations)):
+        # Recherche dichotomique sur les seules opérations du compte
+        operations = lst_ope.plage(compte, plancher, limite) if filtre_date else lst_ope.plage(compte)
+    else:
+        # L'opérateur 'or' utilise un court-circuit : si not filtre_date est True,
+        # Python n'évalue pas la suite (plancher <= operation.date <= limite),
+        # ce qui évite une erreur si plancher ou limite ne sont pas définis.
+        operations = (operation for operation in lst_ope
+                      if operation.compte == compte
+                      and (not filtre_date or (plancher <= operation.date <= limite)))
+
     trouve = False
-    for operation in lst_ope:
-        if operation[IDX_OPE_CPT] == compte:
-            # L'opérateur 'or' utilise un court-circuit : si not filtre_date est True,
-            # Python n'évalue pas la suite (plancher <= operation[0] <= limite),
-            # ce qui évite une erreur si plancher ou limite ne sont pas définis.
-            if not filtre_date or (plancher <= operation[IDX_OPE_DATE] <= limite):
-                print(formatter_operation(operation))
-                trouve = True
+    for operation in operations:
+        print(formatter_operation(operation))
+        trouve = True
 
     if not trouve:
         print("Aucune opération trouvée pour ce compte et/ou à cette date.")
 
 
-def formatter_operation(operation: tuple) -> str:
+def formatter_operation(operation: Operation) -> str:
     """
     Formate une opération bancaire sous forme de chaîne lisible pour affichage.
 
-    Cette fonction transforme les données d'une opération stockée sous forme de tuple
+    Cette fonction transforme les données d'une opération (voir modeles.Operation)
     en une chaîne structurée contenant tous les champs pertinents.
 
     Args:
-        operation (tuple): Une opération représentée par :
+        operation (Operation): Une opération représentée par :
             - date (datetime.date) : Date de l'opération
             - libellé (str) : Description de l'opération
             - compte (str) : Nom du compte concerné
-            - montant (float) : Montant (positif ou négatif)
+            - montant (int) : Montant en centimes (positif ou négatif)
             - mode de paiement (str) : CB, VIR, CHE, etc.
             - état (bool) : True si l'opération est passée, False sinon
             - budget (str) : Libellé du budget associé
@@ -422,14 +448,14 @@ def formatter_operation(operation: tuple) -> str:
     Returns:
         str: Chaîne formatée et lisible représentant l'opération.
     """
-    etat_str = "Passée" if operation[IDX_OPE_ETAT] else "En attente"
-    affichage = (f"| Date : {operation[IDX_OPE_DATE].strftime('%d/%m/%Y')} - "
-                 f"Libellé : {operation[IDX_OPE_LIB]} - "
-                 f"Compte : {operation[IDX_OPE_CPT]} - "
-                 f"Montant : {operation[IDX_OPE_MONTANT]:.2f} € - "
-                 f"Mode de paiement : {operation[IDX_OPE_MODE]} - "
+    etat_str = "Passée" if operation.passee else "En attente"
+    affichage = (f"| Date : {operation.date.strftime('%d/%m/%Y')} - "
+                 f"Libellé : {operation.libelle} - "
+                 f"Compte : {operation.compte} - "
+                 f"Montant : {formater_montant(operation.montant)} € - "
+                 f"Mode de paiement : {operation.mode} - "
                  f"État : {etat_str} - "
-                 f"Budget : {operation[IDX_OPE_BUD]} |")
+                 f"Budget : {operation.budget} |")
     return affichage
 
 # --Programme principal--
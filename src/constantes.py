@@ -12,4 +12,14 @@ IDX_BUD_NOM = 0
 IDX_BUD_MONTANT = 1
 IDX_BUD_CPT = 2
 
-CLE_CRYPTAGE = 23
\ No newline at end of file
+CLE_CRYPTAGE = 23
+
+DOSSIER_USERS = "../users"
+SEUIL_COMPACTION_JOURNAL = 200    # nombre d'opérations journalisées avant réécriture complète du fichier
+DELAI_ENREGISTREMENT = 30         # délai minimal (en secondes) entre deux enregistrements non forcés
+TAILLE_BLOC_LECTURE = 1 << 20     # nombre de caractères lus (et décryptés) à la fois dans un fichier utilisateur
+NB_THREADS_PERSISTANCE = 4        # threads chargés des lectures / écritures de fichiers du serveur (persistance_async.py)
+
+FORMAT_TEXTE = "texte"            # fichier <identifiant>.txt, une ligne par compte / opération / budget
+FORMAT_BINAIRE = "binaire"        # fichier <identifiant>.bin, voir format_binaire.py
+FORMAT_FICHIER_USERS = FORMAT_TEXTE   # format utilisé pour enregistrer les fichiers utilisateurs
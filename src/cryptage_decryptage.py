@@ -6,18 +6,264 @@
 #   |--------Fonctions crypter, décrypter--------|   #
 #   |--------------------------------------------|   #
 # --Imports-- #
+import codecs
+import threading
+from functools import lru_cache
+
 # --Constantes-- #
 caracteres_preserves = {'\n', '*'}
+VALEUR_MAX_UNICODE = 1114112
+NON_CARACTERE = '\ufffe'       # case vide d'une table de codecs.charmap_*
+GESTIONNAIRE_ECARTS = 'decalage_ecarts'
+_ecarts = threading.local()     # suites de caractères non encodables, notées par noter_ecart
+
+
+# --Classes-- #
+class TableDecalage(dict):
+    """
+    Table de traduction (au sens de str.translate) appliquant un décalage de César.
+
+    Les correspondances sont calculées à la demande, puis mémorisées : un texte n'est donc
+    parcouru qu'une seule fois, en C, par str.translate, quel que soit le nombre de caractères
+    distincts rencontrés. Les caractères préservés ('\n' et '*') se traduisent en eux-mêmes.
+    """
+
+    def __init__(self, decalage: int):
+        super().__init__({ord(char): ord(char) for char in caracteres_preserves})
+        self.decalage = decalage
+
+    def __missing__(self, code: int) -> int:
+        resultat = (code + self.decalage) % VALEUR_MAX_UNICODE
+        self[code] = resultat
+        return resultat
 
 
 # --Fonctions-- #
+@lru_cache(maxsize=64)
+def table_decalage_octets(decalage: int) -> tuple:
+    """
+    Construit la table de décalage restreinte aux 256 premiers points de code (Latin-1).
+
+    Cette table permet de traiter tout un texte Latin-1 d'un coup avec bytes.translate.
+    Les octets dont l'image sort de la plage Latin-1 ne peuvent pas y être représentés :
+    ils sont renvoyés à part pour que l'appelant se replie alors sur str.translate.
+
+    Args:
+        decalage (int): Décalage à appliquer (+cle pour chiffrer, -cle pour déchiffrer).
+
+    Returns:
+        tuple: (table de 256 octets pour bytes.translate, octets dont l'image sort de Latin-1)
+    """
+    table = bytearray(range(256))
+    debordements = []
+    for code in range(256):
+        if chr(code) in caracteres_preserves:
+            continue
+        image = (code + decalage) % VALEUR_MAX_UNICODE
+        if image < 256:
+            table[code] = image
+        else:
+            debordements.append(code)
+    return bytes(table), tuple(debordements)
+
+
+@lru_cache(maxsize=64)
+def table_decalage_binaire(decalage: int) -> bytes:
+    """
+    Construit la table de décalage de César sur les 256 valeurs d'octet (modulo 256), pour les données
+    binaires : contrairement aux textes, aucun octet n'est préservé.
+
+    Args:
+        decalage (int): Décalage à appliquer (+cle pour chiffrer, -cle pour déchiffrer).
+
+    Returns:
+        bytes: Table de 256 octets pour bytes.translate.
+    """
+    return bytes((code + decalage) % 256 for code in range(256))
+
+
+@lru_cache(maxsize=64)
+def tables_charmap(decalage: int) -> tuple:
+    """
+    Construit les tables de codecs.charmap_decode et codecs.charmap_encode appliquant un décalage.
+
+    Ces deux fonctions traduisent tout un texte en C, même lorsque des images sortent de Latin-1 :
+        - table de décodage : image de chacun des 256 points de code Latin-1, pour un texte Latin-1
+          (cryptage d'un texte accentué : 'é' + 23 = 'Ā'),
+        - table d'encodage : antécédent de chacun des 256 points de code Latin-1, pour un texte dont
+          l'image est en Latin-1 (décryptage du même texte).
+    La table d'encodage n'est rapide (EncodingMap plutôt que dict) que si sa première case est '\x00'
+    et qu'elle ne contient que des caractères du plan de base : l'octet 0 y est donc l'image de '\x00',
+    que decaler_encodable remplace ensuite par sa vraie image, et les antécédents hors du plan de base
+    en sont exclus (ils seront traduits à part, voir decaler_par_morceaux).
+
+    Args:
+        decalage (int): Décalage à appliquer (+cle pour chiffrer, -cle pour déchiffrer).
+
+    Returns:
+        tuple: (table de décodage (str), table d'encodage)
+    """
+    images = ''.join(char if char in caracteres_preserves else chr((code + decalage) % VALEUR_MAX_UNICODE)
+                     for code, char in ((code, chr(code)) for code in range(256)))
+
+    antecedents = ['\x00']
+    for code in range(1, 256):
+        if chr(code) in caracteres_preserves:
+            antecedents.append(chr(code))
+            continue
+        antecedent = chr((code - decalage) % VALEUR_MAX_UNICODE)
+        # Un caractère préservé se traduit en lui-même, et '\x00' occupe déjà la première case
+        exclu = antecedent in caracteres_preserves or antecedent == '\x00' or antecedent > '\uffff'
+        antecedents.append(NON_CARACTERE if exclu else antecedent)
+
+    table_encodage = codecs.charmap_build(''.join(antecedents))
+    if isinstance(table_encodage, dict):
+        # Repli de charmap_build (antécédents trop dispersés, très grande clé) : U+FFFE y serait une vraie entrée
+        table_encodage.pop(ord(NON_CARACTERE), None)
+    return images, table_encodage
+
+
+@lru_cache(maxsize=64)
+def table_decalage(decalage: int) -> TableDecalage:
+    """
+    Renvoie la table de traduction associée à un décalage, partagée entre tous les appels.
+
+    Args:
+        decalage (int): Décalage à appliquer (+cle pour chiffrer, -cle pour déchiffrer).
+
+    Returns:
+        TableDecalage: Table utilisable avec str.translate.
+    """
+    return TableDecalage(decalage)
+
+
+def noter_ecart(erreur: UnicodeEncodeError) -> tuple:
+    """
+    Gestionnaire d'erreurs d'encodage (voir codecs.register_error) : note la suite de caractères
+    non encodables et la saute, pour que decaler_par_morceaux la traduise à part.
+    """
+    _ecarts.liste.append((erreur.start, erreur.end))
+    return '', erreur.end
+
+
+codecs.register_error(GESTIONNAIRE_ECARTS, noter_ecart)
+
+
+def decaler_latin1(octets: bytes, decalage: int) -> str:
+    """
+    Applique un décalage de César à un texte Latin-1 (donné encodé en Latin-1).
+
+    Lorsque l'image tient aussi en Latin-1, la traduction est faite par bytes.translate ; sinon par
+    codecs.charmap_decode (voir tables_charmap). Les deux traduisent tout le texte en C.
+
+    Args:
+        octets (bytes): Texte encodé en Latin-1.
+        decalage (int): Décalage à appliquer (+cle pour chiffrer, -cle pour déchiffrer).
+
+    Returns:
+        str: Texte décalé, de même longueur.
+    """
+    table, debordements = table_decalage_octets(decalage)
+    if not any(code in octets for code in debordements):
+        return octets.translate(table).decode('latin-1')
+    try:
+        return codecs.charmap_decode(octets, 'strict', tables_charmap(decalage)[0])[0]
+    except UnicodeDecodeError:
+        # Image égale à U+FFFE (très grande clé) : case vide pour charmap_decode
+        return octets.decode('latin-1').translate(table_decalage(decalage))
+
+
+def decaler_encodable(octets: bytes, decalage: int) -> str:
+    """
+    Termine la traduction d'un texte encodé avec la table d'encodage de tables_charmap.
+
+    Args:
+        octets (bytes): Texte encodé avec la table d'encodage (un octet par caractère).
+        decalage (int): Décalage appliqué.
+
+    Returns:
+        str: Texte décalé, de même longueur.
+    """
+    texte = octets.decode('latin-1')
+    if 0 in octets:
+        texte = texte.replace('\x00', chr(decalage % VALEUR_MAX_UNICODE))
+    return texte
+
+
+def decaler_par_morceaux(chaine: str, decalage: int) -> str:
+    """
+    Applique un décalage de César à un texte que ni decaler_latin1 ni decaler_encodable ne peuvent
+    traduire d'un bloc (ex : un '€' dans un texte accentué).
+
+    Le texte est encodé d'un bloc en sautant les quelques caractères qui l'empêchent (voir noter_ecart),
+    traduit en C, puis ces caractères, traduits par str.translate, sont remis à leur place. Des deux
+    encodages possibles (Latin-1 ou table d'encodage), celui qui saute le moins de suites est retenu.
+
+    Args:
+        chaine (str): Texte à transformer.
+        decalage (int): Décalage à appliquer (+cle pour chiffrer, -cle pour déchiffrer).
+
+    Returns:
+        str: Texte décalé.
+    """
+    _ecarts.liste = ecarts = []
+    octets = chaine.encode('latin-1', GESTIONNAIRE_ECARTS)
+    _ecarts.liste = ecarts_encodage = []
+    octets_encodage = codecs.charmap_encode(chaine, GESTIONNAIRE_ECARTS, tables_charmap(decalage)[1])[0]
+    del _ecarts.liste
+
+    if len(ecarts) <= len(ecarts_encodage):
+        bloc = decaler_latin1(octets, decalage)
+    else:
+        bloc, ecarts = decaler_encodable(octets_encodage, decalage), ecarts_encodage
+
+    # Le bloc ne contient pas les caractères sautés : ses indices sont décalés d'autant
+    table = table_decalage(decalage)
+    morceaux, debut_bloc, position = [], 0, 0
+    for debut, fin in ecarts:
+        fin_bloc = debut_bloc + debut - position
+        morceaux.append(bloc[debut_bloc:fin_bloc])
+        morceaux.append(chaine[debut:fin].translate(table))
+        debut_bloc, position = fin_bloc, fin
+    morceaux.append(bloc[debut_bloc:])
+    return ''.join(morceaux)
+
+
+def appliquer_decalage(chaine: str, decalage: int) -> str:
+    """
+    Applique un décalage de César à tout un texte, en une seule passe.
+
+    Le texte est traduit en C d'un seul bloc lorsqu'il tient en Latin-1 (voir decaler_latin1) ou
+    que son image y tient (décryptage d'un tel texte, voir tables_charmap) : c'est le cas des fichiers
+    utilisateurs, accentués ou non. Sinon, seuls les quelques caractères qui l'empêchent passent par
+    str.translate et une table mise en cache (voir decaler_par_morceaux).
+
+    Args:
+        chaine (str): Texte à transformer.
+        decalage (int): Décalage à appliquer (+cle pour chiffrer, -cle pour déchiffrer).
+
+    Returns:
+        str: Texte décalé, les caractères '\n' et '*' étant conservés.
+    """
+    try:
+        return decaler_latin1(chaine.encode('latin-1'), decalage)
+    except UnicodeEncodeError:
+        pass
+
+    try:
+        return decaler_encodable(codecs.charmap_encode(chaine, 'strict', tables_charmap(decalage)[1])[0], decalage)
+    except UnicodeEncodeError:
+        return decaler_par_morceaux(chaine, decalage)
+
+
 def cryptage(chaine: str, cle: int) -> str:
     """
     Chiffre une chaîne de caractères avec un décalage de César (décalage Unicode simple).
 
     Les caractères '\n' (saut de ligne) et '*' sont conservés pour éviter de briser
     la structure de fichiers multi-lignes ou à séparateurs. Ne gère que des caractères
-    standards (ASCII/Unicode simples).
+    standards (ASCII/Unicode simples). Le texte est traduit en une seule passe à l'aide
+    de tables de décalage mises en cache par clé (voir appliquer_decalage).
 
     Args:
         chaine (str): Texte à chiffrer.
@@ -26,13 +272,7 @@ def cryptage(chaine: str, cle: int) -> str:
     Returns:
         str: Texte chiffré avec décalage Unicode.
     """
-    crypte = ''
-    for char in chaine:
-        if char in caracteres_preserves:
-            crypte += char
-        else:
-            crypte += chr((ord(char) + cle) % 1114112)      # valeur max Unicode
-    return crypte
+    return appliquer_decalage(chaine, cle)
 
 
 def decryptage(chaine: str, cle: int) -> str:
@@ -40,7 +280,8 @@ def decryptage(chaine: str, cle: int) -> str:
     Décrypte une chaîne chiffrée à l'aide du chiffrement de César avec une clé donnée.
 
     Les caractères '\n' (saut de ligne) et '*' sont conservés pour ne pas altérer
-    la structure des fichiers cryptés.
+    la structure des fichiers cryptés. Le texte est traduit en une seule passe à l'aide
+    de tables de décalage mises en cache par clé (voir appliquer_decalage).
 
     Args:
         chaine (str): Texte chiffré à décrypter.
@@ -49,11 +290,32 @@ def decryptage(chaine: str, cle: int) -> str:
     Returns:
         str: Texte d'origine, reconstruit depuis la chaîne chiffrée.
     """
-    decrypte = ''
-    for char in chaine:
-        if char in caracteres_preserves:
-            decrypte += char
-        else:
-            decrypte += chr((ord(char) - cle) % 1114112)    # valeur max Unicode
-    return decrypte
+    return appliquer_decalage(chaine, -cle)
+
 
+def cryptage_octets(donnees: bytes, cle: int) -> bytes:
+    """
+    Chiffre des données binaires avec un décalage de César appliqué à chaque octet (modulo 256).
+
+    Args:
+        donnees (bytes): Données à chiffrer.
+        cle (int): Décalage à appliquer (valeur entière).
+
+    Returns:
+        bytes: Données chiffrées.
+    """
+    return donnees.translate(table_decalage_binaire(cle))
+
+
+def decryptage_octets(donnees: bytes, cle: int) -> bytes:
+    """
+    Décrypte des données binaires chiffrées par cryptage_octets.
+
+    Args:
+        donnees (bytes): Données chiffrées.
+        cle (int): Décalage (entier) à soustraire.
+
+    Returns:
+        bytes: Données d'origine.
+    """
+    return donnees.translate(table_decalage_binaire(-cle))
@@ -4,8 +4,25 @@
 #   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
 #   |-----Cryptage des fichiers utilisateurs-----|   #
 #   |--------------------------------------------|   #
+#
+# Usage (depuis src/) :
+#   python crypter_decrypter_fichier.py                          (choix interactif C/D)
+#   python crypter_decrypter_fichier.py --mode C --processus 8   (traitement par lots, reprise possible)
 # --Imports-- #
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from constantes import CLE_CRYPTAGE, DOSSIER_USERS
+from cryptage_decryptage import cryptage, cryptage_octets, decryptage, decryptage_octets
+from format_binaire import ENTETE_FICHIER, MAGIC_BINAIRE, VERSION_DONNEES
+from utils import chemin_journal
+
 # --Constantes-- #
+NOM_MANIFESTE = {'C': "manifeste_cryptage.txt", 'D': "manifeste_decryptage.txt"}
+
+
 # --Fonctions-- #
 def import_idents_clair(chemin_fichier: str) -> dict:
     """
@@ -34,75 +51,267 @@ def import_idents_clair(chemin_fichier: str) -> dict:
     return dic_ident_clair
 
 
-def crypter_fichier(path: str, cle: int) -> None:
+def transformer_binaire(contenu: bytes, cle: int, crypter: bool) -> bytes:
     """
-    Crypte le contenu d'un fichier texte à l'aide du chiffrement de César.
-    Le fichier est modifié directement (en l'écrasant).
+    Crypte ou décrypte le corps d'un fichier au format binaire (<identifiant>.bin, voir format_binaire).
+
+    L'en-tête (magic, version du format et, à partir de la version 2, version des données) reste en clair.
 
     Args:
-        path (str): Chemin vers le fichier à crypter.
+        contenu (bytes): Contenu du fichier.
         cle (int): Clé de décalage.
+        crypter (bool): True pour crypter, False pour décrypter.
+
+    Returns:
+        bytes: Contenu transformé.
+
+    Raises:
+        ValueError: Si le contenu n'est pas celui d'un fichier binaire.
     """
-    with open(path, 'r', encoding='utf-8') as fichier:
+    if len(contenu) < ENTETE_FICHIER.size or ENTETE_FICHIER.unpack_from(contenu)[0] != MAGIC_BINAIRE:
+        raise ValueError("En-tête de fichier binaire invalide.")
+    version = ENTETE_FICHIER.unpack_from(contenu)[1]
+    debut_corps = ENTETE_FICHIER.size + (VERSION_DONNEES.size if version >= 2 else 0)
+    corps = contenu[debut_corps:]
+    return contenu[:debut_corps] + (cryptage_octets(corps, cle) if crypter else decryptage_octets(corps, cle))
+
+
+def transformer_texte(contenu: bytes, cle: int, crypter: bool) -> bytes:
+    """
+    Crypte ou décrypte un fichier texte (UTF-8) : fichier d'identifiants, fichier utilisateur ou journal.
+
+    Une fin de fichier qui n'est pas de l'UTF-8 valide (entrée de journal coupée par une écriture
+    interrompue) est recopiée telle quelle : elle est de toute façon ignorée à la lecture du journal.
+
+    Args:
+        contenu (bytes): Contenu du fichier.
+        cle (int): Clé de décalage.
+        crypter (bool): True pour crypter, False pour décrypter.
+
+    Returns:
+        bytes: Contenu transformé.
+    """
+    try:
+        texte, reste = contenu.decode('utf-8'), b''
+    except UnicodeDecodeError as erreur:
+        texte, reste = contenu[:erreur.start].decode('utf-8'), contenu[erreur.start:]
+    texte = cryptage(texte, cle) if crypter else decryptage(texte, cle)
+    return texte.encode('utf-8') + reste
+
+
+def transformer_vers_temporaire(path: str, cle: int, crypter: bool) -> tuple:
+    """
+    Crypte ou décrypte un fichier vers un fichier temporaire voisin (path + '.tmp'),
+    sans toucher au fichier d'origine. Les fichiers .bin sont traités comme des fichiers binaires
+    (voir transformer_binaire), les autres comme des fichiers texte (voir transformer_texte).
+
+    Args:
+        path (str): Chemin vers le fichier à transformer.
+        cle (int): Clé de décalage.
+        crypter (bool): True pour crypter, False pour décrypter.
+
+    Returns:
+        tuple: (chemin du fichier temporaire, taille du fichier d'origine en octets)
+    """
+    with open(path, 'rb') as fichier:
         contenu = fichier.read()
 
-    contenu_crypte = cryptage(contenu, cle)
+    if path.endswith('.bin'):
+        contenu_transforme = transformer_binaire(contenu, cle, crypter)
+    else:
+        contenu_transforme = transformer_texte(contenu, cle, crypter)
+
+    chemin_temporaire = path + '.tmp'
+    with open(chemin_temporaire, 'wb') as fichier:
+        fichier.write(contenu_transforme)
+        fichier.flush()
+        os.fsync(fichier.fileno())
+    return chemin_temporaire, os.path.getsize(path)
 
-    with open(path, 'w', encoding='utf-8') as fichier:
-        fichier.write(contenu_crypte)
 
+def crypter_fichier(path: str, cle: int) -> None:
+    """
+    Crypte le contenu d'un fichier à l'aide du chiffrement de César.
+    Le fichier est remplacé d'un seul coup par sa version cryptée (via un fichier temporaire).
+
+    Args:
+        path (str): Chemin vers le fichier à crypter.
+        cle (int): Clé de décalage.
+    """
+    chemin_temporaire, _ = transformer_vers_temporaire(path, cle, crypter=True)
+    os.replace(chemin_temporaire, path)
 
 
 def decrypter_fichier(path: str, cle: int) -> None:
     """
-    Décrypte le contenu d’un fichier texte à l’aide du chiffrement de César.
-    Le fichier est modifié directement (en l’écrasant).
+    Décrypte le contenu d’un fichier à l’aide du chiffrement de César.
+    Le fichier est remplacé d'un seul coup par sa version décryptée (via un fichier temporaire).
 
     Args:
         path (str): Chemin vers le fichier à décrypter.
         cle (int): Clé de décalage inverse à appliquer.
     """
-    with open(path, 'r', encoding='utf-8') as fichier:
-        contenu = fichier.read()
+    chemin_temporaire, _ = transformer_vers_temporaire(path, cle, crypter=False)
+    os.replace(chemin_temporaire, path)
 
-    contenu_decrypte = decryptage(contenu, cle)
 
-    with open(path, 'w', encoding='utf-8') as fichier:
-        fichier.write(contenu_decrypte)
+def lister_fichiers(mode: str, chemin_ident: str = './ident.txt', dossier_users: str = DOSSIER_USERS) -> list:
+    """
+    Liste les fichiers à traiter et leur clé : les fichiers de chaque utilisateur (fichier texte,
+    fichier binaire et journal), puis le fichier d'identifiants.
+
+    Les clés personnelles sont lues dans ident_clair.txt pour un cryptage, dans ident.txt (crypté)
+    pour un décryptage. Le fichier d'identifiants est donc toujours traité en dernier : tant qu'il
+    ne l'est pas, les clés restent lisibles pour reprendre un traitement interrompu.
+    Un utilisateur sans fichier personnel (ni .txt ni .bin) est signalé.
+
+    Args:
+        mode (str): 'C' pour crypter, 'D' pour décrypter.
+        chemin_ident (str): Chemin du fichier d'identifiants crypté.
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
+
+    Returns:
+        list: Liste de tuples (chemin du fichier, clé).
+    """
+    from import_donnees import import_idents  # pour les identifiants cryptés
+
+    if mode == 'C':
+        dict_ident = import_idents_clair(os.path.join(os.path.dirname(chemin_ident), 'ident_clair.txt'))
+    else:
+        dict_ident = import_idents(chemin_ident)
+
+    fichiers = []
+    for ident, infos in dict_ident.items():
+        chemins = [os.path.join(dossier_users, f"{ident}.txt"), os.path.join(dossier_users, f"{ident}.bin"),
+                   chemin_journal(ident, dossier_users)]
+        if not any(os.path.exists(chemin) for chemin in chemins[:2]):
+            print(f"Fichier utilisateur absent : {chemins[0]} (ni .bin)")
+        fichiers.extend((chemin, infos[-1]) for chemin in chemins if os.path.exists(chemin))
+    fichiers.append((chemin_ident, CLE_CRYPTAGE))
+    return fichiers
+
+
+def lire_manifeste(chemin_manifeste: str) -> tuple:
+    """
+    Relit le manifeste d'un traitement par lots interrompu.
+
+    Le manifeste contient d'abord la liste des fichiers à traiter ('A_FAIRE*chemin'),
+    puis une ligne 'FAIT*chemin' par fichier terminé. Il ne contient aucune clé : elles sont relues
+    à la reprise (voir lister_fichiers).
+
+    Args:
+        chemin_manifeste (str): Chemin du manifeste.
+
+    Returns:
+        tuple: (liste des chemins à traiter, ensemble des chemins déjà traités)
+    """
+    chemins, faits = [], set()
+    with open(chemin_manifeste, 'r', encoding='utf-8') as manifeste:
+        for ligne in manifeste:
+            champs = ligne.rstrip('\n').split('*')
+            if champs[0] == 'A_FAIRE' and len(champs) == 2:
+                chemins.append(champs[1])
+            elif champs[0] == 'FAIT' and len(champs) == 2:
+                faits.add(champs[1])
+    return chemins, faits
+
+
+def traitement_par_lots(mode: str, nb_processus: int = None, chemin_ident: str = './ident.txt',
+                        dossier_users: str = DOSSIER_USERS) -> None:
+    """
+    Crypte ou décrypte en parallèle le fichier d'identifiants et tous les fichiers utilisateurs.
+
+    Chaque fichier utilisateur est transformé dans un processus du pool vers un fichier temporaire.
+    Le processus principal note ensuite le fichier comme terminé dans le manifeste, puis remplace
+    l'original par le fichier temporaire (os.replace). Le fichier d'identifiants, qui contient les clés,
+    n'est transformé qu'une fois tous les autres terminés. Si le traitement est interrompu, relancer
+    la même commande le reprend : les fichiers notés dans le manifeste ne sont pas transformés une
+    seconde fois (un fichier noté mais pas encore remplacé l'est à la reprise), et les clés des autres
+    sont relues dans le fichier d'identifiants. Le manifeste est supprimé à la fin.
+
+    Args:
+        mode (str): 'C' pour crypter, 'D' pour décrypter.
+        nb_processus (int): Nombre de processus (None : nombre de CPU).
+        chemin_ident (str): Chemin du fichier d'identifiants crypté.
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
+
+    Returns:
+        None
+    """
+    chemin_manifeste = os.path.join(dossier_users, NOM_MANIFESTE[mode])
+    if os.path.exists(chemin_manifeste):
+        chemins, faits = lire_manifeste(chemin_manifeste)
+        print(f"Reprise du traitement interrompu : {len(faits)}/{len(chemins)} fichiers déjà traités.")
+        # Fichiers notés comme terminés mais dont le remplacement n'a pas eu lieu
+        for chemin in faits:
+            if os.path.exists(chemin + '.tmp'):
+                os.replace(chemin + '.tmp', chemin)
+        # Le fichier d'identifiants n'est transformé qu'en dernier : tant qu'il reste à faire, les clés y sont lisibles
+        cles = dict(lister_fichiers(mode, chemin_ident, dossier_users)) if len(faits) < len(chemins) else {}
+        fichiers = []
+        for chemin in chemins:
+            if chemin not in faits and chemin not in cles:
+                print(f"Clé introuvable, fichier ignoré : {chemin}")
+            else:
+                fichiers.append((chemin, cles.get(chemin)))
+    else:
+        fichiers, faits = lister_fichiers(mode, chemin_ident, dossier_users), set()
+        with open(chemin_manifeste, 'w', encoding='utf-8') as manifeste:
+            manifeste.writelines(f"A_FAIRE*{chemin}\n" for chemin, _ in fichiers)
+
+    a_traiter = [(chemin, cle) for chemin, cle in fichiers if chemin not in faits]
+    nb_total, nb_faits, octets = len(fichiers), len(faits), 0
+    debut = time.perf_counter()
+
+    with open(chemin_manifeste, 'a', encoding='utf-8') as manifeste:
+        def terminer(chemin: str, chemin_temporaire: str, taille: int) -> None:
+            nonlocal nb_faits, octets
+            # Le fichier est noté comme terminé avant d'être remplacé (voir la reprise ci-dessus)
+            manifeste.write(f"FAIT*{chemin}\n")
+            manifeste.flush()
+            os.fsync(manifeste.fileno())
+            os.replace(chemin_temporaire, chemin)
+
+            nb_faits += 1
+            octets += taille
+            duree = time.perf_counter() - debut
+            print(f"\r[{nb_faits}/{nb_total}] {nb_faits * 100 // nb_total} % - "
+                  f"{octets / 1e6 / duree if duree else 0:.1f} Mo/s", end='', flush=True)
+
+        with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+            taches = {pool.submit(transformer_vers_temporaire, chemin, cle, mode == 'C'): chemin
+                      for chemin, cle in a_traiter if chemin != chemin_ident}
+            for tache in as_completed(taches):
+                terminer(taches[tache], *tache.result())
+
+        for chemin, cle in a_traiter:
+            if chemin == chemin_ident:
+                terminer(chemin, *transformer_vers_temporaire(chemin, cle, mode == 'C'))
+
+    os.remove(chemin_manifeste)
+    print(f"\n{len(a_traiter)} fichiers traités en {time.perf_counter() - debut:.2f} s.")
 
 
 # --Programme principal-- #
 if __name__ == '__main__':
-    from constantes import CLE_CRYPTAGE
-    from cryptage_decryptage import cryptage, decryptage
-    from import_donnees import import_idents  # pour les identifiants cryptés
+    parseur = argparse.ArgumentParser(description="Cryptage / décryptage de ident.txt et des fichiers utilisateurs.")
+    parseur.add_argument('--mode', choices=['C', 'D'], help="C pour crypter, D pour décrypter "
+                                                            "(demandé au clavier s'il est absent)")
+    parseur.add_argument('--processus', type=int, default=None, help="nombre de processus (défaut : nombre de CPU)")
+    parseur.add_argument('--dossier-users', default=DOSSIER_USERS)
+    arguments = parseur.parse_args()
 
-    choix = input("Souhaitez-vous crypter ou décrypter ? (C/D) : ").strip().upper()
+    choix = arguments.mode or input("Souhaitez-vous crypter ou décrypter ? (C/D) : ").strip().upper()
 
     if choix == 'C':
         print("Cryptage en cours...")
-        dict_ident_clair = import_idents_clair('./ident_clair.txt')
-        liste_ident = list(dict_ident_clair.keys())
-
-        crypter_fichier('./ident.txt', cle=CLE_CRYPTAGE)
-        for ident in liste_ident:
-            cle_perso = dict_ident_clair[ident][-1]
-            crypter_fichier(f'../users/{ident}.txt', cle=cle_perso)
-
+        traitement_par_lots('C', arguments.processus, dossier_users=arguments.dossier_users)
         print("Tous les fichiers ont été cryptés avec succès.")
 
     elif choix == 'D':
         print("Décryptage en cours...")
-        dict_ident = import_idents('./ident.txt')
-        liste_ident = list(dict_ident.keys())
-
-        decrypter_fichier('./ident.txt', cle=CLE_CRYPTAGE)
-        for ident in liste_ident:
-            cle_perso = dict_ident[ident][-1]
-            decrypter_fichier(f'../users/{ident}.txt', cle=cle_perso)
-
+        traitement_par_lots('D', arguments.processus, dossier_users=arguments.dossier_users)
         print("Tous les fichiers ont été décryptés avec succès.")
 
     else:
         print("Choix invalide. Veuillez entrer 'C' pour crypter ou 'D' pour décrypter.")
-
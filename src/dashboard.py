@@ -6,15 +6,16 @@
 #   |---------------Fenêtre de bord--------------|   #
 #   |--------------------------------------------|   #
 # --Imports-- #
-from comptes import calcul_dict_soldes, selection_compte
-from import_donnees import import_comptes, import_operations
-from shared import saisir_choix, dict_ident
+from comptes import selection_compte
+from montants import formater_montant
+from session import SessionUtilisateur
+from shared import saisir_choix
 
 # --Constantes-- #
 
 
 # --Fonctions-- #
-def fenetre_bord(identifiant: str) -> int:
+def fenetre_bord(session: SessionUtilisateur) -> int:
     """
     Affiche un tableau de bord récapitulatif à l'utilisateur et lui propose de choisir la prochaine phase.
 
@@ -27,22 +28,19 @@ def fenetre_bord(identifiant: str) -> int:
         - 1 : Accéder à la gestion des comptes
         - 2 : Accéder à la gestion des budgets
 
+    Les soldes sont lus dans la session (déjà chargée), sans relecture du fichier utilisateur.
+
     Args:
-        identifiant (int): Identifiant de l'utilisateur connecté, utilisé pour accéder à ses données personnelles.
+        session (SessionUtilisateur): Session de l'utilisateur connecté.
 
     Returns:
         int: Le choix effectué par l'utilisateur (0, 1 ou 2)
     """
-    cle_cryptage = dict_ident[identifiant][-1]
-    lst_cpt = import_comptes(chemin_fichier=f'../users/{identifiant}.txt', cle=cle_cryptage)
-    lst_ope = import_operations(chemin_fichier=f'../users/{identifiant}.txt', cle=cle_cryptage)
-    dict_soldes = calcul_dict_soldes(lst_cpt, lst_ope)
-    nom = dict_ident[identifiant][1]
     # selection_compte(lst_cpt) renvoie le compte courant, car courant=True par défaut
-    solde_courant = dict_soldes[selection_compte(lst_cpt)]
+    solde_courant = session.solde(selection_compte(session.lst_cpt))
     print(f"\n|-----Tableau de bord-----|\n"
-          f"| Bonjour {nom} |\n"
-          f"| Vous avez {solde_courant:.2f} € sur votre compte |")
+          f"| Bonjour {session.nom} |\n"
+          f"| Vous avez {formater_montant(solde_courant)} € sur votre compte |")
 
     print("\nBienvenue. De quelle fonctionnalité avez-vous besoin ?")
     print("0. Déconnexion\n"
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+#   format_binaire.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |--Format binaire des fichiers utilisateurs--|   #
+#   |--------------------------------------------|   #
+# Usage du convertisseur (depuis src/) :
+#   python format_binaire.py --vers binaire [identifiant ...]
+#   python format_binaire.py --vers texte [identifiant ...]
+#
+# Structure d'un fichier <identifiant>.bin (version 2) :
+#   - en clair : 'GBIN' + version du format (2 octets) + version des données (8 octets, voir lire_version_binaire)
+#   - chiffré (voir cryptage_octets) : corps + sha256(corps) (32 octets)
+# Le corps contient, dans l'ordre :
+#   - les effectifs (ENTETE_CORPS) : taille de la table des libellés, nombre de comptes, d'opérations, de budgets
+#   - la table des libellés : tous les libellés distincts (comptes, opérations, modes, budgets) en UTF-8,
+#     séparés par '\n' (caractère interdit dans les champs du format texte)
+#   - les comptes : un indice de libellé (4 octets) par compte
+#   - les opérations : enregistrements de taille fixe (OPERATION)
+#   - les budgets : enregistrements de taille fixe (BUDGET)
+# Les fichiers de version 1 (sans version des données) restent lisibles.
+# --Imports-- #
+import datetime
+import hashlib
+import os
+import struct
+
+from cryptage_decryptage import cryptage_octets, decryptage_octets
+from modeles import Budget, Operation
+from symboles import TableSymboles
+
+# --Constantes-- #
+MAGIC_BINAIRE = b'GBIN'
+VERSION_BINAIRE = 2
+VERSIONS_LISIBLES = (1, 2)
+ENTETE_FICHIER = struct.Struct('<4sH')          # magic, version du format
+VERSION_DONNEES = struct.Struct('<Q')           # version des données (à partir de la version 2 du format)
+ENTETE_CORPS = struct.Struct('<IIII')           # taille des libellés, nb comptes, nb opérations, nb budgets
+COMPTE = struct.Struct('<I')                    # indice du nom
+# date (ordinal), montant (centimes), libellé, compte, mode, état, budget
+OPERATION = struct.Struct('<iqIII?I')
+BUDGET = struct.Struct('<IqI')                  # nom, montant (centimes), compte
+TAILLE_HASH = 32
+
+
+# --Fonctions-- #
+def serialiser_binaire(lst_cpt: list, lst_ope: list, lst_bud: list, cle: int, version: int = 1) -> tuple:
+    """
+    Construit le contenu d'un fichier utilisateur au format binaire (voir l'en-tête du module).
+
+    Args:
+        lst_cpt (list): Liste des comptes.
+        lst_ope (list): Liste des opérations (voir modeles.Operation).
+        lst_bud (list): Liste des budgets (voir modeles.Budget).
+        cle (int): Clé de chiffrement de l'utilisateur.
+        version (int): Version des données, incrémentée à chaque réécriture du fichier.
+
+    Returns:
+        tuple: (contenu du fichier (bytes), hash du corps en clair (str))
+    """
+    # Chaque libellé distinct est écrit une seule fois, puis désigné par son code
+    symboles = TableSymboles()
+    indice = symboles.coder
+
+    comptes = b''.join(COMPTE.pack(indice(compte)) for compte in lst_cpt)
+    operations = b''.join(OPERATION.pack(operation.date.toordinal(),
+                                         operation.montant,
+                                         indice(operation.libelle),
+                                         indice(operation.compte),
+                                         indice(operation.mode),
+                                         operation.passee,
+                                         indice(operation.budget))
+                          for operation in lst_ope)
+    budgets = b''.join(BUDGET.pack(indice(budget.nom), budget.montant, indice(budget.compte))
+                       for budget in lst_bud)
+    libelles = '\n'.join(symboles.libelles).encode('utf-8')
+
+    corps = b''.join((ENTETE_CORPS.pack(len(libelles), len(lst_cpt), len(lst_ope), len(lst_bud)),
+                      libelles, comptes, operations, budgets))
+    empreinte = hashlib.sha256(corps)
+    contenu = b''.join((ENTETE_FICHIER.pack(MAGIC_BINAIRE, VERSION_BINAIRE), VERSION_DONNEES.pack(version),
+                        cryptage_octets(corps + empreinte.digest(), cle)))
+    return contenu, empreinte.hexdigest()
+
+
+def deserialiser_binaire(contenu: bytes, cle: int) -> tuple | None:
+    """
+    Décrypte, vérifie et décode le contenu d'un fichier utilisateur au format binaire.
+
+    Les opérations sont décodées par struct.iter_unpack, sans analyse de texte ; chaque date
+    distincte n'est construite qu'une fois.
+
+    Args:
+        contenu (bytes): Contenu du fichier.
+        cle (int): Clé de décryptage de l'utilisateur.
+
+    Returns:
+        tuple | None: ((liste_comptes, liste_operations, liste_budgets), hash du corps en clair),
+                      ou None si le fichier n'est pas au bon format, est altéré ou corrompu.
+    """
+    if len(contenu) < ENTETE_FICHIER.size + ENTETE_CORPS.size + TAILLE_HASH:
+        return None
+    magic, version = ENTETE_FICHIER.unpack_from(contenu)
+    if magic != MAGIC_BINAIRE or version not in VERSIONS_LISIBLES:
+        print(f"Format de fichier binaire inconnu (version {version}).")
+        return None
+
+    debut_chiffre = ENTETE_FICHIER.size + (VERSION_DONNEES.size if version >= 2 else 0)
+    donnees = decryptage_octets(contenu[debut_chiffre:], cle)
+    corps, hash_attendu = memoryview(donnees)[:-TAILLE_HASH], donnees[-TAILLE_HASH:]
+    empreinte = hashlib.sha256(corps)
+    if empreinte.digest() != hash_attendu:
+        return None
+
+    taille_libelles, nb_comptes, nb_ope, nb_bud = ENTETE_CORPS.unpack_from(corps)
+    position = ENTETE_CORPS.size
+    fin_attendue = (position + taille_libelles + nb_comptes * COMPTE.size
+                    + nb_ope * OPERATION.size + nb_bud * BUDGET.size)
+    if fin_attendue != len(corps):
+        return None
+
+    libelles = str(corps[position:position + taille_libelles], 'utf-8').split('\n')
+    position += taille_libelles
+
+    liste_comptes = [libelles[code]
+                     for (code,) in COMPTE.iter_unpack(corps[position:position + nb_comptes * COMPTE.size])]
+    position += nb_comptes * COMPTE.size
+
+    dates = {}
+    fromordinal = datetime.date.fromordinal
+    liste_ope = []
+    for ordinal, montant, libelle, compte, mode, etat, budget in OPERATION.iter_unpack(
+            corps[position:position + nb_ope * OPERATION.size]):
+        date = dates.get(ordinal)
+        if date is None:
+            date = dates[ordinal] = fromordinal(ordinal)
+        liste_ope.append(Operation(date, libelles[libelle], libelles[compte], montant, libelles[mode], etat,
+                                   libelles[budget]))
+    position += nb_ope * OPERATION.size
+
+    liste_bud = [Budget(libelles[nom], montant, libelles[compte])
+                 for nom, montant, compte in BUDGET.iter_unpack(corps[position:])]
+
+    return (liste_comptes, liste_ope, liste_bud), empreinte.hexdigest()
+
+
+def est_au_format_binaire(identifiant: str, dossier_users: str) -> bool:
+    """Renvoie True si le fichier personnel de l'utilisateur est au format binaire (<identifiant>.bin)."""
+    return os.path.exists(os.path.join(dossier_users, f"{identifiant}.bin"))
+
+
+def lire_version_binaire(chemin_fichier: str) -> int:
+    """
+    Lit la version des données d'un fichier binaire dans son en-tête, sans lire ni décrypter le corps.
+
+    Args:
+        chemin_fichier (str): Chemin du fichier (ex: users/12345678.bin).
+
+    Returns:
+        int: Version des données, 0 pour un fichier de version 1 du format, absent ou illisible.
+    """
+    try:
+        with open(chemin_fichier, 'rb') as fichier:
+            entete = fichier.read(ENTETE_FICHIER.size + VERSION_DONNEES.size)
+    except OSError:
+        return 0
+    if len(entete) < ENTETE_FICHIER.size + VERSION_DONNEES.size:
+        return 0
+    magic, version = ENTETE_FICHIER.unpack_from(entete)
+    if magic != MAGIC_BINAIRE or version < 2:
+        return 0
+    return VERSION_DONNEES.unpack_from(entete, ENTETE_FICHIER.size)[0]
+
+
+def lire_fichier_binaire(chemin_fichier: str, cle: int) -> tuple | None:
+    """
+    Lit un fichier utilisateur au format binaire (voir deserialiser_binaire).
+
+    Args:
+        chemin_fichier (str): Chemin du fichier (ex: users/12345678.bin).
+        cle (int): Clé de décryptage de l'utilisateur.
+
+    Returns:
+        tuple | None: ((liste_comptes, liste_operations, liste_budgets), hash du fichier),
+                      ou None si le fichier est altéré, corrompu ou illisible.
+    """
+    try:
+        with open(chemin_fichier, 'rb') as fichier:
+            return deserialiser_binaire(fichier.read(), cle)
+    except Exception as e:
+        print(f"Erreur pendant la lecture du fichier binaire : {e}")
+        return None
+
+
+# --Programme principal-- #
+if __name__ == '__main__':
+    import argparse
+
+    from constantes import DOSSIER_USERS, FORMAT_BINAIRE, FORMAT_TEXTE
+    from import_donnees import import_donnees_utilisateur
+    from shared import dict_ident
+    from utils import enregistrement_modif, lire_version_fichier
+    from verrou_utilisateur import VerrouUtilisateur
+
+    parseur = argparse.ArgumentParser(description="Conversion des fichiers utilisateurs entre les formats texte et binaire.")
+    parseur.add_argument('--vers', choices=[FORMAT_BINAIRE, FORMAT_TEXTE], required=True)
+    parseur.add_argument('--dossier-users', default=DOSSIER_USERS)
+    parseur.add_argument('identifiants', nargs='*', help="identifiants à convertir (défaut : tous)")
+    arguments = parseur.parse_args()
+
+    for identifiant in arguments.identifiants or list(dict_ident):
+        cle = dict_ident[identifiant][2]
+        # Le fichier (quel que soit son format) et son journal sont relus puis réécrits dans le format demandé,
+        # sous le verrou d'écriture : une session ouverte en même temps verra la nouvelle version des données
+        with VerrouUtilisateur(identifiant, arguments.dossier_users):
+            lst_cpt, lst_ope, lst_bud, (hash_fichier, *_) = import_donnees_utilisateur(
+                identifiant, cle, dossier_users=arguments.dossier_users)
+            if hash_fichier is None:
+                print(f"{identifiant} : fichier absent, altéré ou corrompu, non converti.")
+                continue
+            if enregistrement_modif(lst_cpt, lst_ope, lst_bud, identifiant, cle,
+                                    dossier_users=arguments.dossier_users, format_fichier=arguments.vers,
+                                    version=lire_version_fichier(identifiant, cle, arguments.dossier_users) + 1):
+                print(f"{identifiant} : converti au format {arguments.vers}.")
@@ -10,9 +10,9 @@ import calendar
 import locale
 
 from budgets import *
-from import_donnees import import_comptes, import_operations, import_budgets
-from shared import dict_ident, saisie_oui_non, saisir_date
-from utils import enregistrement_modif
+from montants import formater_montant
+from session import SessionUtilisateur
+from shared import saisie_oui_non, saisir_date
 
 try:
     locale.setlocale(locale.LC_TIME, 'French_France.1252')
@@ -45,7 +45,7 @@ def afficher_menu_g_budgets() -> None:
           "4. Afficher différence dépenses/budget\n")
 
 
-def gestion_budgets(identifiant: int) -> None:
+def gestion_budgets(session: SessionUtilisateur) -> None:
     """
     Gère toutes les interactions liées à la gestion des budgets de l'utilisateur connecté.
 
@@ -56,19 +56,17 @@ def gestion_budgets(identifiant: int) -> None:
     - Consulter un rapport mensuel des dépenses pour un budget donné
 
     Chaque action est répétable via des boucles interactives.
-    Toutes les modifications sont automatiquement sauvegardées dans le fichier utilisateur (avec chiffrement).
+    Les modifications sont automatiquement sauvegardées dans le fichier utilisateur (avec chiffrement) ;
+    les consultations seules ne déclenchent aucune écriture.
 
     Args:
-        identifiant (int): Identifiant de l'utilisateur connecté (utilisé pour accéder à ses données personnelles).
+        session (SessionUtilisateur): Session de l'utilisateur connecté.
 
     Returns:
         None
     """
-    cle_cryptage = dict_ident[identifiant][-1]
-    lst_cpt = import_comptes(chemin_fichier=f'../users/{identifiant}.txt', cle=cle_cryptage)
-    lst_ope = import_operations(chemin_fichier=f'../users/{identifiant}.txt', cle=cle_cryptage)
-    lst_bud = import_budgets(chemin_fichier=f'../users/{identifiant}.txt', cle=cle_cryptage)
-    nom = dict_ident[identifiant][1]
+    lst_cpt, lst_bud = session.lst_cpt, session.lst_bud
+    nom = session.nom
 
     choix = -1
     while choix != 0:
@@ -79,20 +77,22 @@ def gestion_budgets(identifiant: int) -> None:
             case 1:  # Afficher les budgets
                 print(f"|-----Affichage des budgets de {nom} -----|")
                 print("\n".join(
-                    f"- {budget[0]} : {budget[1]}€ associé au compte : {budget[2]}" for budget in lst_bud))
+                    f"- {budget[0]} : {formater_montant(budget[1])}€ associé au compte : {budget[2]}"
+                    for budget in lst_bud))
             case 2:  # Ajouter un budget
                 afficher = True
                 while afficher or saisie_oui_non("Souhaitez-vous ajouter un autre budget ? (O/N) : "):
                     afficher = False
                     print("|-----Ajout d'un budget-----|")
                     budget = creation_budget(lst_cpt, lst_bud)
-                    ajout_budget(lst_bud, budget)
+                    session.ajouter_budget(budget)
             case 3:  # Modifier un budget
                 afficher = True
                 while afficher or saisie_oui_non("Souhaitez-vous modifier un autre budget ? (O/N) : "):
                     afficher = False
                     print("|-----Modification d'un budget-----|")
                     modifier_budget(lst_bud, lst_cpt)
+                    session.marquer_budgets_modifies()
             case 4:  # Rapport dépense budget
                 afficher = True
                 while afficher or saisie_oui_non("Souhaitez-vous consulter un autre rapport ? (O/N) : "):
@@ -100,12 +100,14 @@ def gestion_budgets(identifiant: int) -> None:
                     print("|-----Rapport dépenses / budget-----|")
                     budget = selection_budget(lst_bud)
                     mois_annee = saisir_date(day=False)
-                    rapport = rapport_bud_depenses(budget, lst_ope, mois_annee)
+                    rapport = session.rapport_budget(budget, mois_annee)
                     print(f"Pour le budget {budget[0]} au mois de "
                           f"{calendar.month_name[mois_annee.month].capitalize()} {mois_annee.year}, "
                           f"vous avez utilisé {(rapport * 100):.2f} % de votre budget.\n"
-                          f"Dépense / budget :\n {rapport * budget[1]:.2f}€ / {budget[1]}€")
+                          f"Dépense / budget :\n {formater_montant(round(rapport * budget[1]))}€ / "
+                          f"{formater_montant(budget[1])}€")
 
-        enregistrement_modif(lst_cpt, lst_ope, lst_bud, identifiant, cle_cryptage)
-        print("Données enregistrées dans la base de données avec succès.")
+        # Enregistrement uniquement en cas de modification (forcé en quittant le menu)
+        if session.enregistrer(forcer=choix == 0):
+            print("Données enregistrées dans la base de données avec succès.")
 
@@ -7,9 +7,9 @@
 #   |--------------------------------------------|   #
 # --Imports-- #
 from comptes import *
-from import_donnees import *
-from shared import saisir_choix, saisie_oui_non, dict_ident
-from utils import enregistrement_modif
+from montants import formater_montant
+from session import SessionUtilisateur
+from shared import saisir_choix, saisie_oui_non
 
 # --Constantes-- #
 
@@ -41,7 +41,7 @@ def afficher_menu_g_comptes() -> None:
           "5. Faire un virement\n")
 
 
-def gestion_comptes(identifiant: int) -> None:
+def gestion_comptes(session: SessionUtilisateur) -> None:
     """
     Gère toutes les interactions liées à la gestion des comptes bancaires d'un utilisateur.
 
@@ -53,20 +53,17 @@ def gestion_comptes(identifiant: int) -> None:
     - Effectuer un virement entre deux comptes
 
     Chaque fonctionnalité est réutilisable grâce à une boucle interactive.
-    Toutes les modifications sont automatiquement enregistrées dans le fichier utilisateur
-    (avec chiffrement) après chaque action.
+    Les données et les soldes sont ceux de la session (aucune relecture du fichier) ;
+    les modifications sont automatiquement enregistrées dans le fichier utilisateur (avec chiffrement),
+    les consultations seules ne déclenchent aucune écriture.
 
     Args:
-        identifiant (int): Identifiant de l'utilisateur connecté (utilisé pour accéder à ses données chiffrées).
+        session (SessionUtilisateur): Session de l'utilisateur connecté.
 
     Returns:
         None
     """
-    cle_cryptage = dict_ident[identifiant][-1]
-    lst_cpt = import_comptes(chemin_fichier=f'../users/{identifiant}.txt', cle=cle_cryptage)
-    lst_ope = import_operations(chemin_fichier=f'../users/{identifiant}.txt', cle=cle_cryptage)
-    lst_bud = import_budgets(chemin_fichier=f'../users/{identifiant}.txt', cle=cle_cryptage)
-    dict_soldes = calcul_dict_soldes(lst_cpt, lst_ope)
+    lst_cpt, lst_bud = session.lst_cpt, session.lst_bud
 
     choix = -1
     while choix != 0:
@@ -80,9 +77,9 @@ def gestion_comptes(identifiant: int) -> None:
                 while afficher or saisie_oui_non("Souhaitez-vous consulter le solde d’un autre compte ? (O/N) : "):
                     afficher = False
                     choix_compte = selection_compte(lst_cpt, courant=False)
-                    solde = dict_soldes[choix_compte]
+                    solde = session.solde(choix_compte)
                     print(f"\n|-----Solde d'un compte-----|\n"
-                          f"| Vous avez {solde:.2f} € sur votre compte \"{choix_compte}\" |")
+                          f"| Vous avez {formater_montant(solde)} € sur votre compte \"{choix_compte}\" |")
 
             case 2:  # Ajout compte
                 afficher = True
@@ -90,11 +87,11 @@ def gestion_comptes(identifiant: int) -> None:
                     afficher = False
                     print("|-----Ajout de compte-----|")
                     nouveau_compte = input("Quel est le nom du nouveau compte ? : ")
-                    succes_ajout = ajout_compte(lst_cpt, nouveau_compte.title())
+                    succes_ajout = session.ajouter_compte(nouveau_compte.title())
                     if succes_ajout and saisie_oui_non("Souhaitez-vous charger le solde initial ? (O/N) : "):
-                        virement_solde_init = creer_virement(lst_cpt, dict_soldes, is_nouveau_compte=True,
+                        virement_solde_init = creer_virement(lst_cpt, session.dict_soldes, is_nouveau_compte=True,
                                                              nouveau_compte=nouveau_compte.title())
-                        ajout_virement(virement_solde_init, lst_ope, dict_soldes)
+                        session.ajouter_virement(virement_solde_init)
 
             case 3:  # Afficher les opérations d'un compte
                 afficher = True
@@ -103,7 +100,7 @@ def gestion_comptes(identifiant: int) -> None:
                     print("|-----Affichage des opérations d'un compte-----|")
                     compte = selection_compte(lst_cpt, courant=False)
                     filtrer = saisie_oui_non("Voulez-vous filtrer les opérations entre deux dates ? (O/N) : ")
-                    afficher_operations(lst_ope, compte, filtre_date=filtrer)
+                    afficher_operations(session.index, compte, filtre_date=filtrer)
 
             case 4:  # Ajouter une opération
                 afficher = True
@@ -111,7 +108,7 @@ def gestion_comptes(identifiant: int) -> None:
                     afficher = False
                     print("|-----Ajout d'opération-----|")
                     operation = creation_operation(lst_cpt, lst_bud)
-                    ajout_operation(lst_ope, operation)
+                    session.ajouter_operation(operation)
                     print(f"Opération :\n{formatter_operation(operation)}\najoutée avec succès.")
 
             case 5:  # Effectuer un virement entre comptes
@@ -119,10 +116,10 @@ def gestion_comptes(identifiant: int) -> None:
                 while afficher or saisie_oui_non("Souhaitez-vous effectuer un autre virement ? (O/N) : "):
                     afficher = False
                     print("|-----Virement compte A -> compte B-----|")
-                    nouveau_virement = creer_virement(lst_cpt, dict_soldes)
-                    ajout_virement(nouveau_virement, lst_ope, dict_soldes)
+                    nouveau_virement = creer_virement(lst_cpt, session.dict_soldes)
+                    session.ajouter_virement(nouveau_virement)
 
-        lst_ope = sorted(lst_ope, key=lambda ope: ope[0])  # Trie chronologiquement les opérations avant enregistrement
-        enregistrement_modif(lst_cpt, lst_ope, lst_bud, identifiant, cle_cryptage)
-        print("Données enregistrées dans la base de données avec succès.")
+        # Enregistrement uniquement en cas de modification (forcé en quittant le menu)
+        if session.enregistrer(forcer=choix == 0):
+            print("Données enregistrées dans la base de données avec succès.")
 
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+#   historique.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |---Historique des opérations (paresseux)----|   #
+#   |--------------------------------------------|   #
+# L'historique d'un fichier utilisateur au format texte (<identifiant>.txt) est accompagné d'un index
+# <identifiant>.hist, construit lors de la première ouverture puis réutilisé tant que le fichier ne
+# change pas : l'index est lié au sha256 du contenu brut du fichier, recalculé (en flux) à chaque
+# ouverture. Un fichier modifié, même sans changer de taille ni de date de modification, est donc
+# revérifié (ligne 'HASH*') avant qu'un nouvel index soit construit.
+# Structure de l'index (version 2, ordre des octets de la machine : c'est un cache local, reconstruit au besoin) :
+#   - l'en-tête en clair (ENTETE)
+#   - chiffré comme le format binaire (voir cryptage_decryptage.cryptage_octets) :
+#       - le hash du contenu du fichier (ligne 'HASH*', 32 octets)
+#       - pour chaque opération, dans l'ordre chronologique : sa position dans le fichier (8 octets)
+#       - pour chaque compte : son solde et son solde des opérations passées, en centimes (point de reprise)
+#       - la position de chaque ligne 'CPT', 'BUD' et 'SOL' du fichier (8 octets)
+#       - pour chaque opération, dans l'ordre chronologique : sa date (ordinal, 4 octets)
+#       - pour chaque opération, dans l'ordre chronologique : l'indice de son compte (2 octets)
+#       - les noms des comptes en UTF-8, séparés par '\n'
+# --Imports-- #
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right, insort_right
+
+from constantes import TAILLE_BLOC_LECTURE
+from cryptage_decryptage import cryptage_octets, decryptage, decryptage_octets
+from index_operations import date_operation
+from instrumentation import chronometre, compter, mesurer
+from modeles import Operation
+from parseur import ParseurEnregistrements
+from points_reprise import PointsReprise
+from symboles import TableSymboles
+from utils import LectureVerifiee
+
+# --Constantes-- #
+MAGIC_HISTORIQUE = b'GBHI'
+VERSION_HISTORIQUE = 2
+# magic, version, sha256 du contenu brut (chiffré) du fichier, nombre d'opérations, nombre de comptes,
+# nombre de lignes 'CPT'/'BUD'/'SOL', taille de la table des comptes
+ENTETE = struct.Struct('=4sI32sQIIQ')
+TAILLE_HASH = 32
+
+
+# --Fonctions-- #
+def chemin_historique(chemin_fichier: str) -> str:
+    """Renvoie le chemin de l'index d'historique d'un fichier utilisateur (ex : users/123.txt → users/123.hist)."""
+    return os.path.splitext(chemin_fichier)[0] + '.hist'
+
+
+def _lignes_avec_positions(memoire: mmap.mmap, cle: int):
+    """Parcourt un fichier chiffré ouvert en mmap, bloc par bloc : produit (position en octets, ligne décryptée)."""
+    taille = len(memoire)
+    position = 0
+    while position < taille:
+        # Le bloc s'arrête sur une fin de ligne : aucun caractère UTF-8 n'est coupé en deux
+        fin = memoire.find(b'\n', min(position + TAILLE_BLOC_LECTURE, taille - 1))
+        fin = taille if fin == -1 else fin + 1
+        bloc = memoire[position:fin]
+        debut = position
+        # Le chiffrement préserve '\n' : lignes chiffrées et décryptées se correspondent une à une
+        for brute, ligne in zip(bloc.split(b'\n'), decryptage(bloc.decode('utf-8'), cle=cle).split('\n')):
+            yield debut, ligne
+            debut += len(brute) + 1
+        position = fin
+
+
+@chronometre()
+def construire_historique(chemin_fichier: str, cle: int, chemin_index: str = None) -> bool:
+    """
+    Construit l'index d'historique d'un fichier utilisateur au format texte (voir l'en-tête du module).
+
+    Le fichier est d'abord vérifié en flux (voir utils.LectureVerifiee), puis parcouru une seconde fois
+    pour relever la position de chaque ligne, la date et le compte de chaque opération, et les soldes
+    de chaque compte. C'est le seul moment où toutes les opérations sont décodées. L'index est chiffré
+    avec la clé de l'utilisateur : ni les comptes ni les soldes n'y apparaissent en clair.
+
+    Args:
+        chemin_fichier (str): Chemin du fichier utilisateur (ex: users/12345678.txt).
+        cle (int): Clé de décryptage de l'utilisateur.
+        chemin_index (str, optional): Chemin de l'index à écrire (par défaut : voir chemin_historique).
+
+    Returns:
+        bool: True si l'index a été écrit, False si le fichier est altéré ou corrompu.
+    """
+    chemin_index = chemin_index or chemin_historique(chemin_fichier)
+
+    lecture = LectureVerifiee(chemin_fichier, cle)
+    for _ in lecture:
+        pass
+    if not lecture.valide:
+        return False
+
+    positions, dates, codes = array('q'), array('i'), array('H')
+    entetes = array('q')
+    comptes = {}
+    soldes, soldes_passes = [], []
+    parseur = ParseurEnregistrements()
+
+    with open(chemin_fichier, 'rb') as fichier, \
+            mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as memoire:
+        with mesurer('historique.empreinte'):
+            empreinte_fichier = hashlib.sha256(memoire).digest()
+        for position, ligne in _lignes_avec_positions(memoire, cle):
+            champs = ligne.strip().split('*')
+            match champs[0]:
+                case 'CPT' | 'BUD' | 'SOL':
+                    entetes.append(position)
+                case 'OPE':
+                    operation = parseur.operation(champs)
+                    if operation is None:
+                        continue
+                    code = comptes.get(operation.compte)
+                    if code is None:
+                        code = comptes[operation.compte] = len(comptes)
+                        soldes.append(0)
+                        soldes_passes.append(0)
+                    soldes[code] += operation.montant
+                    if operation.passee:
+                        soldes_passes[code] += operation.montant
+                    positions.append(position)
+                    dates.append(date_operation(operation).toordinal())
+                    codes.append(code)
+    compter('historique.operations_indexees', len(positions))
+
+    # Ordre chronologique (tri stable : à date égale, l'ordre du fichier est conservé)
+    ordre = sorted(range(len(dates)), key=dates.__getitem__)
+    table_comptes = '\n'.join(comptes).encode('utf-8')
+    # Fichier temporaire propre à cet appel : deux sessions qui construisent le même index ne s'écrasent pas
+    descripteur, chemin_temporaire = tempfile.mkstemp(
+        dir=os.path.dirname(chemin_index) or '.',
+        prefix=os.path.splitext(os.path.basename(chemin_index))[0] + '.', suffix='.hist.tmp')
+    try:
+        corps = b''.join((bytes.fromhex(lecture.hash),
+                          array('q', (positions[i] for i in ordre)).tobytes(),
+                          array('q', (solde for paire in zip(soldes, soldes_passes) for solde in paire)).tobytes(),
+                          entetes.tobytes(),
+                          array('i', (dates[i] for i in ordre)).tobytes(),
+                          array('H', (codes[i] for i in ordre)).tobytes(),
+                          table_comptes))
+        with open(descripteur, 'wb') as index:
+            index.write(ENTETE.pack(MAGIC_HISTORIQUE, VERSION_HISTORIQUE, empreinte_fichier,
+                                    len(ordre), len(comptes), len(entetes), len(table_comptes)))
+            index.write(cryptage_octets(corps, cle))
+        os.replace(chemin_temporaire, chemin_index)
+    except BaseException:
+        if os.path.exists(chemin_temporaire):
+            os.remove(chemin_temporaire)
+        raise
+    return True
+
+
+def ouvrir_historique(chemin_fichier: str, cle: int, symboles: TableSymboles = None) -> 'HistoriqueOperations | None':
+    """
+    Ouvre l'historique d'un fichier utilisateur au format texte (voir HistoriqueOperations).
+
+    Args:
+        chemin_fichier (str): Chemin du fichier utilisateur (ex: users/12345678.txt).
+        cle (int): Clé de décryptage de l'utilisateur.
+        symboles (TableSymboles, optional): Table des libellés de l'utilisateur (une nouvelle table si None).
+
+    Returns:
+        HistoriqueOperations | None: L'historique, ou None si le fichier est absent, altéré ou corrompu.
+    """
+    try:
+        return HistoriqueOperations(chemin_fichier, cle, symboles)
+    except (OSError, ValueError):
+        return None
+
+
+# --Classes-- #
+class HistoriqueOperations:
+    """
+    Opérations d'un fichier utilisateur, décodées à la demande depuis le fichier ouvert en mémoire partagée (mmap).
+
+    Seuls sont chargés à l'ouverture : les comptes, les budgets, les points de reprise du fichier
+    (lignes 'SOL') et les soldes de chaque compte (enregistrés dans l'index, voir construire_historique). Une opération n'est décryptée et
+    analysée que lorsqu'elle est parcourue (ex : afficher_operations ou un rapport sur une période).
+    La recherche d'une période se fait par dichotomie sur les dates de l'index, et le filtrage par compte
+    sur les indices de compte de l'index, sans rien décoder.
+
+    Les opérations ajoutées pendant la session (journal, nouvelles opérations) sont conservées en
+    mémoire et fusionnées, dans l'ordre chronologique, avec celles du fichier. L'historique s'utilise
+    ainsi comme un IndexOperations (append, plage, parcours, len).
+
+    Attributes:
+        chemin_fichier (str): Chemin du fichier utilisateur.
+        comptes (list): Comptes du fichier (lignes 'CPT').
+        budgets (list): Budgets du fichier (lignes 'BUD').
+        points_reprise (PointsReprise): Points de reprise du fichier (lignes 'SOL', éventuellement aucun).
+        hash (str): Hash du contenu du fichier (ligne 'HASH*'), vérifié lors de la construction de l'index
+                    (un index n'est réutilisé que pour le fichier, octet pour octet, à partir duquel il a été construit).
+        soldes (dict): Solde de chaque compte en centimes, pour les opérations du fichier.
+        soldes_passes (dict): Solde de chaque compte en centimes, pour les opérations passées du fichier.
+        ajouts (list): Opérations ajoutées en mémoire, triées chronologiquement.
+        symboles (TableSymboles): Table des libellés de l'utilisateur, partagés par les opérations décodées.
+    """
+
+    @chronometre('historique.ouverture')
+    def __init__(self, chemin_fichier: str, cle: int, symboles: TableSymboles = None):
+        self.chemin_fichier = chemin_fichier
+        self.cle = cle
+        self.ajouts = []
+        self._parseur = ParseurEnregistrements(symboles)
+        self.symboles = self._parseur.symboles
+
+        with open(chemin_fichier, 'rb') as fichier:
+            self._memoire = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            # Empreinte du fichier ouvert : l'index n'est valable que pour ces octets-là
+            with mesurer('historique.empreinte'):
+                empreinte_fichier = hashlib.sha256(self._memoire).digest()
+            chemin_index = chemin_historique(chemin_fichier)
+            index = self._ouvrir_index(chemin_index, empreinte_fichier)
+            if index is None:
+                if not construire_historique(chemin_fichier, cle, chemin_index):
+                    raise ValueError(f"Fichier utilisateur altéré ou corrompu : {chemin_fichier}")
+                index = self._ouvrir_index(chemin_index, empreinte_fichier)
+                if index is None:
+                    raise ValueError(f"Index d'historique invalide : {chemin_index}")
+        except BaseException:
+            self._memoire.close()
+            raise
+
+        nb_ope, nb_comptes, nb_entetes, taille_table, corps = index
+        self.hash = corps[:TAILLE_HASH].hex()
+
+        vue = self._index = memoryview(corps)
+        debut = TAILLE_HASH
+        self._positions = vue[debut:debut + 8 * nb_ope].cast('q')
+        debut += 8 * nb_ope
+        paires_soldes = vue[debut:debut + 16 * nb_comptes].cast('q')
+        debut += 16 * nb_comptes
+        positions_entetes = vue[debut:debut + 8 * nb_entetes].cast('q')
+        debut += 8 * nb_entetes
+        self._dates = vue[debut:debut + 4 * nb_ope].cast('i')
+        debut += 4 * nb_ope
+        self._codes = vue[debut:debut + 2 * nb_ope].cast('H')
+        debut += 2 * nb_ope
+        noms_comptes = str(vue[debut:debut + taille_table], 'utf-8').split('\n') if nb_comptes else []
+        self._noms_comptes = [self.symboles.symbole(nom) for nom in noms_comptes]
+        self._codes_comptes = {nom: code for code, nom in enumerate(self._noms_comptes)}
+
+        self.soldes = dict(zip(self._noms_comptes, paires_soldes[0::2]))
+        self.soldes_passes = dict(zip(self._noms_comptes, paires_soldes[1::2]))
+        paires_soldes.release()
+
+        self.comptes, self.budgets, self.points_reprise = [], [], PointsReprise()
+        with mesurer('historique.entetes'):
+            for position in positions_entetes:
+                champs = self._ligne(position).strip().split('*')
+                if champs[0] == 'CPT' and len(champs) >= 2:
+                    self.comptes.append(self.symboles.symbole(champs[1]))
+                elif champs[0] == 'BUD':
+                    budget = self._parseur.budget(champs)
+                    if budget is not None:
+                        self.budgets.append(budget)
+                elif champs[0] == 'SOL':
+                    self.points_reprise.ajouter_ligne(champs)
+        positions_entetes.release()
+
+    def _ouvrir_index(self, chemin_index: str, empreinte_fichier: bytes) -> tuple | None:
+        """
+        Lit et décrypte l'index s'il existe et a été construit à partir du fichier actuel (même sha256).
+
+        Returns:
+            tuple | None: (nombre d'opérations, de comptes, de lignes d'en-tête, taille de la table des comptes,
+                          corps décrypté (bytes)), ou None si l'index est absent, périmé ou invalide.
+        """
+        try:
+            with open(chemin_index, 'rb') as fichier:
+                entete = fichier.read(ENTETE.size)
+                if len(entete) < ENTETE.size:
+                    return None
+                magic, version, empreinte, nb_ope, nb_comptes, nb_entetes, taille_table = ENTETE.unpack(entete)
+                if magic != MAGIC_HISTORIQUE or version != VERSION_HISTORIQUE or empreinte != empreinte_fichier:
+                    return None
+                corps = fichier.read()
+        except FileNotFoundError:
+            return None
+        if len(corps) != TAILLE_HASH + 14 * nb_ope + 16 * nb_comptes + 8 * nb_entetes + taille_table:
+            return None
+        with mesurer('historique.decryptage_index'):
+            return nb_ope, nb_comptes, nb_entetes, taille_table, decryptage_octets(corps, self.cle)
+
+    def _ligne(self, position: int) -> str:
+        """Décrypte la ligne du fichier qui commence à une position donnée (en octets)."""
+        fin = self._memoire.find(b'\n', position)
+        return decryptage(self._memoire[position:fin if fin != -1 else len(self._memoire)].decode('utf-8'),
+                          cle=self.cle)
+
+    def _operation(self, rang: int) -> Operation:
+        """Décode la rang-ième opération du fichier (dans l'ordre chronologique)."""
+        return self._parseur.operation(self._ligne(self._positions[rang]).strip().split('*'))
+
+    def fermer(self) -> None:
+        """Libère le fichier et l'index ouverts en mémoire partagée (ex : avant de réécrire le fichier)."""
+        for vue in (self._positions, self._dates, self._codes, self._index):
+            vue.release()
+        self._memoire.close()
+
+    def __len__(self) -> int:
+        return len(self._positions) + len(self.ajouts)
+
+    def __iter__(self):
+        return self.plage()
+
+    def append(self, operation: Operation) -> None:
+        """
+        Ajoute une opération en mémoire, à sa place chronologique (après celles de même date).
+
+        Args:
+            operation (Operation): (date, libellé, compte, montant, mode_paiement, état, budget)
+
+        Returns:
+            None
+        """
+        insort_right(self.ajouts, operation, key=date_operation)
+
+    def plage(self, compte: str = None, debut=None, fin=None):
+        """
+        Parcourt, dans l'ordre chronologique, les opérations d'un compte comprises entre deux dates.
+
+        Seules les opérations produites sont décodées : les bornes sont localisées par dichotomie sur
+        les dates de l'index, et les opérations des autres comptes sont écartées sans être décodées.
+
+        Args:
+            compte (str, optional): Nom du compte (None : tous les comptes).
+            debut (datetime.date, optional): Date de début incluse (None : depuis la première opération).
+            fin (datetime.date, optional): Date de fin incluse (None : jusqu'à la dernière opération).
+
+        Yields:
+            tuple: Les opérations (du compte) dont la date est comprise dans [debut, fin].
+        """
+        i_debut = 0 if debut is None else bisect_left(self._dates, debut.toordinal())
+        i_fin = len(self._dates) if fin is None else bisect_right(self._dates, fin.toordinal())
+        if compte is None:
+            du_fichier = (self._operation(rang) for rang in range(i_debut, i_fin))
+        elif compte in self._codes_comptes:
+            code = self._codes_comptes[compte]
+            du_fichier = (self._operation(rang) for rang in range(i_debut, i_fin) if self._codes[rang] == code)
+        else:
+            du_fichier = ()
+
+        ajoutees = [operation for operation in self.ajouts
+                    if (compte is None or operation.compte == compte)
+                    and (debut is None or debut <= date_operation(operation))
+                    and (fin is None or date_operation(operation) <= fin)]
+        # À date égale, les opérations du fichier précèdent celles ajoutées ensuite
+        yield from heapq.merge(du_fichier, ajoutees, key=date_operation)
@@ -47,7 +47,7 @@ def get_mdp(identifiant: str) -> str:
 
     L'utilisateur dispose de 5 tentatives maximum pour entrer un mot de passe valide :
     - Le mot de passe doit comporter exactement 6 caractères.
-    - Il doit correspondre à celui enregistré dans dict_ident pour l'identifiant fourni.
+    - Son empreinte doit correspondre à celle enregistrée dans dict_ident pour l'identifiant fourni.
 
     Si le mot de passe est correct, il est retourné.
     En cas d'échec après 5 essais, une chaîne vide est renvoyée.
@@ -65,8 +65,8 @@ def get_mdp(identifiant: str) -> str:
         # Si la longueur du mot de passe est incorrecte, l'essai n'est pas comptabilisé.
         if len(mdp) != 6:
             print('Le mot de passe doit faire 6 caractères.')
-        # dict_ident[identifiant][0] correspond au mot de passe de l'utilisateur dont l'id est passé en paramètre.
-        elif mdp != dict_ident[identifiant][0]:
+        # Seule l'empreinte du mot de passe est conservée dans l'index des identifiants
+        elif not dict_ident.verifier_mdp(identifiant, mdp):
             nb_essais += 1
             print(f"Mot de passe incorrect. Vous avez {5 - nb_essais} essais restants.")
         else:
@@ -6,16 +6,28 @@
 #   |-------Fonctions imports des fichiers-------|   #
 #   |--------------------------------------------|   #
 # --Imports-- #
-import datetime
-
-from constantes import CLE_CRYPTAGE
+import os
+from itertools import chain
+
+from constantes import (
+    CLE_CRYPTAGE,
+    DOSSIER_USERS,
+    IDX_BUD_NOM,
+    IDX_BUD_CPT
+)
 from cryptage_decryptage import decryptage
-from utils import verifier_integrite_fichier
+from format_binaire import est_au_format_binaire, lire_fichier_binaire
+from instrumentation import chronometre, compter, mesurer
+from parseur import ParseurEnregistrements
+from points_reprise import PointsReprise
+from symboles import TableSymboles
+from utils import LectureVerifiee, chemin_journal, hash_chaine
 
 
 # --Constantes-- #
 
 # --Fonctions-- #
+@chronometre()
 def import_idents(chemin_fichier: str, cle: int = CLE_CRYPTAGE) -> dict:
     """
     Importe et décrypte le contenu du fichier ident.txt contenant les informations utilisateurs.
@@ -62,188 +74,249 @@ def import_idents(chemin_fichier: str, cle: int = CLE_CRYPTAGE) -> dict:
     return dic_ident
 
 
-def import_comptes(chemin_fichier: str, cle: int) -> list:
+def _import_lignes(lignes, points_reprise: PointsReprise = None, symboles: TableSymboles = None) -> tuple:
     """
-    Importe et décrypte les lignes correspondant aux comptes d’un utilisateur
-    depuis son fichier personnel, et renvoie la liste des noms de comptes.
-
-    Le fichier est lu ligne par ligne, chaque ligne est décryptée à l’aide de la clé fournie.
-    Seules les lignes commençant par "CPT" sont considérées comme valides (convention).
-    La lecture s'interrompt dès qu'une ligne ne commence plus par "CPT".
+    Aiguille des lignes décryptées selon leur préfixe ('CPT', 'OPE', 'BUD' ou 'SOL'), voir parseur.py.
 
     Args:
-        chemin_fichier (str): Chemin vers le fichier personnel de l'utilisateur (ex: users/12345678.txt).
-        cle (int): Clé de décryptage à utiliser pour chaque ligne.
+        lignes (iterable): Lignes en clair du fichier utilisateur (sans la ligne 'HASH*'),
+                           sous forme de liste ou de lecture en flux (voir utils.LectureVerifiee).
+        points_reprise (PointsReprise, optional): Reçoit les points de reprise (lignes 'SOL'),
+                                                  ignorés si None.
+        symboles (TableSymboles, optional): Table des libellés de l'utilisateur, complétée au passage.
 
     Returns:
-        list: Liste des noms de comptes (str) associés à l'utilisateur.
+        tuple: (liste_comptes, liste_operations, liste_budgets)
     """
-    # Vérification de l'intégrité du fichier avant traitement
-    if not verifier_integrite_fichier(chemin_fichier, cle):
-        print("Erreur : le fichier utilisateur semble altéré ou corrompu.")
-        return []
-
-    liste_comptes = []
+    liste_comptes, liste_ope, liste_bud = ParseurEnregistrements(symboles).analyser_lignes(lignes, points_reprise)
 
-    # Ouverture du fichier utilisateur en lecture (texte) avec encodage UTF-8
-    with open(chemin_fichier, mode='r', encoding="utf-8") as fichier:
-        # Lecture ligne par ligne du fichier
-        for ligne in fichier:
-            # Décryptage de la ligne à l'aide de la clé fournie, puis suppression des espaces et sauts de ligne
-            ligne = decryptage(ligne, cle=cle).strip()
+    compter('import_donnees.operations', len(liste_ope))
+    return liste_comptes, liste_ope, liste_bud
 
-            # Vérifie que la ligne suit la convention d'un compte : commence par 'CPT'
-            if not ligne.startswith('CPT'):
-                break  # On arrête dès qu'on sort de la section comptes
 
-            # Découpage de la ligne en champs, à partir du séparateur '*'
-            champs = ligne.split('*')
+@chronometre()
+def _import_fichier_verifie(chemin_fichier: str, cle: int, points_reprise: PointsReprise = None,
+                            symboles: TableSymboles = None) -> tuple | None:
+    """
+    Lit, décrypte, vérifie et analyse un fichier utilisateur en une seule passe en flux.
 
-            # Vérifie que la structure minimale attendue est respectée (ex: 'CPT*NomDuCompte')
-            if len(champs) < 2:
-                continue  # Ligne ignorée si elle est mal formée
+    Les lignes sont analysées au fur et à mesure de leur lecture (voir utils.LectureVerifiee) ;
+    le résultat n'est conservé que si le hash du fichier est valide.
 
-            # Ajout du nom du compte à la liste (position 1)
-            liste_comptes.append(champs[1])
+    Args:
+        chemin_fichier (str): Chemin du fichier utilisateur.
+        cle (int): Clé de décryptage du fichier.
+        points_reprise (PointsReprise, optional): Reçoit les points de reprise du fichier (voir _import_lignes).
+        symboles (TableSymboles, optional): Table des libellés de l'utilisateur (voir _import_lignes).
 
-    # Retour de la liste finale des comptes
-    return liste_comptes
+    Returns:
+        tuple | None: ((liste_comptes, liste_operations, liste_budgets), hash du fichier),
+                      ou None si le fichier est altéré, corrompu ou illisible.
+    """
+    try:
+        lecture = LectureVerifiee(chemin_fichier, cle)
+        donnees = _import_lignes(lecture, points_reprise, symboles)
+    except Exception as e:
+        print(f"Erreur pendant la vérification d'intégrité : {e}")
+        return None
+    return (donnees, lecture.hash) if lecture.valide else None
 
 
-def import_operations(chemin_fichier: str, cle: int) -> list:
+def import_fichier_utilisateur(chemin_fichier: str, cle: int) -> tuple:
     """
-    Importe et décrypte les opérations bancaires d’un utilisateur à partir de son fichier personnel.
+    Importe en une seule passe les comptes, les opérations et les budgets d'un utilisateur.
 
-    Le fichier est lu ligne par ligne, chaque ligne est décryptée à l’aide de la clé fournie.
-    Seules les lignes commençant par "OPE" sont considérées comme des opérations valides.
-
-    Chaque ligne est ensuite convertie en tuple contenant :
-        - date (datetime.date) : Date de l'opération (format jj/mm/aaaa)
-        - libellé (str) : Description de l'opération
-        - compte (str) : Nom du compte concerné
-        - montant (float) : Montant de l'opération
-        - mode de paiement (str) : Type de paiement (ex: CB, CHE, VIR)
-        - état (bool) : Statut de l'opération (True si passée, False sinon)
-        - budget (str) : Nom du budget associé
+    Le fichier n'est lu, décrypté et vérifié (ligne 'HASH*') qu'une seule fois, puis chaque ligne
+    est aiguillée selon son préfixe ('CPT', 'OPE' ou 'BUD') vers le traitement adapté.
+    Les lignes mal formées ou de type inconnu sont ignorées.
 
     Args:
         chemin_fichier (str): Chemin vers le fichier personnel de l'utilisateur (ex: users/12345678.txt).
-        cle (int): Clé de décryptage à utiliser pour chaque ligne.
+        cle (int): Clé de décryptage du fichier.
 
     Returns:
-        list: Liste de tuples représentant les opérations de l'utilisateur.
+        tuple: (liste_comptes, liste_operations, liste_budgets), au même format que
+               import_comptes, import_operations et import_budgets.
+               Trois listes vides si le fichier est altéré ou corrompu.
     """
-    # Vérification de l'intégrité du fichier avant traitement
-    if not verifier_integrite_fichier(chemin_fichier, cle):
+    # Lecture, décryptage, vérification de l'intégrité et analyse du fichier en une seule passe
+    contenu = _import_fichier_verifie(chemin_fichier, cle)
+    if contenu is None:
         print("Erreur : le fichier utilisateur semble altéré ou corrompu.")
-        return []
+        return [], [], []
 
-    from constantes import (
-        IDX_OPE_DATE,
-        IDX_OPE_MONTANT,
-        IDX_OPE_ETAT
-    )
+    return contenu[0]
 
-    liste_ope = []
 
-    # Ouverture du fichier utilisateur en lecture (texte) avec encodage UTF-8
-    with open(chemin_fichier, mode='r', encoding="utf-8") as fichier:
-        # Lecture ligne par ligne du fichier
-        for ligne in fichier:
-            # Décryptage de la ligne à l'aide de la clé fournie, puis suppression des espaces et sauts de ligne
-            ligne = decryptage(ligne, cle=cle).strip()
+@chronometre()
+def import_journal(chemin_fichier: str, cle: int, hash_ancre: str, symboles: TableSymboles = None) -> tuple:
+    """
+    Importe les opérations du journal d'un utilisateur en vérifiant la chaîne de hash.
 
-            # Vérifie que la ligne suit la convention d'une opération : commence par 'OPE'
-            if not ligne.startswith('OPE'):
-                continue  # On ignore les lignes hors section opérations
+    Chaque entrée doit prolonger la chaîne (voir utils.hash_chaine) qui part du hash du fichier
+    utilisateur. Un journal qui ne part pas de ce hash (journal déjà compacté dans le fichier) est
+    ignoré. En cas d'entrée invalide (écriture interrompue, même au milieu d'un caractère, altération),
+    seules les entrées précédentes sont conservées et la chaîne est signalée rompue : une entrée ajoutée
+    à la suite ne serait jamais relue, le journal doit donc être compacté avant tout nouvel ajout.
 
-            # Découpage de la ligne en champs, à partir du séparateur '*'
-            champs = ligne.split('*')
+    Args:
+        chemin_fichier (str): Chemin du journal (ex: users/journal/12345678.jnl).
+        cle (int): Clé de décryptage de l'utilisateur.
+        hash_ancre (str): Hash du fichier utilisateur auquel le journal se rattache.
+        symboles (TableSymboles, optional): Table des libellés de l'utilisateur, pour que les opérations
+                                            du journal partagent les libellés de celles du fichier.
 
-            # Vérifie que la structure minimale attendue est respectée :
-            # (OPE*date*libellé*compte*montant*mode*état*budget)
-            if len(champs) != 8:
-                continue  # Ligne ignorée si elle est mal formée
+    Returns:
+        tuple: (liste des opérations valides, dernier hash de la chaîne, nombre d'entrées valides,
+                True si la chaîne est rompue par une entrée invalide)
+    """
+    liste_ope = []
+    hash_courant = hash_ancre
+    rompu = False
+    parseur = ParseurEnregistrements(symboles)
+
+    if not os.path.exists(chemin_fichier):
+        return liste_ope, hash_courant, 0, rompu
+
+    # Lecture en octets : une entrée coupée au milieu d'un caractère UTF-8 marque la fin de la chaîne
+    with open(chemin_fichier, mode='rb') as journal:
+        for ligne_brute in journal:
+            try:
+                ligne = decryptage(ligne_brute.decode('utf-8'), cle=cle).strip()
+            except UnicodeDecodeError:
+                rompu = True
+                break
+
+            # Séparation de l'opération et de son hash chaîné (dernier champ)
+            ligne_ope, _, hash_entree = ligne.rpartition('*')
+            operation = parseur.operation(ligne_ope.split('*')) \
+                if hash_chaine(hash_courant, ligne_ope) == hash_entree else None
+            if operation is None:
+                rompu = True
+                break
+            liste_ope.append(operation)
+            hash_courant = hash_entree
+            # Entrée sans fin de ligne (écriture interrompue juste avant) : un ajout la prolongerait
+            rompu = not ligne_brute.endswith(b'\n')
+
+    if rompu and liste_ope:
+        print("Attention : journal interrompu ou altéré, les dernières entrées sont ignorées.")
+    compter('import_donnees.entrees_journal', len(liste_ope))
+    return liste_ope, hash_courant, len(liste_ope), rompu
+
+
+@chronometre()
+def import_donnees_utilisateur(identifiant: str, cle: int, dossier_users: str = DOSSIER_USERS,
+                               points_reprise: PointsReprise = None, symboles: TableSymboles = None) -> tuple:
+    """
+    Importe toutes les données d'un utilisateur : son fichier personnel puis son journal d'opérations.
 
-            # Suppression du préfixe 'OPE'
-            champs.pop(0)
+    Le fichier personnel est lu au format binaire (<identifiant>.bin, voir format_binaire.py) s'il existe,
+    au format texte (<identifiant>.txt) sinon. Les opérations du journal sont ajoutées à la suite.
 
-            # Conversion du champ date (au format jj/mm/aaaa) en objet datetime.date
-            champs[IDX_OPE_DATE] = datetime.date(
-                year=int(champs[IDX_OPE_DATE][6:]),
-                month=int(champs[IDX_OPE_DATE][3:5]),
-                day=int(champs[IDX_OPE_DATE][0:2])
-            )
+    Args:
+        identifiant (str): Identifiant de l'utilisateur.
+        cle (int): Clé de décryptage de l'utilisateur.
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
+        points_reprise (PointsReprise, optional): Reçoit les points de reprise du fichier (format texte),
+                                                  qui ne couvrent pas les opérations du journal.
+        symboles (TableSymboles, optional): Reçoit les libellés de l'utilisateur (voir symboles.py),
+                                            partagés par les opérations du fichier et du journal.
 
-            # Conversion du montant en float
-            champs[IDX_OPE_MONTANT] = float(champs[IDX_OPE_MONTANT])
+    Returns:
+        tuple: (liste_comptes, liste_operations, liste_budgets, etat_journal), où etat_journal vaut
+               (hash du fichier, dernier hash de la chaîne du journal, nombre d'entrées du journal,
+               True si la chaîne du journal est rompue, voir import_journal).
+               Listes vides et etat_journal à (None, None, 0, False) si le fichier est altéré ou corrompu.
+    """
+    if symboles is None:
+        symboles = TableSymboles()
+    binaire = est_au_format_binaire(identifiant, dossier_users)
+    if binaire:
+        with mesurer('format_binaire.lire_fichier_binaire'):
+            contenu = lire_fichier_binaire(os.path.join(dossier_users, f"{identifiant}.bin"), cle)
+    else:
+        contenu = _import_fichier_verifie(os.path.join(dossier_users, f"{identifiant}.txt"), cle,
+                                          points_reprise, symboles)
+    if contenu is None:
+        print("Erreur : le fichier utilisateur semble altéré ou corrompu.")
+        return [], [], [], (None, None, 0, False)
 
-            # Conversion de l'état en booléen (à partir d'une chaîne "True" ou "False")
-            champs[IDX_OPE_ETAT] = champs[IDX_OPE_ETAT] == 'True'
+    (liste_comptes, liste_ope, liste_bud), hash_fichier = contenu
+    if binaire:
+        # Le fichier binaire partage déjà ses libellés (un exemplaire par libellé) : les comptes et les budgets,
+        # ceux que comparent les calculs, sont repris dans la table pour les opérations du journal
+        for libelle in chain(liste_comptes, *((budget[IDX_BUD_NOM], budget[IDX_BUD_CPT]) for budget in liste_bud)):
+            symboles.symbole(libelle)
 
-            # Ajout de l'opération sous forme de tuple dans la liste
-            liste_ope.append(tuple(champs))
+    ope_journal, hash_journal, nb_entrees, journal_rompu = import_journal(
+        chemin_journal(identifiant, dossier_users), cle, hash_ancre=hash_fichier, symboles=symboles)
+    liste_ope.extend(ope_journal)
 
-    # Retour de la liste finale des opérations bancaires
-    return liste_ope
+    return liste_comptes, liste_ope, liste_bud, (hash_fichier, hash_journal, nb_entrees, journal_rompu)
 
 
-def import_budgets(chemin_fichier: str, cle: int) -> list:
+def import_comptes(chemin_fichier: str, cle: int) -> list:
     """
-    Importe et décrypte les budgets d’un utilisateur à partir de son fichier personnel.
-
-    Le fichier est lu ligne par ligne, chaque ligne est décryptée à l’aide de la clé fournie.
-    Seules les lignes commençant par "BUD" sont considérées comme valides (convention).
+    Importe et décrypte les lignes correspondant aux comptes d’un utilisateur
+    depuis son fichier personnel, et renvoie la liste des noms de comptes.
 
-    Chaque ligne est ensuite convertie en liste contenant :
-        - libellé (str) : Nom de la catégorie budgétaire
-        - montant (float) : Plafond mensuel autorisé
-        - compte associé (str) : Compte bancaire rattaché à ce budget
+    Seules les lignes commençant par "CPT" sont considérées comme valides (convention).
+    Préférer import_fichier_utilisateur lorsque plusieurs sections du fichier sont nécessaires.
 
     Args:
         chemin_fichier (str): Chemin vers le fichier personnel de l'utilisateur (ex: users/12345678.txt).
         cle (int): Clé de décryptage à utiliser pour chaque ligne.
 
     Returns:
-        list: Liste de listes représentant les budgets de l'utilisateur.
+        list: Liste des noms de comptes (str) associés à l'utilisateur.
     """
-    # Vérification de l'intégrité du fichier avant traitement
-    if not verifier_integrite_fichier(chemin_fichier, cle):
-        print("Erreur : le fichier utilisateur semble altéré ou corrompu.")
-        return []
+    return import_fichier_utilisateur(chemin_fichier, cle)[0]
 
-    from constantes import (
-        IDX_BUD_MONTANT
-    )
 
-    liste_bud = []
+def import_operations(chemin_fichier: str, cle: int) -> list:
+    """
+    Importe et décrypte les opérations bancaires d’un utilisateur à partir de son fichier personnel.
 
-    # Ouverture du fichier utilisateur en lecture (texte) avec encodage UTF-8
-    with open(chemin_fichier, mode='r', encoding="utf-8") as fichier:
-        # Lecture ligne par ligne du fichier
-        for ligne in fichier:
-            # Décryptage de la ligne à l'aide de la clé fournie, puis suppression des espaces et sauts de ligne
-            ligne = decryptage(ligne, cle=cle).strip()
+    Seules les lignes commençant par "OPE" sont considérées comme des opérations valides.
+    Préférer import_fichier_utilisateur lorsque plusieurs sections du fichier sont nécessaires.
+
+    Chaque ligne est ensuite convertie en Operation (voir modeles.py) contenant :
+        - date (datetime.date) : Date de l'opération (format jj/mm/aaaa)
+        - libellé (str) : Description de l'opération
+        - compte (str) : Nom du compte concerné
+        - montant (int) : Montant de l'opération, en centimes
+        - mode de paiement (str) : Type de paiement (ex: CB, CHE, VIR)
+        - état (bool) : Statut de l'opération (True si passée, False sinon)
+        - budget (str) : Nom du budget associé
 
-            # Vérifie que la ligne suit la convention d'un budget : commence par 'BUD'
-            if not ligne.startswith('BUD'):
-                continue  # On ignore les lignes hors section budgets
+    Args:
+        chemin_fichier (str): Chemin vers le fichier personnel de l'utilisateur (ex: users/12345678.txt).
+        cle (int): Clé de décryptage à utiliser pour chaque ligne.
 
-            # Découpage de la ligne en champs, à partir du séparateur '*'
-            champs = ligne.split('*')
+    Returns:
+        list: Liste des opérations (Operation) de l'utilisateur.
+    """
+    return import_fichier_utilisateur(chemin_fichier, cle)[1]
 
-            # Vérifie que la structure minimale attendue est respectée (BUD*nom*montant*compte)
-            if len(champs) != 4:
-                continue  # Ligne ignorée si elle est mal formée
 
-            # Suppression du préfixe 'BUD'
-            champs.pop(0)
+def import_budgets(chemin_fichier: str, cle: int) -> list:
+    """
+    Importe et décrypte les budgets d’un utilisateur à partir de son fichier personnel.
 
-            # Conversion du montant en float
-            champs[IDX_BUD_MONTANT] = float(champs[IDX_BUD_MONTANT])
+    Seules les lignes commençant par "BUD" sont considérées comme valides (convention).
+    Préférer import_fichier_utilisateur lorsque plusieurs sections du fichier sont nécessaires.
 
-            # Ajout du budget sous forme de liste dans la liste principale
-            liste_bud.append(champs)
+    Chaque ligne est ensuite convertie en Budget (voir modeles.py) contenant :
+        - libellé (str) : Nom de la catégorie budgétaire
+        - montant (int) : Plafond mensuel autorisé, en centimes
+        - compte associé (str) : Compte bancaire rattaché à ce budget
 
-    # Retour de la liste finale des budgets
-    return liste_bud
+    Args:
+        chemin_fichier (str): Chemin vers le fichier personnel de l'utilisateur (ex: users/12345678.txt).
+        cle (int): Clé de décryptage à utiliser pour chaque ligne.
+
+    Returns:
+        list: Liste des budgets (Budget) de l'utilisateur.
+    """
+    return import_fichier_utilisateur(chemin_fichier, cle)[2]
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+#   index_idents.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |-----Index des identifiants (ident.idx)-----|   #
+#   |--------------------------------------------|   #
+# --Imports-- #
+import hashlib
+import hmac
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+
+from constantes import CLE_CRYPTAGE
+from cryptage_decryptage import decryptage
+from instrumentation import chronometre, compter, mesurer
+
+# --Constantes-- #
+MAGIC_INDEX = b'GBID'
+VERSION_INDEX = 2
+# magic, version, nombre d'enregistrements, taille et date de modification (ns) du fichier d'identifiants indexé
+ENTETE = struct.Struct('<4sHIQq')
+TAILLE_IDENTIFIANT = 8
+TAILLE_NOM = 48
+# Enregistrement de taille fixe : identifiant, empreinte du mot de passe (sha256), nom (UTF-8), clé
+ENREGISTREMENT = struct.Struct(f'<{TAILLE_IDENTIFIANT}s32s{TAILLE_NOM}sH')
+
+
+# --Fonctions-- #
+def empreinte_mdp(identifiant: str, mdp: str) -> bytes:
+    """
+    Calcule l'empreinte (sha256) d'un mot de passe, salée par l'identifiant de l'utilisateur.
+
+    Args:
+        identifiant (str): Identifiant de l'utilisateur.
+        mdp (str): Mot de passe en clair.
+
+    Returns:
+        bytes: Empreinte de 32 octets.
+    """
+    return hashlib.sha256(f"{identifiant}*{mdp}".encode('utf-8')).digest()
+
+
+def chemin_index_idents(chemin_ident: str) -> str:
+    """Renvoie le chemin de l'index associé à un fichier d'identifiants (ex : ./ident.txt → ./ident.idx)."""
+    return os.path.splitext(chemin_ident)[0] + '.idx'
+
+
+def index_a_jour(chemin_ident: str, chemin_index: str) -> bool:
+    """
+    Indique si un index a été construit à partir de la version actuelle du fichier d'identifiants.
+
+    L'en-tête de l'index mémorise la taille et la date de modification (en nanosecondes) du fichier indexé :
+    elles doivent être égales à celles du fichier actuel. Une simple comparaison des dates des deux fichiers
+    laisserait passer un fichier remplacé par un plus ancien (ex : restauration d'une sauvegarde, copie
+    conservant les dates) ou modifié dans la même seconde que l'index.
+
+    Args:
+        chemin_ident (str): Chemin du fichier ident.txt crypté.
+        chemin_index (str): Chemin de l'index.
+
+    Returns:
+        bool: True si l'index existe, est au format actuel et correspond au fichier d'identifiants.
+    """
+    try:
+        with open(chemin_index, 'rb') as index:
+            entete = index.read(ENTETE.size)
+    except FileNotFoundError:
+        return False
+    if len(entete) < ENTETE.size:
+        return False
+    magic, version, _, taille, date_modification = ENTETE.unpack(entete)
+    etat = os.stat(chemin_ident)
+    return (magic == MAGIC_INDEX and version == VERSION_INDEX
+            and (taille, date_modification) == (etat.st_size, etat.st_mtime_ns))
+
+
+@chronometre()
+def construire_index_idents(chemin_ident: str, chemin_index: str = None, cle: int = CLE_CRYPTAGE) -> int:
+    """
+    Construit l'index binaire d'un fichier d'identifiants crypté (format de import_idents).
+
+    Le fichier est lu ligne par ligne. Chaque utilisateur devient un enregistrement de taille fixe
+    (voir ENREGISTREMENT) ; les enregistrements sont triés par identifiant pour permettre une recherche
+    dichotomique. Le mot de passe n'est pas conservé, seule son empreinte (voir empreinte_mdp) l'est.
+    Un identifiant de plus de TAILLE_IDENTIFIANT octets ne peut pas être indexé : il est signalé puis ignoré.
+    L'index est écrit dans un fichier temporaire puis mis en place d'un seul coup (os.replace).
+
+    Args:
+        chemin_ident (str): Chemin du fichier ident.txt crypté.
+        chemin_index (str, optional): Chemin de l'index à écrire (par défaut : à côté de ident.txt, en .idx).
+        cle (int): Clé de décryptage du fichier d'identifiants.
+
+    Returns:
+        int: Nombre d'utilisateurs indexés.
+    """
+    chemin_index = chemin_index or chemin_index_idents(chemin_ident)
+    enregistrements = {}
+    # État relevé avant la lecture : un fichier modifié pendant la construction sera réindexé ensuite
+    etat = os.stat(chemin_ident)
+
+    with open(chemin_ident, mode='r', encoding="utf-8") as idents:
+        for ligne in idents:
+            champs = decryptage(ligne, cle=cle).strip().split('*')
+            if len(champs) != 4:
+                continue    # Ligne mal formée, ignorée comme dans import_idents
+            identifiant, mdp, nom, cle_str = champs
+            id_octets = identifiant.encode('utf-8')
+            if not cle_str.isdigit():
+                continue
+            if len(id_octets) > TAILLE_IDENTIFIANT:
+                print(f"Attention : l'identifiant {identifiant!r} dépasse {TAILLE_IDENTIFIANT} octets, "
+                      f"l'utilisateur ne pourra pas se connecter.")
+                continue
+            # Le nom est tronqué sans couper un caractère UTF-8 en deux
+            nom_octets = nom.encode('utf-8')[:TAILLE_NOM].decode('utf-8', 'ignore').encode('utf-8')
+            enregistrements[id_octets] = ENREGISTREMENT.pack(id_octets, empreinte_mdp(identifiant, mdp),
+                                                             nom_octets, int(cle_str))
+
+    chemin_temporaire = chemin_index + '.tmp'
+    with open(chemin_temporaire, 'wb') as index:
+        index.write(ENTETE.pack(MAGIC_INDEX, VERSION_INDEX, len(enregistrements), etat.st_size, etat.st_mtime_ns))
+        # Identifiants complétés par des octets nuls : l'ordre des octets est celui des enregistrements
+        for id_octets in sorted(enregistrements, key=lambda i: i.ljust(TAILLE_IDENTIFIANT, b'\0')):
+            index.write(enregistrements[id_octets])
+    os.replace(chemin_temporaire, chemin_index)
+    compter('index_idents.identifiants_indexes', len(enregistrements))
+    return len(enregistrements)
+
+
+# --Classes-- #
+class IndexIdentifiants(Mapping):
+    """
+    Accès aux identifiants des utilisateurs par un index binaire trié, ouvert en mémoire partagée (mmap).
+
+    Remplace le dictionnaire complet renvoyé par import_idents : rien n'est lu avant la première
+    recherche, puis chaque recherche ne touche que les quelques enregistrements parcourus par la
+    dichotomie (O(log n)), quel que soit le nombre d'utilisateurs. L'index est (re)construit
+    automatiquement s'il est absent ou ne correspond pas au fichier d'identifiants (voir index_a_jour).
+
+    Se comporte comme un dictionnaire en lecture seule {identifiant: (empreinte, nom, clé)} ;
+    les mots de passe se vérifient avec verifier_mdp.
+    """
+
+    def __init__(self, chemin_ident: str, chemin_index: str = None, cle: int = CLE_CRYPTAGE):
+        self.chemin_ident = chemin_ident
+        self.chemin_index = chemin_index or chemin_index_idents(chemin_ident)
+        self.cle = cle
+        self._memoire = None
+        self._nb = 0
+
+    def _ouvrir(self) -> mmap.mmap:
+        """Ouvre l'index à la première utilisation, après l'avoir reconstruit s'il n'est pas à jour."""
+        if self._memoire is None:
+            with mesurer('index_idents.ouverture'):
+                if not index_a_jour(self.chemin_ident, self.chemin_index):
+                    construire_index_idents(self.chemin_ident, self.chemin_index, self.cle)
+                with open(self.chemin_index, 'rb') as index:
+                    memoire = mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, nb, _, _ = ENTETE.unpack_from(memoire)
+            if magic != MAGIC_INDEX or version != VERSION_INDEX:
+                memoire.close()
+                raise ValueError(f"Index d'identifiants invalide : {self.chemin_index}")
+            self._memoire, self._nb = memoire, nb
+        return self._memoire
+
+    def recharger(self) -> None:
+        """Ferme l'index : il sera rouvert (et reconstruit si besoin) à la prochaine recherche."""
+        if self._memoire is not None:
+            self._memoire.close()
+            self._memoire = None
+
+    @chronometre('index_idents.recherche')
+    def _position(self, identifiant: str) -> int | None:
+        """Renvoie la position de l'enregistrement d'un identifiant dans l'index (None s'il est absent)."""
+        memoire = self._ouvrir()
+        cible = identifiant.encode('utf-8')
+        if len(cible) > TAILLE_IDENTIFIANT:
+            return None
+        cible = cible.ljust(TAILLE_IDENTIFIANT, b'\0')
+
+        bas, haut = 0, self._nb
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            debut = ENTETE.size + milieu * ENREGISTREMENT.size
+            courant = memoire[debut:debut + TAILLE_IDENTIFIANT]
+            if courant < cible:
+                bas = milieu + 1
+            elif courant > cible:
+                haut = milieu
+            else:
+                return debut
+        return None
+
+    def __getitem__(self, identifiant: str) -> tuple:
+        debut = self._position(identifiant)
+        if debut is None:
+            raise KeyError(identifiant)
+        _, empreinte, nom, cle = ENREGISTREMENT.unpack_from(self._memoire, debut)
+        return empreinte, nom.rstrip(b'\0').decode('utf-8'), cle
+
+    def __contains__(self, identifiant) -> bool:
+        return isinstance(identifiant, str) and self._position(identifiant) is not None
+
+    def __len__(self) -> int:
+        self._ouvrir()
+        return self._nb
+
+    def __iter__(self):
+        memoire = self._ouvrir()
+        for i in range(self._nb):
+            debut = ENTETE.size + i * ENREGISTREMENT.size
+            yield memoire[debut:debut + TAILLE_IDENTIFIANT].rstrip(b'\0').decode('utf-8')
+
+    def verifier_mdp(self, identifiant: str, mdp: str) -> bool:
+        """
+        Vérifie le mot de passe d'un utilisateur en comparant son empreinte à celle de l'index.
+
+        Args:
+            identifiant (str): Identifiant de l'utilisateur.
+            mdp (str): Mot de passe saisi.
+
+        Returns:
+            bool: True si l'identifiant existe et que le mot de passe est correct.
+        """
+        debut = self._position(identifiant)
+        if debut is None:
+            return False
+        empreinte = ENREGISTREMENT.unpack_from(self._memoire, debut)[1]
+        return hmac.compare_digest(empreinte, empreinte_mdp(identifiant, mdp))
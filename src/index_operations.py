@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#   index_operations.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |-----Index des opérations par compte/date---|   #
+#   |--------------------------------------------|   #
+# --Imports-- #
+import datetime
+from bisect import bisect_left, bisect_right, insort_right
+from operator import attrgetter
+
+from modeles import Operation
+
+# --Constantes-- #
+date_operation = attrgetter('date')
+
+
+# --Classes-- #
+class IndexOperations:
+    """
+    Stockage des opérations d'un utilisateur, trié par date et indexé par (compte, date).
+
+    Les opérations sont conservées dans l'ordre chronologique (à date égale, dans l'ordre d'ajout),
+    à la fois globalement et pour chaque compte. Un ajout est une insertion dichotomique (bisect),
+    une recherche sur une plage de dates coûte O(log n + k) pour k opérations trouvées.
+
+    Attributes:
+        operations (list): Toutes les opérations, triées chronologiquement.
+    """
+
+    def __init__(self, lst_ope: list = ()):
+        # Un seul tri (stable) à la construction, puis les ajouts conservent l'ordre
+        self.operations = sorted(lst_ope, key=date_operation)
+        self._par_compte = {}
+        for operation in self.operations:
+            self._par_compte.setdefault(operation.compte, []).append(operation)
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def __iter__(self):
+        return iter(self.operations)
+
+    def append(self, operation: Operation) -> None:
+        """
+        Insère une opération à sa place chronologique (après celles de même date).
+
+        Le nom append permet d'utiliser l'index partout où une liste d'opérations est attendue
+        en écriture (ex : ajout_operation).
+
+        Args:
+            operation (Operation): (date, libellé, compte, montant, mode_paiement, état, budget)
+
+        Returns:
+            None
+        """
+        insort_right(self.operations, operation, key=date_operation)
+        insort_right(self._par_compte.setdefault(operation.compte, []), operation, key=date_operation)
+
+    def operations_compte(self, compte: str) -> list:
+        """
+        Renvoie les opérations d'un compte, triées chronologiquement.
+
+        Args:
+            compte (str): Nom du compte.
+
+        Returns:
+            list: Opérations du compte (liste vide si le compte n'a aucune opération).
+        """
+        return self._par_compte.get(compte, [])
+
+    def plage(self, compte: str, debut: datetime.date = None, fin: datetime.date = None):
+        """
+        Parcourt, dans l'ordre chronologique, les opérations d'un compte comprises entre deux dates.
+
+        Les bornes sont localisées par dichotomie puis les opérations sont produites une à une,
+        ce qui permet d'afficher ou de paginer une période sans parcourir tout l'historique.
+
+        Args:
+            compte (str): Nom du compte.
+            debut (datetime.date, optional): Date de début incluse (None : depuis la première opération).
+            fin (datetime.date, optional): Date de fin incluse (None : jusqu'à la dernière opération).
+
+        Yields:
+            tuple: Les opérations du compte dont la date est comprise dans [debut, fin].
+        """
+        operations = self._par_compte.get(compte, [])
+        i_debut = 0 if debut is None else bisect_left(operations, debut, key=date_operation)
+        i_fin = len(operations) if fin is None else bisect_right(operations, fin, key=date_operation)
+        for i in range(i_debut, i_fin):
+            yield operations[i]
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+#   instrumentation.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |---Mesure des phases (durées, compteurs)----|   #
+#   |--------------------------------------------|   #
+# Chronomètres et compteurs des phases coûteuses (import, vérification, décryptage, calculs...).
+# Désactivée par défaut ; activée par des variables d'environnement lues au démarrage :
+#   GB_INSTRUMENTATION=1                    résumé affiché (sur la sortie d'erreur) à la fin du programme
+#   GB_INSTRUMENTATION_FICHIER=mesures.json histogrammes de chaque session écrits en JSON à la fin du programme
+# Désactivée, elle ne coûte presque rien : chronometre() renvoie la fonction décorée telle quelle,
+# mesurer() un gestionnaire de contexte vide partagé et compter() ne fait rien.
+# Les durées d'une phase incluent celles des phases qu'elle appelle (ex : le décryptage d'un fichier
+# est compté dans 'utils.decryptage' et dans la phase d'import qui lit ce fichier).
+# La session en cours est propre à chaque contexte (contextvars) : dans le serveur, chaque connexion
+# (tâche asyncio) a la sienne, ainsi que les threads auxquels elle confie du travail avec son contexte.
+# --Imports-- #
+import atexit
+import contextlib
+import contextvars
+import datetime
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# --Constantes-- #
+VARIABLE_ACTIVATION = "GB_INSTRUMENTATION"
+VARIABLE_FICHIER = "GB_INSTRUMENTATION_FICHIER"
+
+FICHIER_MESURES = os.environ.get(VARIABLE_FICHIER) or None
+ACTIVE = os.environ.get(VARIABLE_ACTIVATION, "").strip() not in ("", "0") or FICHIER_MESURES is not None
+
+_CONTEXTE_VIDE = contextlib.nullcontext()
+
+
+# --Classes-- #
+class StatistiquePhase:
+    """
+    Durées cumulées d'une phase : nombre de mesures, total, extrêmes et histogramme.
+
+    L'histogramme compte les mesures par puissance de 2 de microsecondes : la case n regroupe
+    les durées comprises entre 2**(n-1) et 2**n microsecondes (la case 0, les durées inférieures à 1 µs).
+    """
+
+    __slots__ = ('nombre', 'total', 'minimum', 'maximum', 'histogramme')
+
+    def __init__(self):
+        self.nombre = 0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = 0.0
+        self.histogramme = {}
+
+    def ajouter(self, duree: float) -> None:
+        """Ajoute une mesure (en secondes)."""
+        self.nombre += 1
+        self.total += duree
+        self.minimum = min(self.minimum, duree)
+        self.maximum = max(self.maximum, duree)
+        case = int(duree * 1e6).bit_length()
+        self.histogramme[case] = self.histogramme.get(case, 0) + 1
+
+    def fusionner(self, autre: 'StatistiquePhase') -> None:
+        """Ajoute les mesures d'une autre statistique de la même phase."""
+        self.nombre += autre.nombre
+        self.total += autre.total
+        self.minimum = min(self.minimum, autre.minimum)
+        self.maximum = max(self.maximum, autre.maximum)
+        for case, nombre in autre.histogramme.items():
+            self.histogramme[case] = self.histogramme.get(case, 0) + nombre
+
+    def en_dict(self) -> dict:
+        """Renvoie la statistique sous une forme sérialisable en JSON (histogramme indexé par sa borne en µs)."""
+        return {'nombre': self.nombre, 'total_s': self.total, 'moyenne_s': self.total / self.nombre,
+                'min_s': self.minimum, 'max_s': self.maximum,
+                'histogramme_us': {str(1 << case): nb for case, nb in sorted(self.histogramme.items())}}
+
+
+class MesuresSession:
+    """Mesures d'une session (durées par phase et compteurs), protégées par un verrou (serveur multi-thread)."""
+
+    def __init__(self, nom: str):
+        self.nom = nom
+        self.debut = datetime.datetime.now().isoformat(timespec='seconds')
+        self.phases = {}        # nom de la phase -> StatistiquePhase
+        self.compteurs = {}     # nom du compteur -> total
+        self._verrou = threading.Lock()
+
+    def ajouter_duree(self, phase: str, duree: float) -> None:
+        with self._verrou:
+            statistique = self.phases.get(phase)
+            if statistique is None:
+                statistique = self.phases[phase] = StatistiquePhase()
+            statistique.ajouter(duree)
+
+    def ajouter_compte(self, compteur: str, nombre: int) -> None:
+        with self._verrou:
+            self.compteurs[compteur] = self.compteurs.get(compteur, 0) + nombre
+
+    def integrer(self, autre: 'MesuresSession') -> None:
+        """Ajoute les mesures d'une autre session (ex : celles d'un appel fait dans un autre processus)."""
+        with self._verrou:
+            for phase, statistique in autre.phases.items():
+                self.phases.setdefault(phase, StatistiquePhase()).fusionner(statistique)
+            for compteur, nombre in autre.compteurs.items():
+                self.compteurs[compteur] = self.compteurs.get(compteur, 0) + nombre
+
+    def est_vide(self) -> bool:
+        return not self.phases and not self.compteurs
+
+    def __getstate__(self) -> dict:
+        # Transmissible à un autre processus (pickle), sans son verrou
+        return {'nom': self.nom, 'debut': self.debut, 'phases': self.phases, 'compteurs': self.compteurs}
+
+    def __setstate__(self, etat: dict) -> None:
+        self.__dict__.update(etat)
+        self._verrou = threading.Lock()
+
+    def en_dict(self) -> dict:
+        with self._verrou:
+            return {'nom': self.nom, 'debut': self.debut,
+                    'phases': {phase: statistique.en_dict() for phase, statistique in sorted(self.phases.items())},
+                    'compteurs': dict(sorted(self.compteurs.items()))}
+
+
+class _Mesure:
+    """Gestionnaire de contexte qui ajoute la durée de son bloc à une phase de la session en cours."""
+
+    __slots__ = ('phase', 'debut')
+
+    def __init__(self, phase: str):
+        self.phase = phase
+
+    def __enter__(self):
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        session_courante().ajouter_duree(self.phase, time.perf_counter() - self.debut)
+        return False
+
+
+# --Variables-- #
+_sessions = [MesuresSession("processus")]
+_session_contexte = contextvars.ContextVar('session_mesures', default=None)
+_verrou_sessions = threading.Lock()
+
+
+# --Fonctions-- #
+def session_courante() -> MesuresSession:
+    """Renvoie la session de mesures du contexte en cours (à défaut, la dernière commencée)."""
+    return _session_contexte.get() or _sessions[-1]
+
+
+def nouvelle_session(nom: str) -> None:
+    """
+    Commence une nouvelle session de mesures (ex : à la connexion d'un utilisateur).
+
+    Les mesures suivantes du contexte en cours lui sont attribuées (dans le serveur : celles de la
+    connexion qui l'a commencée) ; celles des sessions précédentes sont conservées pour le résumé
+    et le fichier de fin de programme (une session sans mesure n'y apparaît pas).
+
+    Args:
+        nom (str): Nom de la session (ex : identifiant de l'utilisateur).
+    """
+    if not ACTIVE:
+        return
+    session = MesuresSession(nom)
+    with _verrou_sessions:
+        _sessions.append(session)
+    _session_contexte.set(session)
+
+
+def mesurer(phase: str):
+    """
+    Chronomètre un bloc de code : with mesurer('import_donnees.journal'): ...
+
+    Args:
+        phase (str): Nom de la phase (convention : '<module>.<phase>').
+
+    Returns:
+        Gestionnaire de contexte (vide si l'instrumentation est désactivée).
+    """
+    return _Mesure(phase) if ACTIVE else _CONTEXTE_VIDE
+
+
+def chronometre(phase: str = None):
+    """
+    Décorateur qui chronomètre chaque appel d'une fonction.
+
+    Si l'instrumentation est désactivée, la fonction est renvoyée telle quelle (aucun surcoût).
+
+    Args:
+        phase (str, optional): Nom de la phase ('<module>.<fonction>' par défaut).
+
+    Returns:
+        Le décorateur.
+    """
+    def decorateur(fonction):
+        if not ACTIVE:
+            return fonction
+        nom = phase or f"{fonction.__module__}.{fonction.__name__}"
+
+        @functools.wraps(fonction)
+        def fonction_chronometree(*args, **kwargs):
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                session_courante().ajouter_duree(nom, time.perf_counter() - debut)
+        return fonction_chronometree
+    return decorateur
+
+
+def compter(compteur: str, nombre: int = 1) -> None:
+    """
+    Ajoute nombre à un compteur de la session en cours (ex : nombre de lignes lues).
+
+    Args:
+        compteur (str): Nom du compteur (convention : '<module>.<objet>').
+        nombre (int): Valeur à ajouter.
+    """
+    if ACTIVE:
+        session_courante().ajouter_compte(compteur, nombre)
+
+
+def appel_mesure(fonction, *args) -> tuple:
+    """
+    Appelle fonction(*args) en réunissant ses mesures dans une session à part, renvoyée avec le résultat.
+
+    Sert aux appels faits dans un processus du pool du serveur, dont les mesures seraient sinon perdues :
+    le processus principal les ajoute ensuite à la session en cours avec integrer_mesures.
+
+    Returns:
+        tuple: (résultat de l'appel, MesuresSession, ou None si l'instrumentation est désactivée)
+    """
+    if not ACTIVE:
+        return fonction(*args), None
+    mesures = MesuresSession(getattr(fonction, '__name__', 'appel'))
+
+    def appel():
+        _session_contexte.set(mesures)
+        return fonction(*args)
+    return contextvars.copy_context().run(appel), mesures
+
+
+def integrer_mesures(mesures: MesuresSession | None) -> None:
+    """Ajoute à la session en cours les mesures renvoyées par appel_mesure (rien si elles sont None)."""
+    if ACTIVE and mesures is not None:
+        session_courante().integrer(mesures)
+
+
+def sessions() -> list:
+    """Renvoie les mesures de toutes les sessions, sous forme de dictionnaires (voir MesuresSession.en_dict)."""
+    with _verrou_sessions:
+        liste = list(_sessions)
+    return [session.en_dict() for session in liste if not session.est_vide()]
+
+
+def resume() -> str:
+    """
+    Construit le résumé des mesures : pour chaque session, les phases triées par durée totale, puis les compteurs.
+
+    Returns:
+        str: Le résumé, prêt à être affiché.
+    """
+    lignes = []
+    for session in sessions():
+        lignes.append(f"--- Mesures de la session {session['nom']} (début : {session['debut']}) ---")
+        phases = sorted(session['phases'].items(), key=lambda phase: phase[1]['total_s'], reverse=True)
+        for phase, statistique in phases:
+            lignes.append(f"  {phase:40} {statistique['nombre']:>8} appels  {statistique['total_s'] * 1000:>11.2f} ms"
+                          f"  (moy. {statistique['moyenne_s'] * 1000:.3f} ms, max. {statistique['max_s'] * 1000:.3f} ms)")
+        for compteur, total in session['compteurs'].items():
+            lignes.append(f"  {compteur:40} {total:>8}")
+    return "\n".join(lignes)
+
+
+def exporter(chemin_fichier: str) -> None:
+    """
+    Écrit les mesures de toutes les sessions dans un fichier JSON.
+
+    Args:
+        chemin_fichier (str): Chemin du fichier à écrire (remplacé s'il existe).
+    """
+    with open(chemin_fichier, 'w', encoding='utf-8') as fichier:
+        json.dump({'pid': os.getpid(), 'sessions': sessions()}, fichier, indent=2, ensure_ascii=False)
+
+
+def _a_la_sortie() -> None:
+    """Affiche le résumé et/ou écrit le fichier de mesures à la fin du programme."""
+    if FICHIER_MESURES is not None:
+        try:
+            exporter(FICHIER_MESURES)
+        except OSError as e:
+            print(f"Erreur lors de l'écriture des mesures : {e}", file=sys.stderr)
+    if os.environ.get(VARIABLE_ACTIVATION, "").strip() not in ("", "0"):
+        print(resume(), file=sys.stderr)
+
+
+# --Programme principal-- #
+if ACTIVE:
+    atexit.register(_a_la_sortie)
@@ -5,12 +5,22 @@
 #   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
 #   |--------------------------------------------|   #
 # --Imports-- #
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import tracemalloc
+
 from dashboard import fenetre_bord
 from gestion_budgets import gestion_budgets
 from gestion_comptes import gestion_comptes
 from identification import *
+from instrumentation import nouvelle_session
+from session import SessionUtilisateur
 
 # --Constantes-- #
+NB_LIGNES_RAPPORT = 20      # nombre de fonctions / lignes listées par défaut dans les rapports de profilage
 
 
 # --Fonctions-- #
@@ -20,6 +30,7 @@ def gestion_banque() -> None:
 
     Cette fonction :
     - Vérifie les identifiants de connexion via la fonction identification()
+    - Charge une seule fois les données de l'utilisateur dans une session partagée par tous les écrans
     - Affiche un tableau de bord avec le solde courant
     - Permet de naviguer entre deux grandes fonctionnalités :
         1. Gestion des comptes
@@ -33,18 +44,137 @@ def gestion_banque() -> None:
     """
     # Initialisation de nos variables de connexion grâce à identification() qui renvoie un tuple
     connexion_valide, identifiant = identification()
+    if connexion_valide:
+        # Les mesures de performance (voir instrumentation.py) sont regroupées par session
+        nouvelle_session(identifiant)
+        session = SessionUtilisateur.charger(identifiant)
     while connexion_valide:
-        choix_phase = fenetre_bord(identifiant)
+        choix_phase = fenetre_bord(session)
         # Boucle de navigation principale (choix utilisateur)
         match choix_phase:
             case 0:     # Déconnexion
+                session.enregistrer(forcer=True)
                 return gestion_banque()
             case 1:     # Gestion de comptes
-                gestion_comptes(identifiant)
+                gestion_comptes(session)
             case 2:     # Gestion de budgets
-                gestion_budgets(identifiant)
+                gestion_budgets(session)
+
+
+def session_scriptee(chemin_script: str = None) -> None:
+    """
+    Exécute gestion_banque, en lisant les saisies dans un fichier si chemin_script est fourni.
+
+    Le fichier contient une saisie par ligne (identifiant, mot de passe, choix des menus...) ;
+    la session s'arrête sur une EOFError quand il est épuisé.
+
+    Args:
+        chemin_script (str, optional): Fichier des saisies à rejouer (saisies au clavier si None).
+
+    Returns:
+        None
+    """
+    if chemin_script is None:
+        gestion_banque()
+        return
+    with open(chemin_script, encoding='utf-8') as script:
+        sys.stdin, entree = script, sys.stdin
+        try:
+            gestion_banque()
+        finally:
+            sys.stdin = entree
+
+
+def rapport_allocations(cliche: tracemalloc.Snapshot, nb_lignes: int) -> str:
+    """
+    Construit le rapport des allocations d'un cliché tracemalloc, module par module.
+
+    Les modules de l'application (fichiers de ce dossier) sont triés par mémoire allouée, et pour
+    chacun sont listées ses nb_lignes lignes de code qui allouent le plus.
+
+    Args:
+        cliche (tracemalloc.Snapshot): Cliché pris en fin de session.
+        nb_lignes (int): Nombre de lignes listées par module.
+
+    Returns:
+        str: Le rapport, prêt à être écrit.
+    """
+    dossier = os.path.dirname(os.path.abspath(__file__))
+    cliche = cliche.filter_traces([tracemalloc.Filter(True, os.path.join(dossier, "*"))])
+    par_ligne = {}
+    for statistique in cliche.statistics('lineno'):
+        par_ligne.setdefault(statistique.traceback[0].filename, []).append(statistique)
+
+    lignes = []
+    for statistique in cliche.statistics('filename'):
+        fichier = statistique.traceback[0].filename
+        lignes.append(f"{os.path.basename(fichier)} : {statistique.size / 1024:.1f} Kio en {statistique.count} blocs")
+        for detail in par_ligne.get(fichier, [])[:nb_lignes]:
+            lignes.append(f"    ligne {detail.traceback[0].lineno:>5} : {detail.size / 1024:10.1f} Kio"
+                          f" en {detail.count} blocs")
+    return "\n".join(lignes)
+
+
+def profiler_session(prefixe: str, chemin_script: str = None, nb_lignes: int = NB_LIGNES_RAPPORT) -> None:
+    """
+    Exécute une session (interactive ou rejouée) sous cProfile et tracemalloc.
+
+    Écrit <prefixe>.pstats (à lire avec pstats ou snakeviz) et <prefixe>_allocations.txt (mémoire
+    allouée en fin de session, données de la session comprises, module par module, voir
+    rapport_allocations), puis affiche
+    les fonctions les plus coûteuses en temps cumulé. Le profilage ralentit nettement l'application :
+    les durées ne valent que les unes par rapport aux autres.
+
+    Args:
+        prefixe (str): Chemin des fichiers de résultats, sans extension.
+        chemin_script (str, optional): Fichier des saisies à rejouer (voir session_scriptee).
+        nb_lignes (int): Nombre de fonctions / lignes listées dans les rapports.
+
+    Returns:
+        None
+    """
+    tracemalloc.start()
+    profileur = cProfile.Profile()
+    cliche = None
+    try:
+        profileur.runcall(session_scriptee, chemin_script)
+    except (KeyboardInterrupt, EOFError):
+        # Cliché pris tant que l'exception retient la session : ses données sont encore en mémoire
+        cliche = tracemalloc.take_snapshot()
+        print("\n[Fin de la session]")
+    finally:
+        if cliche is None:
+            cliche = tracemalloc.take_snapshot()
+        _, pic = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profileur.dump_stats(f"{prefixe}.pstats")
+        with open(f"{prefixe}_allocations.txt", 'w', encoding='utf-8') as fichier:
+            fichier.write(f"Pic de mémoire allouée : {pic / 1024:.1f} Kio\n\n")
+            fichier.write(rapport_allocations(cliche, nb_lignes) + "\n")
+
+        print(f"\nProfil écrit dans {prefixe}.pstats, allocations dans {prefixe}_allocations.txt "
+              f"(pic : {pic / 1024:.1f} Kio)", file=sys.stderr)
+        pstats.Stats(profileur, stream=sys.stderr).sort_stats('cumulative').print_stats(nb_lignes)
 
 
 # --Programme principal-- 
 if __name__ == "__main__":
-    gestion_banque()
+    parseur = argparse.ArgumentParser(description="Gestion de banque.")
+    parseur.add_argument('--profil', metavar='PREFIXE',
+                         help="profile la session (cProfile et tracemalloc) ; écrit PREFIXE.pstats "
+                              "et PREFIXE_allocations.txt")
+    parseur.add_argument('--rejouer', metavar='FICHIER', help="rejoue les saisies d'un fichier (une par ligne)")
+    parseur.add_argument('--top', type=int, default=NB_LIGNES_RAPPORT,
+                         help="nombre de fonctions / lignes listées dans les rapports de profilage")
+    arguments = parseur.parse_args()
+
+    if arguments.profil:
+        profiler_session(arguments.profil, arguments.rejouer, arguments.top)
+    else:
+        try:
+            session_scriptee(arguments.rejouer)
+        except EOFError:
+            if arguments.rejouer is None:
+                raise
+            print("\n[Fin des saisies rejouées]")
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#   modeles.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |------Enregistrements Operation / Budget----|   #
+#   |--------------------------------------------|   #
+# Une opération et un budget sont des objets à champs fixes (__slots__ : ni __dict__ par objet,
+# ni place réservée en trop comme dans une liste), vérifiés à leur construction.
+# Pendant la migration, ils restent utilisables comme l'étaient les tuples et les listes :
+# accès par indice (constantes.IDX_OPE_* / IDX_BUD_*), déballage, len() et égalité avec un tuple
+# (ou une liste). L'accès par nom (operation.montant) est toutefois bien plus rapide que l'accès
+# par indice, qui passe par une méthode Python : les boucles de calcul utilisent les noms.
+# --Imports-- #
+import datetime
+from operator import attrgetter
+
+# --Constantes-- #
+# Noms des champs, dans l'ordre des indices IDX_OPE_* et IDX_BUD_* (voir constantes.py)
+CHAMPS_OPERATION = ('date', 'libelle', 'compte', 'montant', 'mode', 'passee', 'budget')
+CHAMPS_BUDGET = ('nom', 'montant', 'compte')
+
+_LECTEURS_OPERATION = tuple(attrgetter(champ) for champ in CHAMPS_OPERATION)
+
+
+# --Classes-- #
+class Operation:
+    """
+    Opération bancaire : (date, libellé, compte, montant, mode, passée, budget).
+
+    Une opération n'est pas modifiée après sa création (elle est partagée par les index, l'historique
+    et le journal) : pour en changer un champ, on en crée une nouvelle (voir remplacer).
+
+    Attributes:
+        date (datetime.date): Date de l'opération.
+        libelle (str): Libellé.
+        compte (str): Nom du compte concerné.
+        montant (int): Montant en centimes (négatif pour une dépense).
+        mode (str): Mode de paiement (ex : CB, CHE, VIR).
+        passee (bool): True si l'opération est passée.
+        budget (str): Nom du budget associé.
+    """
+
+    __slots__ = CHAMPS_OPERATION
+
+    def __init__(self, date: datetime.date, libelle: str, compte: str, montant: int,
+                 mode: str, passee: bool, budget: str):
+        if not (isinstance(date, datetime.date) and type(montant) is int and type(passee) is bool
+                and type(libelle) is str and type(compte) is str and type(mode) is str and type(budget) is str):
+            raise TypeError(f"Opération invalide : {(date, libelle, compte, montant, mode, passee, budget)!r}")
+        self.date = date
+        self.libelle = libelle
+        self.compte = compte
+        self.montant = montant
+        self.mode = mode
+        self.passee = passee
+        self.budget = budget
+
+    def en_tuple(self) -> tuple:
+        """Renvoie l'opération sous forme de tuple (date, libellé, compte, montant, mode, passée, budget)."""
+        return self.date, self.libelle, self.compte, self.montant, self.mode, self.passee, self.budget
+
+    def remplacer(self, **champs) -> 'Operation':
+        """Renvoie une copie de l'opération dont certains champs sont remplacés (ex : remplacer(montant=100))."""
+        valeurs = dict(zip(CHAMPS_OPERATION, self.en_tuple()))
+        valeurs.update(champs)
+        return Operation(**valeurs)
+
+    def __getitem__(self, indice):
+        if type(indice) is int:
+            return _LECTEURS_OPERATION[indice](self)
+        return self.en_tuple()[indice]
+
+    def __len__(self) -> int:
+        return len(CHAMPS_OPERATION)
+
+    def __iter__(self):
+        return iter(self.en_tuple())
+
+    def __eq__(self, autre) -> bool:
+        if isinstance(autre, Operation):
+            return self.en_tuple() == autre.en_tuple()
+        if isinstance(autre, tuple):
+            return self.en_tuple() == autre
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.en_tuple())
+
+    def __repr__(self) -> str:
+        return f"Operation{self.en_tuple()!r}"
+
+    def __reduce__(self):
+        # Sérialisation (pickle) compacte, utilisée entre les processus du serveur
+        return Operation, self.en_tuple()
+
+
+class Budget:
+    """
+    Budget mensuel : [nom, montant, compte associé].
+
+    Contrairement à une opération, un budget se modifie sur place (voir budgets.modifier_budget).
+
+    Attributes:
+        nom (str): Libellé du budget.
+        montant (int): Plafond mensuel, en centimes.
+        compte (str): Compte associé.
+    """
+
+    __slots__ = CHAMPS_BUDGET
+
+    def __init__(self, nom: str, montant: int, compte: str):
+        if not (type(nom) is str and type(montant) is int and type(compte) is str):
+            raise TypeError(f"Budget invalide : {[nom, montant, compte]!r}")
+        self.nom = nom
+        self.montant = montant
+        self.compte = compte
+
+    def en_liste(self) -> list:
+        """Renvoie le budget sous forme de liste [nom, montant, compte]."""
+        return [self.nom, self.montant, self.compte]
+
+    def __getitem__(self, indice):
+        if type(indice) is int:
+            return getattr(self, CHAMPS_BUDGET[indice])
+        return self.en_liste()[indice]
+
+    def __setitem__(self, indice: int, valeur) -> None:
+        setattr(self, CHAMPS_BUDGET[indice], valeur)
+
+    def __len__(self) -> int:
+        return len(CHAMPS_BUDGET)
+
+    def __iter__(self):
+        return iter(self.en_liste())
+
+    def __eq__(self, autre) -> bool:
+        if isinstance(autre, Budget):
+            return self.en_liste() == autre.en_liste()
+        if isinstance(autre, list):
+            return self.en_liste() == autre
+        return NotImplemented
+
+    __hash__ = None     # modifiable : comme une liste, un budget ne peut pas servir de clé
+
+    def __repr__(self) -> str:
+        return f"Budget({self.nom!r}, {self.montant!r}, {self.compte!r})"
+
+    def __reduce__(self):
+        return Budget, tuple(self.en_liste())
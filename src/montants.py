@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#   montants.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |-----Montants exacts en centimes (entiers)--|   #
+#   |--------------------------------------------|   #
+# --Imports-- #
+from decimal import Decimal, DecimalException, ROUND_HALF_UP
+
+# --Constantes-- #
+CENTIMES_PAR_EURO = 100
+# Bornes d'un montant en centimes : entier signé de 64 bits (champ 'q' du format binaire, voir format_binaire.py)
+CENTIMES_MIN = -2 ** 63
+CENTIMES_MAX = 2 ** 63 - 1
+
+
+# --Fonctions-- #
+def en_centimes(texte: str) -> int:
+    """
+    Convertit un montant en euros écrit en texte (ex : '-37.41', '100', '3.5') en nombre entier de centimes.
+
+    Le cas courant (chiffres, point décimal, au plus deux décimales) est traité directement par int(),
+    sans passer par un float : la conversion est exacte. Les autres écritures acceptées par float()
+    (exposant, plus de deux décimales, etc.) passent par Decimal et sont arrondies au centime le plus proche.
+    Le montant doit tenir sur 64 bits une fois converti en centimes (CENTIMES_MIN à CENTIMES_MAX).
+
+    Args:
+        texte (str): Montant en euros.
+
+    Returns:
+        int: Montant en centimes.
+
+    Raises:
+        ValueError: Si le texte n'est pas un montant valide, ou si le montant est hors bornes.
+    """
+    texte = texte.strip()
+    signe = texte[:1] if texte[:1] in ('+', '-') else ''
+    entier, _, decimales = texte[len(signe):].partition('.')
+    decimales_valides = not decimales or (len(decimales) <= 2 and decimales.isdecimal())
+    if decimales_valides and (entier.isdecimal() or (not entier and decimales)):
+        valeur = int(entier or 0) * CENTIMES_PAR_EURO + int(decimales.ljust(2, '0'))
+        return _dans_les_bornes(-valeur if signe == '-' else valeur, texte)
+
+    try:
+        montant = Decimal(texte)
+        if not montant.is_finite():
+            raise ValueError(f"Montant invalide : {texte!r}")
+        # Decimal lève InvalidOperation ou Overflow si le résultat dépasse son contexte (ex : '1e30')
+        valeur = int((montant * CENTIMES_PAR_EURO).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except DecimalException:
+        raise ValueError(f"Montant invalide : {texte!r}") from None
+    return _dans_les_bornes(valeur, texte)
+
+
+def _dans_les_bornes(centimes: int, texte: str) -> int:
+    """Renvoie centimes s'il tient sur 64 bits, lève ValueError sinon."""
+    if not CENTIMES_MIN <= centimes <= CENTIMES_MAX:
+        raise ValueError(f"Montant hors bornes : {texte!r}")
+    return centimes
+
+
+def formater_montant(centimes: int) -> str:
+    """
+    Écrit un montant en centimes sous forme d'euros avec deux décimales (ex : -3741 → '-37.41').
+
+    Utilisé aussi bien pour l'affichage que pour l'enregistrement dans les fichiers utilisateurs.
+
+    Args:
+        centimes (int): Montant en centimes.
+
+    Returns:
+        str: Montant en euros, avec deux décimales.
+    """
+    signe = '-' if centimes < 0 else ''
+    euros, reste = divmod(abs(centimes), CENTIMES_PAR_EURO)
+    return f"{signe}{euros}.{reste:02d}"
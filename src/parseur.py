@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+#   parseur.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |--Analyse des lignes CPT / OPE / BUD / SOL--|   #
+#   |--------------------------------------------|   #
+# Analyse des lignes décryptées d'un fichier utilisateur, aiguillées par une table selon leur préfixe.
+# Un même fichier répète beaucoup de valeurs (dates, montants, comptes, modes, budgets, libellés) :
+# chaque valeur distincte n'est convertie (ou créée) qu'une seule fois, puis partagée par
+# toutes les opérations qui l'utilisent, ce qui économise à la fois du temps et de la mémoire.
+# Les libellés sont partagés au moyen de la table de symboles de l'utilisateur (voir symboles.py).
+# --Imports-- #
+import datetime
+
+from instrumentation import chronometre, compter
+from modeles import Budget, Operation
+from montants import en_centimes
+from points_reprise import PointsReprise
+from symboles import TableSymboles
+
+
+# --Classes-- #
+class ParseurEnregistrements:
+    """
+    Analyseur de lignes 'CPT', 'OPE' et 'BUD' (et 'SOL', voir analyser_lignes), avec ses caches.
+
+    Les caches grandissent avec le nombre de valeurs distinctes rencontrées : un analyseur sert
+    à lire un fichier (ou l'historique d'un utilisateur), pas toute la durée d'un serveur.
+
+    Attributes:
+        symboles (TableSymboles): Table des libellés (comptes, libellés, modes, budgets) de l'utilisateur.
+    """
+
+    def __init__(self, symboles: TableSymboles = None):
+        self._dates = {}        # 'jj/mm/aaaa' -> datetime.date
+        self._montants = {}     # texte du montant -> centimes
+        self.symboles = symboles if symboles is not None else TableSymboles()
+        self._exemplaires = self.symboles.exemplaires
+
+    def date(self, texte: str) -> datetime.date:
+        """
+        Convertit une date 'jj/mm/aaaa' en datetime.date (une seule conversion par date distincte).
+
+        Raises:
+            ValueError: Si la date est invalide.
+        """
+        date = self._dates.get(texte)
+        if date is None:
+            date = self._dates[texte] = datetime.date(int(texte[6:]), int(texte[3:5]), int(texte[:2]))
+        return date
+
+    def montant(self, texte: str) -> int:
+        """
+        Convertit un montant en euros en centimes (voir montants.en_centimes), une fois par texte distinct.
+
+        Raises:
+            ValueError: Si le montant est invalide.
+        """
+        montant = self._montants.get(texte)
+        if montant is None:
+            montant = self._montants[texte] = en_centimes(texte)
+        return montant
+
+    def compte(self, champs: list) -> str | None:
+        """
+        Convertit les champs d'une ligne 'CPT' décryptée en nom de compte.
+
+        Args:
+            champs (list): Champs de la ligne découpée sur '*' (préfixe 'CPT' inclus).
+
+        Returns:
+            str | None: Nom du compte, ou None si la ligne est mal formée.
+        """
+        return self.symboles.symbole(champs[1]) if len(champs) >= 2 else None
+
+    def operation(self, champs: list) -> Operation | None:
+        """
+        Convertit les champs d'une ligne 'OPE' décryptée en opération.
+
+        Args:
+            champs (list): Champs de la ligne découpée sur '*' (préfixe 'OPE' inclus), non modifiés.
+
+        Returns:
+            Operation | None: L'opération, ou None si la ligne est mal formée.
+
+        Raises:
+            ValueError: Si la date ou le montant est invalide.
+        """
+        # Structure attendue : OPE*date*libellé*compte*montant*mode*état*budget
+        if len(champs) != 8:
+            return None
+        _, date, libelle, compte, montant, mode, etat, budget = champs
+        exemplaires = self._exemplaires
+        return Operation(self.date(date), exemplaires.setdefault(libelle, libelle),
+                         exemplaires.setdefault(compte, compte), self.montant(montant),
+                         exemplaires.setdefault(mode, mode), etat == 'True', exemplaires.setdefault(budget, budget))
+
+    def budget(self, champs: list) -> Budget | None:
+        """
+        Convertit les champs d'une ligne 'BUD' décryptée en budget.
+
+        Args:
+            champs (list): Champs de la ligne découpée sur '*' (préfixe 'BUD' inclus), non modifiés.
+
+        Returns:
+            Budget | None: Le budget, ou None si la ligne est mal formée.
+        """
+        # Structure attendue : BUD*nom*montant*compte
+        if len(champs) != 4:
+            return None
+        return Budget(self.symboles.symbole(champs[1]), self.montant(champs[2]), self.symboles.symbole(champs[3]))
+
+    @chronometre('parseur.analyser_lignes')
+    def analyser_lignes(self, lignes, points_reprise: PointsReprise = None) -> tuple:
+        """
+        Analyse en une passe des lignes décryptées, aiguillées selon leur premier champ.
+
+        Les lignes mal formées ou de type inconnu sont ignorées.
+
+        Args:
+            lignes (iterable): Lignes en clair du fichier utilisateur (sans la ligne 'HASH*').
+            points_reprise (PointsReprise, optional): Reçoit les points de reprise (lignes 'SOL'),
+                                                      ignorés si None.
+
+        Returns:
+            tuple: (liste_comptes, liste_operations, liste_budgets)
+        """
+        comptes, operations, budgets = [], [], []
+        # Préfixe -> (analyse des champs, ajout du résultat)
+        table = {'CPT': (self.compte, comptes.append),
+                 'OPE': (self.operation, operations.append),
+                 'BUD': (self.budget, budgets.append)}
+
+        for ligne in lignes:
+            champs = ligne.strip().split('*')
+            entree = table.get(champs[0])
+            if entree is not None:
+                enregistrement = entree[0](champs)
+                if enregistrement is not None:
+                    entree[1](enregistrement)
+            elif champs[0] == 'SOL' and points_reprise is not None:
+                points_reprise.ajouter_ligne(champs)
+
+        compter('parseur.operations', len(operations))
+        return comptes, operations, budgets
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+#   persistance_async.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |---Chargements / enregistrements asyncio----|   #
+#   |--------------------------------------------|   #
+# Les lectures et écritures de fichiers utilisateurs (import, journal, copie dans backup/, remplacement
+# du fichier) sont bloquantes : appelées depuis la boucle asyncio du serveur, elles arrêteraient tous
+# les clients le temps d'un accès disque. Ce module les confie à un pool de threads de taille bornée
+# (NB_THREADS_PERSISTANCE) et les expose sous forme de coroutines.
+# Les enregistrements d'une même session sont fusionnés : tant qu'un enregistrement demandé n'a pas
+# commencé, les demandes suivantes l'attendent au lieu d'en lancer un autre (il écrira aussi leurs
+# modifications). Il y a donc au plus un enregistrement en cours et un en attente par utilisateur,
+# quel que soit le nombre de requêtes.
+# --Imports-- #
+import asyncio
+import contextlib
+import contextvars
+import functools
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from constantes import DOSSIER_USERS, FORMAT_BINAIRE, FORMAT_FICHIER_USERS, NB_THREADS_PERSISTANCE
+from format_binaire import est_au_format_binaire
+from import_donnees import import_donnees_utilisateur
+from instrumentation import StatistiquePhase, appel_mesure, compter, integrer_mesures
+from points_reprise import PointsReprise
+from session import SessionUtilisateur
+from symboles import TableSymboles
+from utils import lire_version_fichier
+from verrou_utilisateur import VerrouUtilisateur
+
+
+# --Classes-- #
+class _EnregistrementEnAttente:
+    """Enregistrement d'une session demandé mais pas encore commencé (partagé par les demandes fusionnées)."""
+
+    __slots__ = ('forcer', 'tache')
+
+    def __init__(self, forcer: bool):
+        self.forcer = forcer
+        self.tache = None
+
+
+class PersistanceAsynchrone:
+    """
+    Chargements et enregistrements des fichiers utilisateurs, exécutés hors de la boucle asyncio.
+
+    Un verrou par utilisateur (voir acces) sérialise les accès à ses fichiers et à sa session :
+    un enregistrement ne commence qu'une fois les requêtes précédentes de l'utilisateur traitées,
+    et aucune requête ne modifie la session pendant qu'elle est écrite. Les autres processus
+    (ex : l'application lancée en parallèle) sont tenus à l'écart par le verrou de fichier
+    (voir verrou_utilisateur.py), pris dans les threads du pool.
+
+    Au chargement, le décodage des fichiers (décryptage, vérification du hash) est coûteux en CPU :
+    il peut être confié à un autre pool (pool_calcul, ex : un pool de processus) que celui des threads.
+
+    Attributes:
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
+        nb_threads (int): Nombre maximal de threads d'entrées / sorties.
+        en_cours (int): Nombre de tâches soumises aux pools et pas encore terminées (en file ou en exécution).
+        profondeur_max (int): Plus grande valeur atteinte par en_cours.
+        enregistrements_fusionnes (int): Nombre de demandes d'enregistrement servies par un enregistrement déjà prévu.
+    """
+
+    def __init__(self, dossier_users: str = DOSSIER_USERS, nb_threads: int = NB_THREADS_PERSISTANCE,
+                 pool_calcul: Executor = None):
+        self.dossier_users = dossier_users
+        self.nb_threads = nb_threads
+        self.en_cours = 0
+        self.profondeur_max = 0
+        self.enregistrements_fusionnes = 0
+        self._pool = ThreadPoolExecutor(max_workers=nb_threads, thread_name_prefix='persistance')
+        self._pool_calcul = pool_calcul
+        self._statistiques = {}     # '<tâche>.latence' / '<tâche>.execution' -> StatistiquePhase
+        self._verrous = {}          # identifiant -> [asyncio.Lock, nombre d'utilisateurs du verrou]
+        self._en_attente = {}       # session -> _EnregistrementEnAttente
+
+    @contextlib.asynccontextmanager
+    async def acces(self, identifiant: str):
+        """
+        Accès exclusif aux fichiers et à la session d'un utilisateur : async with persistance.acces(id): ...
+
+        Le verrou est créé à la première demande et supprimé dès qu'il n'est plus ni tenu ni attendu.
+
+        Args:
+            identifiant (str): Identifiant de l'utilisateur.
+        """
+        entree = self._verrous.get(identifiant)
+        if entree is None:
+            entree = self._verrous[identifiant] = [asyncio.Lock(), 0]
+        entree[1] += 1
+        try:
+            async with entree[0]:
+                yield
+        finally:
+            entree[1] -= 1
+            if entree[1] == 0:
+                del self._verrous[identifiant]
+
+    async def charger_session(self, identifiant: str, cle_cryptage: int, nom: str) -> SessionUtilisateur:
+        """
+        Charge les données d'un utilisateur (fichier personnel puis journal) et ouvre sa session.
+
+        Args:
+            identifiant (str): Identifiant de l'utilisateur.
+            cle_cryptage (int): Clé de cryptage de ses fichiers.
+            nom (str): Nom de l'utilisateur.
+
+        Returns:
+            SessionUtilisateur: La session initialisée avec ses données.
+        """
+        async with self.acces(identifiant):
+            donnees, mesures = await self._executer(
+                'chargement', appel_mesure, _lire_donnees, identifiant, cle_cryptage, self.dossier_users,
+                pool=self._pool_calcul)
+        # Mesures faites dans le pool de calcul (éventuellement un autre processus), voir instrumentation.py
+        integrer_mesures(mesures)
+        (lst_cpt, lst_ope, lst_bud, etat_journal), binaire, version_fichier, points_reprise, symboles = donnees
+        return SessionUtilisateur(identifiant, cle_cryptage, nom, lst_cpt, lst_ope, lst_bud,
+                                  etat_journal=etat_journal, dossier_users=self.dossier_users,
+                                  format_fichier=FORMAT_BINAIRE if binaire else FORMAT_FICHIER_USERS,
+                                  points_reprise=points_reprise, symboles=symboles, version_fichier=version_fichier)
+
+    async def enregistrer_session(self, session: SessionUtilisateur, forcer: bool = False) -> bool:
+        """
+        Enregistre les modifications d'une session (voir SessionUtilisateur.enregistrer) dans un thread.
+
+        Si un enregistrement de cette session est déjà prévu mais pas commencé, la demande le rejoint
+        (forcé si l'une des demandes l'est) et en partage le résultat.
+
+        Args:
+            session (SessionUtilisateur): Session à enregistrer.
+            forcer (bool): Si True, écrit immédiatement les modifications en attente.
+
+        Returns:
+            bool: True si des données ont été écrites, False si l'écriture a été évitée ou reportée.
+        """
+        attente = self._en_attente.get(session)
+        if attente is not None:
+            attente.forcer = attente.forcer or forcer
+            self.enregistrements_fusionnes += 1
+            compter('persistance.enregistrements_fusionnes')
+        else:
+            attente = self._en_attente[session] = _EnregistrementEnAttente(forcer)
+            attente.tache = asyncio.ensure_future(self._enregistrer(session, attente))
+        # shield : un client qui se déconnecte n'annule pas l'enregistrement attendu par les autres
+        return await asyncio.shield(attente.tache)
+
+    async def _enregistrer(self, session: SessionUtilisateur, attente: _EnregistrementEnAttente) -> bool:
+        try:
+            async with self.acces(session.identifiant):
+                # L'enregistrement commence : les demandes suivantes en prévoiront un nouveau
+                del self._en_attente[session]
+                return await self._executer('enregistrement', session.enregistrer, attente.forcer)
+        finally:
+            # Tâche annulée avant d'avoir obtenu le verrou (ex : arrêt de la boucle)
+            if self._en_attente.get(session) is attente:
+                del self._en_attente[session]
+
+    async def _executer(self, tache: str, fonction, *args, pool: Executor = None):
+        """
+        Exécute fonction(*args) dans un pool (par défaut celui des threads) en mesurant latence et durée.
+
+        Dans un thread, la fonction s'exécute dans le contexte de l'appelant : ses mesures (voir
+        instrumentation.py) vont à la session de la connexion qui l'a demandée.
+        """
+        self.en_cours += 1
+        self.profondeur_max = max(self.profondeur_max, self.en_cours)
+        debut = time.perf_counter()
+        appel = functools.partial(_appel_chronometre, fonction, *args)
+        if pool is None:
+            appel = functools.partial(contextvars.copy_context().run, appel)
+        try:
+            duree, resultat = await asyncio.get_running_loop().run_in_executor(pool or self._pool, appel)
+        finally:
+            self.en_cours -= 1
+        self._ajouter_duree(f'{tache}.latence', time.perf_counter() - debut)
+        self._ajouter_duree(f'{tache}.execution', duree)
+        return resultat
+
+    def _ajouter_duree(self, phase: str, duree: float) -> None:
+        statistique = self._statistiques.get(phase)
+        if statistique is None:
+            statistique = self._statistiques[phase] = StatistiquePhase()
+        statistique.ajouter(duree)
+
+    def metriques(self) -> dict:
+        """
+        Renvoie l'état de la file et les durées mesurées, sous une forme sérialisable en JSON.
+
+        Pour chaque type de tâche ('chargement', 'enregistrement'), 'latence' mesure le temps entre
+        la soumission et le résultat (attente dans la file comprise) et 'execution' le seul travail.
+
+        Returns:
+            dict: {'en_cours', 'profondeur_max', 'nb_threads', 'enregistrements_fusionnes',
+                   'phases': {phase: statistique (voir StatistiquePhase.en_dict)}}
+        """
+        return {'en_cours': self.en_cours, 'profondeur_max': self.profondeur_max, 'nb_threads': self.nb_threads,
+                'enregistrements_fusionnes': self.enregistrements_fusionnes,
+                'phases': {phase: statistique.en_dict() for phase, statistique in sorted(self._statistiques.items())}}
+
+    def fermer(self) -> None:
+        """Attend la fin des tâches soumises puis arrête le pool de threads (le pool de calcul n'est pas arrêté)."""
+        self._pool.shutdown()
+
+
+# --Fonctions-- #
+def _appel_chronometre(fonction, *args) -> tuple:
+    """Renvoie (durée en secondes, fonction(*args)) ; exécutée dans un thread ou un processus du pool."""
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return time.perf_counter() - debut, resultat
+
+
+def _lire_donnees(identifiant: str, cle_cryptage: int, dossier_users: str) -> tuple:
+    """
+    Renvoie (données de import_donnees_utilisateur, True si le fichier est au format binaire, version des
+    données, points de reprise du fichier, table des libellés), lues sous le verrou de lecture de l'utilisateur.
+
+    La table des libellés est renvoyée avec les opérations : renvoyées par un autre processus, elles sont
+    transmises ensemble (pickle) et les libellés des opérations restent les exemplaires de la table.
+    Les points de reprise sont vides si le fichier n'en contient pas (format binaire, voir import_donnees_utilisateur) :
+    la session les calcule alors.
+    """
+    points_reprise, symboles = PointsReprise(), TableSymboles()
+    with VerrouUtilisateur(identifiant, dossier_users, exclusif=False):
+        return (import_donnees_utilisateur(identifiant, cle_cryptage, dossier_users,
+                                           points_reprise=points_reprise, symboles=symboles),
+                est_au_format_binaire(identifiant, dossier_users),
+                lire_version_fichier(identifiant, cle_cryptage, dossier_users),
+                points_reprise, symboles)
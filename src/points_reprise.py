@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#   points_reprise.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |-----Points de reprise des soldes (SOL)-----|   #
+#   |--------------------------------------------|   #
+# Un point de reprise est le solde d'un compte à la fin d'un mois où il a des opérations.
+# Il est enregistré dans le fichier utilisateur (format texte) par une ligne :
+#   SOL*<compte>*<mm/aaaa>*<solde>*<solde des opérations passées>
+# Ces lignes précèdent la ligne 'HASH*' : elles sont couvertes par la vérification d'intégrité.
+# --Imports-- #
+import datetime
+from bisect import bisect_left, bisect_right
+
+from montants import en_centimes, formater_montant
+
+
+# --Fonctions-- #
+def numero_mois(date: datetime.date) -> int:
+    """Numérote les mois de façon continue (janvier de l'an 1 : 12), pour comparer et ordonner les mois."""
+    return date.year * 12 + date.month - 1
+
+
+# --Classes-- #
+class PointsReprise:
+    """
+    Soldes de chaque compte à la fin de chaque mois où il a des opérations.
+
+    Le solde d'un compte à une date donnée s'obtient à partir du dernier point de reprise du mois
+    précédent, complété par les seules opérations du mois (voir SessionUtilisateur.solde_au) ;
+    le solde actuel est directement le dernier point de reprise de chaque compte.
+    """
+
+    def __init__(self):
+        self._mois = {}         # compte -> numéros des mois (croissants)
+        self._soldes = {}       # compte -> soldes (solde, solde des opérations passées), mois par mois
+
+    def __len__(self) -> int:
+        return sum(len(mois) for mois in self._mois.values())
+
+    @classmethod
+    def calculer(cls, lst_ope) -> 'PointsReprise':
+        """
+        Calcule les points de reprise d'une liste d'opérations, en une seule passe (dans un ordre quelconque).
+
+        Args:
+            lst_ope (iterable): Opérations de l'utilisateur (voir modeles.Operation).
+
+        Returns:
+            PointsReprise: Les points de reprise de chaque compte.
+        """
+        variations = {}     # compte -> {numéro du mois: [variation, variation des opérations passées]}
+        for operation in lst_ope:
+            par_mois = variations.setdefault(operation.compte, {})
+            variation = par_mois.get(numero_mois(operation.date))
+            if variation is None:
+                variation = par_mois[numero_mois(operation.date)] = [0, 0]
+            variation[0] += operation.montant
+            if operation.passee:
+                variation[1] += operation.montant
+
+        points = cls()
+        for compte, par_mois in variations.items():
+            solde = solde_passe = 0
+            mois_compte, soldes_compte = points._mois[compte], points._soldes[compte] = [], []
+            for mois in sorted(par_mois):
+                solde += par_mois[mois][0]
+                solde_passe += par_mois[mois][1]
+                mois_compte.append(mois)
+                soldes_compte.append((solde, solde_passe))
+        return points
+
+    def ajouter_ligne(self, champs: list) -> bool:
+        """
+        Ajoute le point de reprise d'une ligne 'SOL' décryptée.
+
+        Args:
+            champs (list): Champs de la ligne découpée sur '*' (préfixe 'SOL' inclus).
+
+        Returns:
+            bool: True si le point a été ajouté, False si la ligne est mal formée.
+        """
+        if len(champs) != 5 or len(champs[2]) != 7:
+            return False
+        mois = int(champs[2][3:]) * 12 + int(champs[2][:2]) - 1
+        mois_compte = self._mois.setdefault(champs[1], [])
+        soldes_compte = self._soldes.setdefault(champs[1], [])
+        # Les lignes sont écrites dans l'ordre des mois : l'insertion se fait normalement en fin de liste
+        position = bisect_left(mois_compte, mois)
+        soldes = (en_centimes(champs[3]), en_centimes(champs[4]))
+        if position < len(mois_compte) and mois_compte[position] == mois:
+            soldes_compte[position] = soldes
+        else:
+            mois_compte.insert(position, mois)
+            soldes_compte.insert(position, soldes)
+        return True
+
+    def lignes(self):
+        """
+        Produit les lignes 'SOL' (en clair) de tous les points de reprise, compte par compte et mois par mois.
+
+        Yields:
+            str: Ligne 'SOL*compte*mm/aaaa*solde*solde_passe', sans saut de ligne.
+        """
+        for compte, mois_compte in self._mois.items():
+            for mois, (solde, solde_passe) in zip(mois_compte, self._soldes[compte]):
+                yield (f"SOL*{compte}*{mois % 12 + 1:02d}/{mois // 12:04d}"
+                       f"*{formater_montant(solde)}*{formater_montant(solde_passe)}")
+
+    def soldes_finaux(self) -> tuple:
+        """
+        Renvoie le dernier point de reprise de chaque compte, c'est-à-dire son solde actuel.
+
+        Returns:
+            tuple: (dict {compte: solde}, dict {compte: solde des opérations passées}), en centimes.
+        """
+        return ({compte: soldes[-1][0] for compte, soldes in self._soldes.items() if soldes},
+                {compte: soldes[-1][1] for compte, soldes in self._soldes.items() if soldes})
+
+    def solde_avant(self, compte: str, date: datetime.date, passees_seulement: bool = False) -> int:
+        """
+        Renvoie le solde d'un compte à la fin du mois précédant celui d'une date (recherche dichotomique).
+
+        Args:
+            compte (str): Nom du compte.
+            date (datetime.date): Date dont le mois sert de limite (exclu).
+            passees_seulement (bool): Si True, ne tient compte que des opérations passées.
+
+        Returns:
+            int: Solde en centimes (0 si le compte n'a aucune opération avant ce mois).
+        """
+        mois_compte = self._mois.get(compte, [])
+        position = bisect_right(mois_compte, numero_mois(date) - 1)
+        if position == 0:
+            return 0
+        return self._soldes[compte][position - 1][1 if passees_seulement else 0]
@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+#   serveur.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |-----Serveur de sessions multi-utilisateurs-|   #
+#   |--------------------------------------------|   #
+# Usage (depuis src/) :
+#   python serveur.py [--hote 127.0.0.1] [--port 8765] [--processus 4]
+#
+# Protocole : une requête JSON par ligne, une réponse JSON par ligne.
+#   {"action": "connexion", "identifiant": "71030817", "mdp": "454196"}
+#   {"action": "tableau_bord"}
+#   {"action": "soldes", "date": "31/12/2023", "passees_seulement": false}
+#   {"action": "operations", "compte": "Compte A", "debut": "01/01/2022", "fin": "31/01/2022"}
+#   {"action": "ajouter_operation", "date": "01/05/2025", "libelle": "cafe", "compte": "Compte A",
+#    "montant": "-3.50", "mode": "CB", "passee": true, "budget": "sorties"}
+#   {"action": "deconnexion"}
+# Les montants sont échangés en euros sous forme de texte (ex : "-3.50"), les dates au format jj/mm/aaaa.
+# --Imports-- #
+import argparse
+import asyncio
+import datetime
+import json
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from constantes import (
+    IDX_BUD_NOM,
+    IDX_BUD_MONTANT,
+    IDX_BUD_CPT,
+    DOSSIER_USERS
+)
+from index_idents import IndexIdentifiants
+from instrumentation import nouvelle_session
+from modeles import Budget, Operation
+from montants import en_centimes, formater_montant
+from persistance_async import PersistanceAsynchrone
+from session import SessionUtilisateur
+from shared import dict_ident
+
+# --Constantes-- #
+HOTE = '127.0.0.1'
+PORT = 8765
+FORMAT_DATE = '%d/%m/%Y'
+
+
+# --Classes-- #
+class ErreurRequete(Exception):
+    """Requête invalide : le message est renvoyé tel quel au client."""
+
+
+class ServeurBanque:
+    """
+    Serveur asyncio exposant les fonctionnalités de l'application (tableau de bord, comptes, budgets)
+    sous forme de requêtes / réponses JSON, pour plusieurs utilisateurs à la fois.
+
+    Chaque connexion correspond à un utilisateur identifié. Les données d'un utilisateur sont chargées
+    à sa connexion, dans un processus du pool (décryptage et vérification du hash sont coûteux en CPU),
+    puis conservées dans une SessionUtilisateur partagée par toutes ses connexions. Les enregistrements
+    sont faits par le pool de threads de la persistance (voir persistance_async.py), sans bloquer les
+    autres clients ; le verrou de l'utilisateur (persistance.acces) garantit que ses requêtes et ses
+    enregistrements sont traités l'un après l'autre.
+
+    Attributes:
+        idents (IndexIdentifiants): Identifiants autorisés (par défaut dict_ident).
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
+        sessions (dict): Sessions ouvertes {identifiant: SessionUtilisateur}.
+        persistance (PersistanceAsynchrone): Chargements et enregistrements des fichiers utilisateurs
+                                             (voir persistance.metriques pour la file et les latences).
+    """
+
+    def __init__(self, idents: IndexIdentifiants = None, dossier_users: str = DOSSIER_USERS, nb_processus: int = None):
+        self.idents = dict_ident if idents is None else idents
+        self.dossier_users = dossier_users
+        self.sessions = {}
+        self._nb_connexions = {}
+        self._chargements = {}
+        self._clients = {}
+        self._pool = ProcessPoolExecutor(max_workers=nb_processus)
+        self.persistance = PersistanceAsynchrone(dossier_users, pool_calcul=self._pool)
+        self._actions = {
+            'tableau_bord': self._tableau_bord,
+            'soldes': self._soldes,
+            'operations': self._operations,
+            'ajouter_operation': self._ajouter_operation,
+            'ajouter_compte': self._ajouter_compte,
+            'virement': self._virement,
+            'budgets': self._budgets,
+            'ajouter_budget': self._ajouter_budget,
+            'rapport_budget': self._rapport_budget,
+            'enregistrer': self._enregistrer,
+        }
+
+    # ----- Ouverture et fermeture des sessions ----- #
+    async def ouvrir_session(self, identifiant: str) -> SessionUtilisateur:
+        """
+        Renvoie la session d'un utilisateur, en chargeant ses données si elle n'est pas déjà ouverte.
+
+        Le chargement (lecture, décryptage, vérification du hash) est fait dans le pool de processus.
+        Deux connexions simultanées du même utilisateur partagent le même chargement.
+        Les mesures de performance de la connexion (voir instrumentation.py) forment une session à part.
+
+        Args:
+            identifiant (str): Identifiant de l'utilisateur (déjà authentifié).
+
+        Returns:
+            SessionUtilisateur: La session de l'utilisateur.
+        """
+        nouvelle_session(identifiant)
+        self._nb_connexions[identifiant] = self._nb_connexions.get(identifiant, 0) + 1
+        if identifiant in self.sessions:
+            return self.sessions[identifiant]
+
+        chargement = self._chargements.get(identifiant)
+        if chargement is None:
+            chargement = self._chargements[identifiant] = asyncio.ensure_future(self._charger(identifiant))
+        try:
+            return await chargement
+        except BaseException:
+            self._nb_connexions[identifiant] -= 1
+            raise
+        finally:
+            self._chargements.pop(identifiant, None)
+
+    async def _charger(self, identifiant: str) -> SessionUtilisateur:
+        _, nom, cle_cryptage = self.idents[identifiant]
+        session = await self.persistance.charger_session(identifiant, cle_cryptage, nom)
+        self.sessions[identifiant] = session
+        return session
+
+    async def fermer_session(self, identifiant: str) -> None:
+        """
+        Libère une connexion d'un utilisateur ; à la dernière, ses modifications sont enregistrées
+        et sa session est retirée de la mémoire.
+
+        Args:
+            identifiant (str): Identifiant de l'utilisateur.
+
+        Returns:
+            None
+        """
+        self._nb_connexions[identifiant] -= 1
+        if self._nb_connexions[identifiant] > 0:
+            return
+        await self.persistance.enregistrer_session(self.sessions[identifiant], forcer=True)
+        # Une nouvelle connexion a pu arriver pendant l'enregistrement
+        if self._nb_connexions[identifiant] == 0:
+            del self._nb_connexions[identifiant], self.sessions[identifiant]
+
+    # ----- Traitement des requêtes ----- #
+    async def traiter(self, identifiant: str, requete: dict) -> dict:
+        """
+        Exécute une requête d'un utilisateur connecté et renvoie la réponse.
+
+        Les requêtes qui modifient les données sont suivies d'un enregistrement (voir
+        SessionUtilisateur.enregistrer), fait dans un thread pour ne pas bloquer les autres clients.
+        Les enregistrements demandés par des requêtes rapprochées du même utilisateur sont fusionnés
+        (voir PersistanceAsynchrone.enregistrer_session).
+
+        Args:
+            identifiant (str): Identifiant de l'utilisateur connecté.
+            requete (dict): Requête décodée ({"action": ..., paramètres}).
+
+        Returns:
+            dict: Réponse à renvoyer au client.
+        """
+        action = self._actions.get(requete.get('action'))
+        if action is None:
+            raise ErreurRequete(f"Action inconnue : {requete.get('action')!r}")
+
+        session = self.sessions[identifiant]
+        async with self.persistance.acces(identifiant):
+            reponse = action(session, requete)
+        if session.est_modifiee:
+            reponse['enregistre'] = await self.persistance.enregistrer_session(
+                session, forcer=requete['action'] == 'enregistrer')
+        return reponse
+
+    @staticmethod
+    def _tableau_bord(session: SessionUtilisateur, requete: dict) -> dict:
+        # Comme fenetre_bord : le compte courant est le premier compte
+        compte = session.lst_cpt[0] if session.lst_cpt else None
+        return {'nom': session.nom, 'compte': compte,
+                'solde': formater_montant(session.solde(compte)) if compte else None}
+
+    @staticmethod
+    def _soldes(session: SessionUtilisateur, requete: dict) -> dict:
+        passees = bool(requete.get('passees_seulement', False))
+        if requete.get('date'):
+            # Soldes à une date passée : à partir des points de reprise (voir SessionUtilisateur.solde_au)
+            date = _lire_date(requete['date'])
+            return {'soldes': {compte: formater_montant(session.solde_au(compte, date, passees_seulement=passees))
+                               for compte in session.lst_cpt}}
+        return {'soldes': {compte: formater_montant(session.solde(compte, passees_seulement=passees))
+                           for compte in session.lst_cpt}}
+
+    @staticmethod
+    def _operations(session: SessionUtilisateur, requete: dict) -> dict:
+        compte = _compte_existant(session, requete.get('compte'))
+        debut = _lire_date(requete['debut']) if requete.get('debut') else None
+        fin = _lire_date(requete['fin']) if requete.get('fin') else None
+        return {'operations': [_operation_json(operation)
+                               for operation in session.index.plage(compte, debut, fin)]}
+
+    @staticmethod
+    def _ajouter_operation(session: SessionUtilisateur, requete: dict) -> dict:
+        # Mêmes règles que creation_operation
+        montant = _lire_montant(requete.get('montant'))
+        if montant == 0:
+            raise ErreurRequete("Le montant doit être non nul.")
+        budget = str(requete.get('budget', ''))
+        if budget not in {bud[IDX_BUD_NOM] for bud in session.lst_bud}:
+            raise ErreurRequete(f"Budget inconnu : {budget!r}")
+        operation = Operation(_lire_date(requete.get('date')),
+                              str(requete.get('libelle', '')).strip().capitalize(),
+                              _compte_existant(session, requete.get('compte')),
+                              montant,
+                              str(requete.get('mode', '')).strip().upper(),
+                              bool(requete.get('passee', True)),
+                              budget)
+        session.ajouter_operation(operation)
+        return {'operation': _operation_json(operation)}
+
+    @staticmethod
+    def _ajouter_compte(session: SessionUtilisateur, requete: dict) -> dict:
+        nom = str(requete.get('nom', '')).strip()
+        if not nom:
+            raise ErreurRequete("Le nom du compte est vide.")
+        if not session.ajouter_compte(nom):
+            raise ErreurRequete("Le compte existe déjà.")
+        return {'compte': session.lst_cpt[-1]}
+
+    @staticmethod
+    def _virement(session: SessionUtilisateur, requete: dict) -> dict:
+        # Mêmes règles que creer_virement
+        emetteur = _compte_existant(session, requete.get('emetteur'))
+        beneficiaire = _compte_existant(session, requete.get('beneficiaire'))
+        if emetteur == beneficiaire:
+            raise ErreurRequete("Le compte émetteur doit être différent du compte bénéficiaire.")
+        montant = _lire_montant(requete.get('montant'))
+        if montant <= 0:
+            raise ErreurRequete("Le montant du virement doit être strictement positif.")
+        if montant > session.solde(emetteur):
+            raise ErreurRequete(f"Il n'y a pas assez de provisions sur ce compte pour effectuer ce virement. "
+                                f"({formater_montant(montant)} € > {formater_montant(session.solde(emetteur))} €)")
+        session.ajouter_virement((emetteur, beneficiaire, montant))
+        return {'soldes': {emetteur: formater_montant(session.solde(emetteur)),
+                           beneficiaire: formater_montant(session.solde(beneficiaire))}}
+
+    @staticmethod
+    def _budgets(session: SessionUtilisateur, requete: dict) -> dict:
+        return {'budgets': [_budget_json(budget) for budget in session.lst_bud]}
+
+    @staticmethod
+    def _ajouter_budget(session: SessionUtilisateur, requete: dict) -> dict:
+        # Mêmes règles que creation_budget
+        libelle = str(requete.get('nom', '')).strip()
+        if not libelle or libelle.casefold() in {bud[IDX_BUD_NOM].casefold() for bud in session.lst_bud}:
+            raise ErreurRequete("Ce budget existe déjà (ou son nom est vide).")
+        montant = _lire_montant(requete.get('montant'))
+        if montant <= 0:
+            raise ErreurRequete("Le montant doit être strictement supérieur à 0 €.")
+        budget = Budget(libelle.capitalize(), montant, _compte_existant(session, requete.get('compte')))
+        session.ajouter_budget(budget)
+        return {'budget': _budget_json(budget)}
+
+    @staticmethod
+    def _rapport_budget(session: SessionUtilisateur, requete: dict) -> dict:
+        nom = requete.get('nom')
+        budget = next((bud for bud in session.lst_bud if bud[IDX_BUD_NOM] == nom), None)
+        if budget is None:
+            raise ErreurRequete(f"Budget inconnu : {nom!r}")
+        try:
+            mois = datetime.datetime.strptime(str(requete.get('mois')), '%m/%Y').date()
+        except ValueError:
+            raise ErreurRequete("Mois invalide (format attendu : mm/aaaa).") from None
+        rapport = session.rapport_budget(budget, mois)
+        return {'rapport': round(rapport, 4),
+                'depenses': formater_montant(round(rapport * budget[IDX_BUD_MONTANT])),
+                'budget': formater_montant(budget[IDX_BUD_MONTANT])}
+
+    @staticmethod
+    def _enregistrer(session: SessionUtilisateur, requete: dict) -> dict:
+        # L'enregistrement forcé est fait par traiter(), hors de la boucle asyncio
+        return {'enregistre': False}
+
+    # ----- Connexions réseau ----- #
+    async def gerer_client(self, lecteur: asyncio.StreamReader, ecrivain: asyncio.StreamWriter) -> None:
+        """
+        Dialogue avec un client : identification (première requête), puis requêtes jusqu'à la
+        déconnexion ou la fermeture de la connexion.
+
+        Chaque requête reçoit une réponse : {'ok': False, 'erreur': ...} pour une requête invalide
+        (JSON ou UTF-8 incorrect, action refusée) comme pour une erreur inattendue du serveur.
+
+        Args:
+            lecteur (asyncio.StreamReader): Flux de lecture de la connexion.
+            ecrivain (asyncio.StreamWriter): Flux d'écriture de la connexion.
+
+        Returns:
+            None
+        """
+        identifiant = None
+        self._clients[asyncio.current_task()] = ecrivain
+        try:
+            while ligne := await lecteur.readline():
+                try:
+                    try:
+                        requete = json.loads(ligne)
+                    except UnicodeDecodeError:
+                        raise ErreurRequete("La requête doit être encodée en UTF-8.") from None
+                    if not isinstance(requete, dict):
+                        raise ErreurRequete("La requête doit être un objet JSON.")
+                    if requete.get('action') == 'connexion':
+                        if identifiant is not None:
+                            raise ErreurRequete("Utilisateur déjà connecté.")
+                        session = await self.ouvrir_session(self._authentifier(requete))
+                        identifiant = session.identifiant
+                        reponse = {'nom': session.nom, 'comptes': session.lst_cpt}
+                    elif identifiant is None:
+                        raise ErreurRequete("Veuillez d'abord vous connecter.")
+                    elif requete.get('action') == 'deconnexion':
+                        identifiant, ancien = None, identifiant
+                        await self.fermer_session(ancien)
+                        reponse = {}
+                    else:
+                        reponse = await self.traiter(identifiant, requete)
+                    reponse['ok'] = True
+                except (ErreurRequete, json.JSONDecodeError) as erreur:
+                    reponse = {'ok': False, 'erreur': str(erreur)}
+                except Exception as erreur:
+                    # Erreur inattendue : journalisée ici, signalée au client sans couper la connexion
+                    print(f"Erreur pendant le traitement d'une requête de {identifiant} : {erreur!r}")
+                    traceback.print_exc()
+                    reponse = {'ok': False, 'erreur': "Erreur interne du serveur."}
+                ecrivain.write(json.dumps(reponse, ensure_ascii=False).encode('utf-8') + b'\n')
+                await ecrivain.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if identifiant is not None:
+                await self.fermer_session(identifiant)
+            ecrivain.close()
+            del self._clients[asyncio.current_task()]
+
+    def _authentifier(self, requete: dict) -> str:
+        """Vérifie l'identifiant et le mot de passe (mêmes règles que identification) et renvoie l'identifiant."""
+        identifiant = str(requete.get('identifiant', ''))
+        if not self.idents.verifier_mdp(identifiant, str(requete.get('mdp', ''))):
+            raise ErreurRequete("Identifiant ou mot de passe incorrect.")
+        return identifiant
+
+    async def demarrer(self, hote: str = HOTE, port: int = PORT) -> asyncio.Server:
+        """Démarre l'écoute des connexions et renvoie le serveur asyncio (port 0 : port libre choisi par le système)."""
+        return await asyncio.start_server(self.gerer_client, hote, port)
+
+    async def arreter(self) -> None:
+        """Ferme les connexions restantes, enregistre toutes les sessions encore ouvertes puis arrête le pool."""
+        # Fermer une connexion termine sa lecture : gerer_client enregistre alors la session du client
+        for ecrivain in self._clients.values():
+            ecrivain.close()
+        if self._clients:
+            await asyncio.wait(list(self._clients))
+        for session in list(self.sessions.values()):
+            await self.persistance.enregistrer_session(session, forcer=True)
+        self.persistance.fermer()
+        self._pool.shutdown()
+
+
+# --Fonctions-- #
+def _lire_date(texte) -> datetime.date:
+    try:
+        return datetime.datetime.strptime(str(texte), FORMAT_DATE).date()
+    except ValueError:
+        raise ErreurRequete(f"Date invalide : {texte!r} (format attendu : jj/mm/aaaa).") from None
+
+
+def _lire_montant(valeur) -> int:
+    try:
+        return en_centimes(str(valeur))
+    except ValueError:
+        raise ErreurRequete(f"Montant invalide : {valeur!r}") from None
+
+
+def _compte_existant(session: SessionUtilisateur, compte) -> str:
+    if compte not in session.lst_cpt:
+        raise ErreurRequete(f"Compte inconnu : {compte!r}")
+    return compte
+
+
+def _operation_json(operation: Operation) -> dict:
+    return {'date': operation.date.strftime(FORMAT_DATE),
+            'libelle': operation.libelle,
+            'compte': operation.compte,
+            'montant': formater_montant(operation.montant),
+            'mode': operation.mode,
+            'passee': operation.passee,
+            'budget': operation.budget}
+
+
+def _budget_json(budget: list) -> dict:
+    return {'nom': budget[IDX_BUD_NOM],
+            'montant': formater_montant(budget[IDX_BUD_MONTANT]),
+            'compte': budget[IDX_BUD_CPT]}
+
+
+async def servir(hote: str = HOTE, port: int = PORT, nb_processus: int = None) -> None:
+    """
+    Lance le serveur et traite les connexions jusqu'à l'interruption (Ctrl+C).
+
+    Args:
+        hote (str): Adresse d'écoute (locale par défaut).
+        port (int): Port d'écoute.
+        nb_processus (int): Nombre de processus pour le chargement des fichiers (None : nombre de CPU).
+
+    Returns:
+        None
+    """
+    serveur = ServeurBanque(nb_processus=nb_processus)
+    ecoute = await serveur.demarrer(hote, port)
+    print(f"Serveur à l'écoute sur {hote}:{port}")
+    try:
+        async with ecoute:
+            await ecoute.serve_forever()
+    finally:
+        await serveur.arreter()
+
+
+# --Programme principal-- #
+if __name__ == "__main__":
+    parseur = argparse.ArgumentParser(description="Serveur de sessions de gestion de banque.")
+    parseur.add_argument('--hote', default=HOTE)
+    parseur.add_argument('--port', type=int, default=PORT)
+    parseur.add_argument('--processus', type=int, default=None)
+    arguments = parseur.parse_args()
+    try:
+        asyncio.run(servir(arguments.hote, arguments.port, arguments.processus))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,586 @@
+# -*- coding: utf-8 -*-
+#   session.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |-------Données d'une session utilisateur----|   #
+#   |--------------------------------------------|   #
+# --Imports-- #
+import calendar
+import datetime
+import os
+import time
+from itertools import chain
+
+from budgets import ajout_budget, calcul_cube_depenses, maj_cube_depenses, rapport_bud_depenses
+from comptes import ajout_compte, ajout_operation, operations_virement
+from constantes import (
+    IDX_BUD_NOM,
+    DOSSIER_USERS,
+    FORMAT_BINAIRE,
+    FORMAT_FICHIER_USERS,
+    SEUIL_COMPACTION_JOURNAL,
+    DELAI_ENREGISTREMENT
+)
+from format_binaire import est_au_format_binaire
+from historique import HistoriqueOperations, ouvrir_historique
+from import_donnees import import_donnees_utilisateur, import_journal
+from index_operations import IndexOperations
+from instrumentation import chronometre
+from modeles import Budget, Operation
+from points_reprise import PointsReprise
+from symboles import TableSymboles
+from shared import dict_ident
+from utils import ajout_journal, chemin_journal, compter_entrees_journal, enregistrement_modif, lire_version_fichier
+from verrou_utilisateur import VerrouUtilisateur
+
+
+# --Classes-- #
+class SessionUtilisateur:
+    """
+    Registre en mémoire des données d'un utilisateur connecté, partagé par tous les écrans de la session.
+
+    Le fichier utilisateur n'est chargé qu'une fois, à la connexion. Les soldes de chaque compte sont
+    calculés une seule fois puis tenus à jour à chaque ajout d'opération ou de virement, ce qui rend
+    leur consultation immédiate (O(1)). Lorsque le fichier contient des points de reprise (lignes 'SOL',
+    voir points_reprise.py), les soldes initiaux en sont repris : seules les opérations du journal sont
+    alors parcourues. Le cube des dépenses par budget et par mois n'est calculé qu'au premier rapport.
+    Deux soldes sont maintenus par compte :
+        - dict_soldes : toutes les opérations (convention de calcul_dict_soldes)
+        - dict_soldes_passes : uniquement les opérations passées (convention de calcul_solde)
+
+    Les nouvelles opérations sont enregistrées dans le journal de l'utilisateur (ajout en fin de
+    fichier, O(1)) ; le fichier complet n'est réécrit que lorsque les comptes ou les budgets changent,
+    ou lorsque le journal dépasse SEUIL_COMPACTION_JOURNAL entrées (compaction).
+
+    Les opérations peuvent aussi être un historique paresseux (voir historique.HistoriqueOperations) :
+    les soldes sont alors repris du point de reprise enregistré avec le fichier, et une opération n'est
+    décodée que lorsqu'un écran ou un rapport la parcourt. Le cube des dépenses n'est jamais calculé
+    dans ce cas : un rapport ne décode que les opérations du mois concerné.
+
+    La session sait si ses comptes, opérations ou budgets ont réellement changé : un enregistrement
+    demandé alors que rien n'a changé est évité, de même que ceux demandés moins de
+    DELAI_ENREGISTREMENT secondes après le précédent (les modifications sont alors regroupées
+    jusqu'à l'enregistrement suivant, ou jusqu'à un enregistrement forcé).
+
+    Plusieurs sessions peuvent être ouvertes en même temps sur les fichiers d'un même utilisateur
+    (plusieurs instances de l'application, un serveur) : chaque enregistrement se fait sous son verrou
+    d'écriture (voir verrou_utilisateur.py). Si le fichier ou le journal a changé depuis le chargement
+    (version des données ou nombre d'entrées du journal différents), la session relit d'abord l'état du
+    disque et y reporte ses propres modifications (voir _fusionner_disque) au lieu de l'écraser.
+
+    Attributes:
+        identifiant (str): Identifiant de l'utilisateur.
+        cle_cryptage (int): Clé de chiffrement de son fichier personnel.
+        nom (str): Nom de l'utilisateur.
+        lst_cpt (list): Liste des comptes.
+        lst_ope (list | HistoriqueOperations): Liste des opérations (voir modeles.Operation), toujours triée chronologiquement.
+        index (IndexOperations | HistoriqueOperations): Index des opérations par compte et par date
+                                                        (lst_ope en fait partie, ou en est l'historique).
+        lst_bud (list): Liste des budgets (voir modeles.Budget).
+        dict_soldes (dict): Solde de chaque compte en centimes, toutes opérations confondues.
+        dict_soldes_passes (dict): Solde de chaque compte en centimes, opérations passées uniquement.
+        cube_depenses (dict | None): Dépenses par budget et par mois (voir budgets.calcul_cube_depenses),
+                                     None tant qu'il n'a pas été calculé (ou pour un historique paresseux).
+        points_reprise (PointsReprise | None): Soldes de fin de mois des opérations du fichier,
+                                               None tant qu'ils n'ont pas été lus ou calculés.
+        symboles (TableSymboles): Table des libellés de l'utilisateur : comptes, budgets et opérations
+                                  (y compris celles ajoutées pendant la session) en partagent les exemplaires.
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
+        format_fichier (str): Format dans lequel le fichier complet est réécrit (FORMAT_TEXTE ou FORMAT_BINAIRE).
+        version_fichier (int): Version des données du fichier sur lequel repose la session
+                               (voir utils.lire_version_fichier).
+        nb_ecritures (int): Nombre d'enregistrements effectivement écrits sur le disque.
+        nb_ecritures_evitees (int): Nombre d'enregistrements demandés mais évités ou regroupés.
+    """
+
+    def __init__(self, identifiant: str, cle_cryptage: int, nom: str,
+                 lst_cpt: list, lst_ope: list, lst_bud: list,
+                 etat_journal: tuple = (None, None, 0, False), dossier_users: str = DOSSIER_USERS,
+                 format_fichier: str = FORMAT_FICHIER_USERS, points_reprise: PointsReprise = None,
+                 symboles: TableSymboles = None, version_fichier: int = 0):
+        self.identifiant = identifiant
+        self.cle_cryptage = cle_cryptage
+        self.nom = nom
+        self.dossier_users = dossier_users
+        self.format_fichier = format_fichier
+        self.version_fichier = version_fichier
+
+        if symboles is None:
+            symboles = lst_ope.symboles if isinstance(lst_ope, HistoriqueOperations) else TableSymboles()
+        self.symboles = symboles
+
+        self._dernier_enregistrement = float('-inf')
+        self.nb_ecritures = 0
+        self.nb_ecritures_evitees = 0
+
+        self._initialiser(lst_cpt, lst_ope, lst_bud, etat_journal, points_reprise)
+
+    def _initialiser(self, lst_cpt: list, lst_ope: list, lst_bud: list, etat_journal: tuple,
+                     points_reprise: PointsReprise) -> None:
+        """Installe les données chargées (voir __init__) et calcule les soldes ; aucune modification n'est en attente."""
+        self.lst_cpt = lst_cpt
+        self.lst_bud = lst_bud
+        for compte in lst_cpt:
+            self.symboles.symbole(compte)
+        for budget in lst_bud:
+            self.symboles.symbole(budget.nom)
+            self.symboles.symbole(budget.compte)
+
+        # État du journal : hash du fichier, dernier hash de la chaîne, nombre d'entrées et chaîne rompue
+        # (un ajout à la suite d'une entrée invalide ne serait jamais relu : le journal sera compacté)
+        self.hash_fichier, self.hash_journal, self.nb_entrees_journal, self._journal_rompu = etat_journal
+        self._ope_a_journaliser = []
+
+        # Suivi des modifications non encore enregistrées
+        self._comptes_modifies = False
+        self._budgets_modifies = False
+        self._photographier_budgets()
+
+        self.cube_depenses = None
+        self.points_reprise = None
+        self._ope_hors_points = []      # opérations non couvertes par les points de reprise
+
+        if isinstance(lst_ope, HistoriqueOperations):
+            # Historique paresseux : soldes repris du point de reprise, puis opérations ajoutées en mémoire
+            self.index = self.lst_ope = lst_ope
+            if len(lst_ope.points_reprise) or len(lst_ope) == len(lst_ope.ajouts):
+                self.points_reprise = lst_ope.points_reprise
+            self._ope_hors_points = list(lst_ope.ajouts)
+            self.dict_soldes = dict.fromkeys(lst_cpt, 0) | lst_ope.soldes
+            self.dict_soldes_passes = dict.fromkeys(lst_cpt, 0) | lst_ope.soldes_passes
+            for operation in lst_ope.ajouts:
+                self._appliquer(operation)
+            return
+
+        # Les opérations du journal sont à la suite de celles du fichier (voir import_donnees_utilisateur)
+        nb_ope_journal = self.nb_entrees_journal
+        ope_journal = lst_ope[len(lst_ope) - nb_ope_journal:] if nb_ope_journal else []
+        self.index = IndexOperations(lst_ope)
+        self.lst_ope = self.index.operations
+
+        # Points de reprise inutilisables s'ils sont absents d'un fichier qui contient des opérations
+        if points_reprise is not None and (len(points_reprise) or len(lst_ope) == nb_ope_journal):
+            # Soldes repris des derniers points de reprise, complétés par les seules opérations du journal
+            self.points_reprise = points_reprise
+            self._ope_hors_points = list(ope_journal)
+            soldes, soldes_passes = points_reprise.soldes_finaux()
+            self.dict_soldes = dict.fromkeys(lst_cpt, 0) | soldes
+            self.dict_soldes_passes = dict.fromkeys(lst_cpt, 0) | soldes_passes
+            for operation in ope_journal:
+                self._appliquer(operation)
+        else:
+            # Calcul initial des soldes en une seule passe sur les opérations
+            self.dict_soldes = dict.fromkeys(lst_cpt, 0)
+            self.dict_soldes_passes = dict.fromkeys(lst_cpt, 0)
+            for operation in self.lst_ope:
+                self._appliquer(operation)
+
+    @classmethod
+    @chronometre('session.charger')
+    def charger(cls, identifiant: str, dossier_users: str = DOSSIER_USERS) -> 'SessionUtilisateur':
+        """
+        Ouvre la session d'un utilisateur à partir de son fichier personnel puis de son journal d'opérations.
+
+        Un fichier au format texte est ouvert comme historique paresseux (voir historique.ouvrir_historique) :
+        seuls les comptes, les budgets et les soldes sont lus. Un fichier au format binaire est chargé
+        en entier (une seule lecture) et reste au format binaire.
+
+        Args:
+            identifiant (str): Identifiant de l'utilisateur connecté.
+            dossier_users (str): Dossier contenant les fichiers utilisateurs.
+
+        Returns:
+            SessionUtilisateur: La session initialisée avec les données de l'utilisateur.
+        """
+        _, nom, cle_cryptage = dict_ident[identifiant]
+        # Verrou de lecture : le fichier et le journal ne sont pas réécrits par une autre session pendant la lecture
+        with VerrouUtilisateur(identifiant, dossier_users, exclusif=False):
+            return cls._lire(identifiant, nom, cle_cryptage, dossier_users)
+
+    @classmethod
+    def _lire(cls, identifiant: str, nom: str, cle_cryptage: int, dossier_users: str) -> 'SessionUtilisateur':
+        """Lit les fichiers de l'utilisateur et ouvre sa session (voir charger, qui tient le verrou de lecture)."""
+        version_fichier = lire_version_fichier(identifiant, cle_cryptage, dossier_users)
+        binaire = est_au_format_binaire(identifiant, dossier_users)
+        historique = None if binaire else ouvrir_historique(os.path.join(dossier_users, f"{identifiant}.txt"),
+                                                            cle_cryptage)
+        if historique is not None:
+            ope_journal, hash_journal, nb_entrees, journal_rompu = import_journal(
+                chemin_journal(identifiant, dossier_users), cle_cryptage, hash_ancre=historique.hash,
+                symboles=historique.symboles)
+            for operation in ope_journal:
+                historique.append(operation)
+            return cls(identifiant, cle_cryptage, nom, historique.comptes, historique, historique.budgets,
+                       etat_journal=(historique.hash, hash_journal, nb_entrees, journal_rompu),
+                       dossier_users=dossier_users,
+                       version_fichier=version_fichier)
+
+        # Fichier binaire, ou fichier texte altéré (l'erreur est alors signalée par import_donnees_utilisateur)
+        points_reprise = PointsReprise()
+        symboles = TableSymboles()
+        lst_cpt, lst_ope, lst_bud, etat_journal = import_donnees_utilisateur(identifiant, cle_cryptage,
+                                                                             dossier_users=dossier_users,
+                                                                             points_reprise=points_reprise,
+                                                                             symboles=symboles)
+        return cls(identifiant, cle_cryptage, nom, lst_cpt, lst_ope, lst_bud,
+                   etat_journal=etat_journal, dossier_users=dossier_users, points_reprise=points_reprise,
+                   format_fichier=FORMAT_BINAIRE if binaire else FORMAT_FICHIER_USERS, symboles=symboles,
+                   version_fichier=version_fichier)
+
+    def _appliquer(self, operation: Operation) -> None:
+        """Répercute le montant d'une opération sur les soldes de son compte et sur les dépenses de son budget."""
+        compte = operation.compte
+        montant = operation.montant
+        # get(..., 0) évite une erreur si une opération concerne un compte non listé
+        self.dict_soldes[compte] = self.dict_soldes.get(compte, 0) + montant
+        if operation.passee:
+            self.dict_soldes_passes[compte] = self.dict_soldes_passes.get(compte, 0) + montant
+        if self.cube_depenses is not None:
+            maj_cube_depenses(self.cube_depenses, operation)
+
+    def solde(self, compte: str, passees_seulement: bool = False) -> int:
+        """
+        Renvoie le solde d'un compte sans reparcourir les opérations.
+
+        Args:
+            compte (str): Nom du compte.
+            passees_seulement (bool): Si True, ne tient compte que des opérations passées.
+
+        Returns:
+            int: Solde du compte en centimes (0 si le compte n'a aucune opération).
+        """
+        soldes = self.dict_soldes_passes if passees_seulement else self.dict_soldes
+        return soldes.get(compte, 0)
+
+    def solde_au(self, compte: str, date: datetime.date, passees_seulement: bool = False) -> int:
+        """
+        Renvoie le solde d'un compte à la fin d'une journée donnée.
+
+        Le solde part du point de reprise de la fin du mois précédent (recherche dichotomique), auquel
+        s'ajoutent les seules opérations du mois jusqu'à la date, et les opérations ajoutées depuis
+        l'écriture des points de reprise (journal, session en cours) datées d'avant ce mois.
+        Sans points de reprise dans le fichier, ils sont calculés une fois, à la première demande.
+
+        Args:
+            compte (str): Nom du compte.
+            date (datetime.date): Date (incluse) à laquelle le solde est demandé.
+            passees_seulement (bool): Si True, ne tient compte que des opérations passées.
+
+        Returns:
+            int: Solde du compte en centimes à cette date.
+        """
+        if self.points_reprise is None:
+            self.points_reprise = PointsReprise.calculer(self.lst_ope)
+            self._ope_hors_points = []
+
+        debut_mois = date.replace(day=1)
+        solde = self.points_reprise.solde_avant(compte, date, passees_seulement=passees_seulement)
+        # Les opérations du mois sont toutes prises dans l'index : les autres, seulement avant le mois
+        operations = chain((operation for operation in self._ope_hors_points
+                            if operation.compte == compte and operation.date < debut_mois),
+                           self.index.plage(compte, debut_mois, date))
+        return solde + sum(operation.montant for operation in operations
+                           if operation.passee or not passees_seulement)
+
+    def rapport_budget(self, budget: list, date_reference: datetime.date) -> float:
+        """
+        Calcule le rapport dépenses / montant d'un budget pour un mois (voir budgets.rapport_bud_depenses).
+
+        Le total est lu dans le cube des dépenses (calculé au premier rapport) ; pour un historique
+        paresseux, seules les opérations du mois sont décodées.
+
+        Args:
+            budget (list): [libellé (str), montant en centimes (int), compte associé (str)]
+            date_reference (datetime.date): Date contenant le mois et l'année du rapport (jour ignoré).
+
+        Returns:
+            float: Le rapport entre les dépenses et le budget (ex : 0.75 pour 75%).
+        """
+        if self.cube_depenses is None and isinstance(self.index, IndexOperations):
+            # Premier rapport : le cube est calculé en une passe, puis tenu à jour à chaque ajout
+            self.cube_depenses = calcul_cube_depenses(self.lst_ope)
+        if self.cube_depenses is not None:
+            return rapport_bud_depenses(budget, self.lst_ope, date_reference, cube=self.cube_depenses)
+        debut = date_reference.replace(day=1)
+        fin = debut.replace(day=calendar.monthrange(debut.year, debut.month)[1])
+        return rapport_bud_depenses(budget, self.index.plage(None, debut, fin), date_reference)
+
+    def ajouter_compte(self, nom: str) -> bool:
+        """
+        Ajoute un compte à l'utilisateur (voir ajout_compte) et initialise ses soldes.
+
+        Args:
+            nom (str): Nom du nouveau compte.
+
+        Returns:
+            bool: True si le compte a été ajouté, False s'il existait déjà.
+        """
+        if not ajout_compte(self.lst_cpt, nom):
+            return False
+        nouveau_compte = self.lst_cpt[-1] = self.symboles.symbole(self.lst_cpt[-1])
+        self.dict_soldes.setdefault(nouveau_compte, 0)
+        self.dict_soldes_passes.setdefault(nouveau_compte, 0)
+        self._comptes_modifies = True
+        return True
+
+    def ajouter_operation(self, operation: Operation) -> None:
+        """
+        Ajoute une opération (voir ajout_operation) à sa place chronologique dans l'index,
+        et met à jour les soldes du compte concerné.
+
+        Args:
+            operation (Operation | tuple): L'opération (un tuple de ses 7 champs est converti).
+
+        Returns:
+            None
+
+        Raises:
+            TypeError: Si l'opération n'a pas 7 champs du type attendu.
+        """
+        operation = self.symboles.operation(operation)
+        ajout_operation(self.index, operation)
+        self._appliquer(operation)
+        self._ope_a_journaliser.append(operation)
+        self._ope_hors_points.append(operation)
+
+    def ajouter_virement(self, virement: tuple) -> None:
+        """
+        Enregistre un virement entre deux comptes (débit et crédit) et met à jour les soldes.
+
+        Args:
+            virement (tuple): (compte_emetteur (str), compte_beneficiaire (str), montant (int, en centimes))
+
+        Returns:
+            None
+        """
+        for operation in operations_virement(virement):
+            self.ajouter_operation(operation)
+
+    def ajouter_budget(self, budget: Budget) -> None:
+        """
+        Ajoute un budget à l'utilisateur (voir ajout_budget).
+
+        Args:
+            budget (Budget | list): Le budget (une liste [libellé, montant en centimes, compte] est convertie).
+
+        Returns:
+            None
+
+        Raises:
+            TypeError: Si le budget n'a pas 3 champs du type attendu.
+        """
+        if not isinstance(budget, Budget):
+            budget = Budget(*budget)
+        budget.nom = self.symboles.symbole(budget.nom)
+        budget.compte = self.symboles.symbole(budget.compte)
+        ajout_budget(self.lst_bud, budget)
+        self._budgets_modifies = True
+
+    def marquer_budgets_modifies(self) -> None:
+        """Signale que des budgets ont été modifiés sur place (ex : via modifier_budget)."""
+        self._budgets_modifies = True
+
+    def _photographier_budgets(self) -> None:
+        """
+        Retient l'état enregistré de chaque budget ([nom, montant, compte]) : un budget modifié ou renommé
+        sur place depuis s'en distingue, un budget créé depuis n'y figure pas (voir _fusionner_budgets).
+        """
+        # id -> (budget, état enregistré) : le budget est gardé avec son état pour que son id reste le sien
+        self._budgets_enregistres = {id(budget): (budget, budget.en_liste()) for budget in self.lst_bud}
+
+    def _rouvrir_historique(self, lst_ope: list, ajouts) -> None:
+        """
+        Rouvre l'historique paresseux après une réécriture (réussie ou non) du fichier utilisateur.
+
+        Args:
+            lst_ope (list): Toutes les opérations de la session, décodées avant la réécriture.
+            ajouts (iterable): Opérations absentes du fichier (à conserver en mémoire).
+
+        Returns:
+            None
+        """
+        historique = ouvrir_historique(os.path.join(self.dossier_users, f"{self.identifiant}.txt"), self.cle_cryptage,
+                                       self.symboles)
+        if historique is None:
+            # Fichier illisible ou enregistré dans un autre format : les opérations restent en mémoire
+            self.index = IndexOperations(lst_ope)
+            self.lst_ope = self.index.operations
+            return
+        for operation in ajouts:
+            historique.append(operation)
+        self.index = self.lst_ope = historique
+
+    @property
+    def est_modifiee(self) -> bool:
+        """True si des comptes, opérations ou budgets n'ont pas encore été enregistrés."""
+        return self._comptes_modifies or self._budgets_modifies or bool(self._ope_a_journaliser)
+
+    def enregistrer(self, forcer: bool = False) -> bool:
+        """
+        Enregistre les modifications de la session, uniquement s'il y en a.
+
+        Si seules des opérations ont été ajoutées, elles sont ajoutées au journal de l'utilisateur.
+        Le fichier complet est réécrit (et le journal compacté) si un compte ou un budget a changé,
+        si le fichier n'a pas encore de hash valide, si la chaîne du journal est rompue (entrée invalide,
+        voir import_donnees.import_journal) ou si le journal devient trop long.
+        Sans forcer, un enregistrement demandé moins de DELAI_ENREGISTREMENT secondes après le
+        précédent est reporté : les modifications seront écrites avec les suivantes.
+
+        L'écriture se fait sous le verrou d'écriture de l'utilisateur ; si une autre session a écrit
+        depuis le chargement, ses données sont d'abord relues et fusionnées (voir _fusionner_disque).
+
+        Args:
+            forcer (bool): Si True, écrit immédiatement les modifications en attente (ex : sortie d'un menu).
+
+        Returns:
+            bool: True si des données ont été écrites, False si l'écriture a été évitée ou reportée.
+        """
+        if not self.est_modifiee or (
+                not forcer and time.monotonic() - self._dernier_enregistrement < DELAI_ENREGISTREMENT):
+            self.nb_ecritures_evitees += 1
+            return False
+
+        with VerrouUtilisateur(self.identifiant, self.dossier_users):
+            if not self._est_a_jour() and not self._fusionner_disque():
+                return False
+            if not self._ecrire():
+                return False
+
+        self._ope_a_journaliser.clear()
+        self._dernier_enregistrement = time.monotonic()
+        self.nb_ecritures += 1
+        return True
+
+    def _ecrire(self) -> bool:
+        """Écrit les modifications (journal ou fichier complet, voir enregistrer) ; le verrou d'écriture est tenu."""
+        compaction = self.nb_entrees_journal + len(self._ope_a_journaliser) >= SEUIL_COMPACTION_JOURNAL
+        if (self._comptes_modifies or self._budgets_modifies or compaction or self._journal_rompu
+                or self.hash_fichier is None):
+            historique = self.lst_ope if isinstance(self.lst_ope, HistoriqueOperations) else None
+            lst_ope = self.lst_ope
+            if historique is not None:
+                # Le fichier va être remplacé : l'historique est décodé en entier puis libéré avant l'écriture
+                lst_ope = list(historique)
+                historique.fermer()
+            points_reprise = PointsReprise.calculer(lst_ope)
+            hash_fichier = enregistrement_modif(self.lst_cpt, lst_ope, self.lst_bud,
+                                                self.identifiant, self.cle_cryptage,
+                                                dossier_users=self.dossier_users,
+                                                format_fichier=self.format_fichier,
+                                                points_reprise=points_reprise,
+                                                version=self.version_fichier + 1)
+            if historique is not None:
+                self._rouvrir_historique(lst_ope, historique.ajouts if hash_fichier is None else ())
+            if hash_fichier is None:
+                return False
+            self.points_reprise = points_reprise
+            self._ope_hors_points = []
+            self.hash_fichier = self.hash_journal = hash_fichier
+            self.version_fichier += 1
+            self.nb_entrees_journal = 0
+            self._journal_rompu = False
+            self._comptes_modifies = self._budgets_modifies = False
+            self._photographier_budgets()
+        else:
+            hash_journal = ajout_journal(self._ope_a_journaliser, self.identifiant, self.cle_cryptage,
+                                         hash_precedent=self.hash_journal, dossier_users=self.dossier_users)
+            if hash_journal is None:
+                return False
+            self.hash_journal = hash_journal
+            self.nb_entrees_journal += len(self._ope_a_journaliser)
+        return True
+
+    def _est_a_jour(self) -> bool:
+        """True si le fichier et le journal sont toujours ceux chargés (ou écrits) par cette session."""
+        return (lire_version_fichier(self.identifiant, self.cle_cryptage, self.dossier_users) == self.version_fichier
+                and compter_entrees_journal(self.identifiant, self.dossier_users) == self.nb_entrees_journal)
+
+    def _fusionner_disque(self) -> bool:
+        """
+        Relit les données écrites par une autre session, puis y reporte les modifications de celle-ci.
+
+        - comptes : ceux du disque, suivis de ceux créés par cette session ;
+        - budgets : ceux du disque, où seuls les budgets créés, modifiés ou renommés par cette session
+          sont reportés (voir _fusionner_budgets) ;
+        - opérations : celles du disque (fichier et journal), suivies de celles non encore enregistrées.
+        Les modifications qui diffèrent du disque restent à enregistrer. Les opérations sont ensuite
+        gardées en mémoire, même si elles étaient un historique paresseux.
+
+        Returns:
+            bool: True si la fusion a été faite, False si les données du disque sont illisibles
+                  (les modifications restent alors en attente, pour un prochain enregistrement).
+        """
+        points_reprise = PointsReprise()
+        lst_cpt, lst_ope, lst_bud, etat_journal = import_donnees_utilisateur(self.identifiant, self.cle_cryptage,
+                                                                             dossier_users=self.dossier_users,
+                                                                             points_reprise=points_reprise,
+                                                                             symboles=self.symboles)
+        version_fichier = lire_version_fichier(self.identifiant, self.cle_cryptage, self.dossier_users)
+        if etat_journal[0] is None and version_fichier:
+            # Un fichier versionné existe mais n'a pas pu être relu : l'écraser perdrait les données d'une autre session
+            print("Enregistrement reporté : le fichier a été modifié par une autre session et n'a pas pu être relu.")
+            return False
+
+        comptes = lst_cpt + [compte for compte in self.lst_cpt if compte not in lst_cpt]
+        budgets, budgets_reportes = self._fusionner_budgets(lst_bud)
+        ope_en_attente = self._ope_a_journaliser
+
+        if isinstance(self.lst_ope, HistoriqueOperations):
+            self.lst_ope.fermer()
+        self._initialiser(comptes, lst_ope, budgets, etat_journal, points_reprise)
+        self.version_fichier = version_fichier
+        self._comptes_modifies = comptes != lst_cpt
+        self._budgets_modifies = budgets != lst_bud
+        # Les budgets reportés restent à enregistrer : ils sont comparés à leur état de référence
+        for identite, (budget, reference) in budgets_reportes.items():
+            if reference is None:
+                del self._budgets_enregistres[identite]
+            else:
+                self._budgets_enregistres[identite] = (budget, reference)
+        for operation in ope_en_attente:
+            self.ajouter_operation(operation)
+        return True
+
+    def _fusionner_budgets(self, lst_bud_disque: list) -> tuple:
+        """
+        Reporte dans les budgets relus sur le disque ceux que cette session a créés, modifiés ou renommés.
+
+        Seuls les champs modifiés par cette session (nom, montant, compte) sont reportés sur le budget du
+        disque qui porte le nom d'origine ; si ce nom n'y est plus, le budget est ajouté. Un budget créé
+        remplace celui du disque de même nom, ou s'y ajoute. Les budgets que cette session n'a pas
+        touchés gardent la version du disque, même s'ils y ont changé.
+
+        Args:
+            lst_bud_disque (list): Budgets relus sur le disque.
+
+        Returns:
+            tuple: (budgets fusionnés, {id: (budget fusionné, état de référence, None pour un budget créé)}
+                    pour chacun des budgets reportés, qui restent à enregistrer)
+        """
+        budgets = list(lst_bud_disque)
+        rangs = {budget.nom: rang for rang, budget in enumerate(budgets)}
+        reportes = {}
+        for budget in self.lst_bud:
+            entree = self._budgets_enregistres.get(id(budget))
+            if entree is None:
+                rang = rangs.get(budget.nom)
+                fusion, reference = budget, None
+            else:
+                origine = entree[1]
+                if budget == origine:
+                    continue
+                rang = rangs.get(origine[IDX_BUD_NOM])
+                if rang is None:
+                    fusion, reference = budget, origine
+                else:
+                    # Champs modifiés par cette session, appliqués au budget tel qu'il est sur le disque
+                    reference = budgets[rang].en_liste()
+                    fusion = Budget(*(local if local != avant else disque
+                                      for local, avant, disque in zip(budget.en_liste(), origine, reference)))
+            if rang is None:
+                budgets.append(fusion)
+            else:
+                budgets[rang] = fusion
+            reportes[id(fusion)] = (fusion, reference)
+        return budgets, reportes
@@ -7,11 +7,12 @@
 #   |--------------------------------------------|   #
 # --Imports-- #
 import datetime
-from import_donnees import import_idents
+from index_idents import IndexIdentifiants
 
 # --Constantes-- #
 # --Variables-- #
-dict_ident = import_idents(chemin_fichier='./ident.txt')
+# Index des identifiants : rien n'est lu avant la première recherche (voir IndexIdentifiants)
+dict_ident = IndexIdentifiants(chemin_ident='./ident.txt')
 
 
 # --Fonctions-- #
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#   symboles.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |----Table des libellés d'un utilisateur-----|   #
+#   |--------------------------------------------|   #
+# Les comptes, modes de paiement, budgets et libellés se répètent d'une opération à l'autre.
+# Une table de symboles en garde un seul exemplaire (str) par libellé, partagé par toutes les
+# opérations de l'utilisateur, et peut associer à chaque libellé un petit entier (codage par
+# dictionnaire, pour les stockages en colonnes ou binaires).
+# Deux exemplaires identiques sont comparés par Python sans lire leurs caractères (test d'identité) :
+# tant que les libellés comparés proviennent de la même table, les comparaisons des boucles de calcul
+# (soldes, affichage, budgets) coûtent autant qu'une comparaison d'entiers.
+# --Imports-- #
+from modeles import Operation
+
+
+# --Classes-- #
+class TableSymboles:
+    """
+    Table des libellés d'un utilisateur : un exemplaire partagé et, sur demande, un code par libellé.
+
+    Attributes:
+        exemplaires (dict): Libellé -> son exemplaire partagé (le premier rencontré).
+        codes (dict): Libellé -> code entier (attribué par coder, à partir de 0).
+        libelles (list): Exemplaire de chaque libellé codé, par code.
+    """
+
+    def __init__(self):
+        self.exemplaires = {}
+        self.codes = {}
+        self.libelles = []
+
+    def __len__(self) -> int:
+        return len(self.exemplaires)
+
+    def __contains__(self, libelle: str) -> bool:
+        return libelle in self.exemplaires
+
+    def symbole(self, libelle: str) -> str:
+        """Renvoie l'exemplaire partagé d'un libellé (enregistré s'il est nouveau)."""
+        return self.exemplaires.setdefault(libelle, libelle)
+
+    def coder(self, libelle: str) -> int:
+        """Renvoie le code d'un libellé, en attribuant le suivant s'il n'en a pas encore."""
+        code = self.codes.get(libelle)
+        if code is None:
+            code = self.codes[libelle] = len(self.libelles)
+            self.libelles.append(self.exemplaires.setdefault(libelle, libelle))
+        return code
+
+    def libelle(self, code: int) -> str:
+        """Renvoie le libellé d'un code (voir coder)."""
+        return self.libelles[code]
+
+    def operation(self, operation: Operation) -> Operation:
+        """
+        Renvoie une opération dont le libellé, le compte, le mode et le budget sont les exemplaires de la table.
+
+        Args:
+            operation (Operation): Opération (ou tuple de ses 7 champs, converti et vérifié).
+
+        Returns:
+            Operation: L'opération, avec les mêmes valeurs.
+
+        Raises:
+            TypeError: Si un champ n'est pas du type attendu (voir modeles.Operation).
+        """
+        if not isinstance(operation, Operation):
+            operation = Operation(*operation)
+        exemplaires = self.exemplaires
+        return Operation(operation.date, exemplaires.setdefault(operation.libelle, operation.libelle),
+                         exemplaires.setdefault(operation.compte, operation.compte), operation.montant,
+                         exemplaires.setdefault(operation.mode, operation.mode), operation.passee,
+                         exemplaires.setdefault(operation.budget, operation.budget))
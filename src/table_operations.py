@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#   table_operations.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |----Stockage en colonnes des opérations-----|   #
+#   |--------------------------------------------|   #
+# --Imports-- #
+import datetime
+import sys
+from array import array
+
+from modeles import Operation
+from symboles import TableSymboles
+
+try:
+    import numpy as np      # Optionnel : accélère les sommes sur de grands volumes
+except ImportError:
+    np = None
+
+
+# --Classes-- #
+class TableOperations:
+    """
+    Table d'opérations stockée en colonnes compactes, utilisable à la place d'une liste d'opérations.
+
+    Chaque champ d'une opération est rangé dans un tableau typé (module array) :
+        - date : nombre ordinal (entier 32 bits)
+        - montant : centimes (entier 64 bits)
+        - libellé, compte, mode, budget : code entier renvoyant à un libellé unique
+        - état : un bit par opération
+
+    Une opération occupe ainsi une vingtaine d'octets au lieu de plusieurs centaines pour un objet Operation.
+    L'accès par indice (table[i]) reconstruit l'Operation habituelle, ce qui permet de réutiliser les
+    fonctions existantes (ex : formatter_operation). Les sommes (soldes, dépenses) sont calculées
+    directement sur les colonnes, avec NumPy lorsqu'il est installé.
+    """
+
+    def __init__(self, lst_ope: list = ()):
+        self._dates = array('i')
+        self._montants = array('q')
+        self._libelles = array('I')
+        self._comptes = array('H')
+        self._modes = array('H')
+        self._budgets = array('H')
+        self._etats = bytearray()
+        self._dico_libelles = TableSymboles()
+        self._dico_comptes = TableSymboles()
+        self._dico_modes = TableSymboles()
+        self._dico_budgets = TableSymboles()
+        for operation in lst_ope:
+            self.append(operation)
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def __getitem__(self, i: int) -> Operation:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("indice d'opération hors limites")
+        return Operation(datetime.date.fromordinal(self._dates[i]),
+                         self._dico_libelles.libelles[self._libelles[i]],
+                         self._dico_comptes.libelles[self._comptes[i]],
+                         self._montants[i],
+                         self._dico_modes.libelles[self._modes[i]],
+                         self._etat(i),
+                         self._dico_budgets.libelles[self._budgets[i]])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _etat(self, i: int) -> bool:
+        return bool(self._etats[i >> 3] & (1 << (i & 7)))
+
+    def append(self, operation: Operation) -> None:
+        """
+        Ajoute une opération à la fin de la table.
+
+        Args:
+            operation (Operation): (date, libellé, compte, montant, mode_paiement, état, budget)
+
+        Returns:
+            None
+        """
+        i = len(self)
+        if i & 7 == 0:
+            self._etats.append(0)
+        if operation.passee:
+            self._etats[i >> 3] |= 1 << (i & 7)
+        self._dates.append(operation.date.toordinal())
+        self._montants.append(operation.montant)
+        self._libelles.append(self._dico_libelles.coder(operation.libelle))
+        self._comptes.append(self._dico_comptes.coder(operation.compte))
+        self._modes.append(self._dico_modes.coder(operation.mode))
+        self._budgets.append(self._dico_budgets.coder(operation.budget))
+
+    def _masque_etats(self):
+        """Renvoie l'état de chaque opération sous forme de tableau NumPy booléen."""
+        return np.unpackbits(np.frombuffer(bytes(self._etats), dtype=np.uint8),
+                             bitorder='little')[:len(self)].astype(bool)
+
+    def soldes(self, passees_seulement: bool = False) -> dict:
+        """
+        Calcule le solde de chaque compte présent dans la table, directement sur les colonnes.
+
+        Args:
+            passees_seulement (bool): Si True, ne tient compte que des opérations passées.
+
+        Returns:
+            dict: {compte (str): solde en centimes (int)}
+        """
+        comptes = self._dico_comptes.libelles
+        if np is not None:
+            montants = np.frombuffer(self._montants, dtype=np.int64)
+            codes = np.frombuffer(self._comptes, dtype=np.uint16)
+            if passees_seulement:
+                masque = self._masque_etats()
+                montants, codes = montants[masque], codes[masque]
+            totaux = np.zeros(len(comptes), dtype=np.int64)
+            np.add.at(totaux, codes, montants)
+            return {compte: int(total) for compte, total in zip(comptes, totaux)}
+
+        totaux = [0] * len(comptes)
+        if passees_seulement:
+            for i, (code, montant) in enumerate(zip(self._comptes, self._montants)):
+                if self._etats[i >> 3] & (1 << (i & 7)):
+                    totaux[code] += montant
+        else:
+            for code, montant in zip(self._comptes, self._montants):
+                totaux[code] += montant
+        return dict(zip(comptes, totaux))
+
+    def depenses_budget(self, nom_budget: str, annee: int, mois: int) -> int:
+        """
+        Calcule le total des dépenses (montants négatifs, en valeur absolue) d'un budget sur un mois.
+
+        Args:
+            nom_budget (str): Libellé du budget.
+            annee (int): Année du rapport.
+            mois (int): Mois du rapport (1 à 12).
+
+        Returns:
+            int: Total des dépenses du mois pour ce budget, en centimes.
+        """
+        code = self._dico_budgets.codes.get(nom_budget)
+        if code is None:
+            return 0
+        debut = datetime.date(annee, mois, 1).toordinal()
+        fin = (datetime.date(annee + mois // 12, mois % 12 + 1, 1)).toordinal()
+
+        if np is not None:
+            dates = np.frombuffer(self._dates, dtype=np.int32)
+            montants = np.frombuffer(self._montants, dtype=np.int64)
+            masque = ((np.frombuffer(self._budgets, dtype=np.uint16) == code)
+                      & (dates >= debut) & (dates < fin) & (montants < 0))
+            return -int(montants[masque].sum())
+
+        total = 0
+        for code_ope, date_ope, montant in zip(self._budgets, self._dates, self._montants):
+            if code_ope == code and debut <= date_ope < fin and montant < 0:
+                total -= montant
+        return total
+
+    def taille_memoire(self) -> int:
+        """Renvoie la mémoire occupée par les colonnes et les dictionnaires de libellés (en octets)."""
+        colonnes = (self._dates, self._montants, self._libelles, self._comptes,
+                    self._modes, self._budgets, self._etats)
+        dictionnaires = (self._dico_libelles, self._dico_comptes, self._dico_modes, self._dico_budgets)
+        return (sum(sys.getsizeof(colonne) for colonne in colonnes)
+                + sum(sys.getsizeof(dico.codes) + sys.getsizeof(dico.exemplaires) + sys.getsizeof(dico.libelles)
+                      + sum(sys.getsizeof(libelle) for libelle in dico.libelles)
+                      for dico in dictionnaires))
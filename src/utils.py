@@ -9,44 +9,202 @@
 import hashlib
 import os
 import shutil
-
-from constantes import IDX_OPE_DATE, IDX_OPE_LIB
+import tempfile
+
+from constantes import (
+    IDX_BUD_NOM,
+    IDX_BUD_MONTANT,
+    IDX_BUD_CPT,
+    DOSSIER_USERS,
+    TAILLE_BLOC_LECTURE,
+    FORMAT_BINAIRE,
+    FORMAT_FICHIER_USERS
+)
 from cryptage_decryptage import cryptage, decryptage
+from format_binaire import est_au_format_binaire, lire_version_binaire, serialiser_binaire
+from instrumentation import chronometre, compter, mesurer
+from modeles import Operation
+from montants import formater_montant
+from points_reprise import PointsReprise
 
 
 # --Constantes-- #
 
 
 # --Fonctions-- #
+def formater_ligne_operation(operation: Operation) -> str:
+    """
+    Convertit une opération en ligne texte 'OPE*date*libellé*compte*montant*mode*état*budget'.
+
+    Le montant (en centimes) est écrit en euros avec deux décimales (voir formater_montant).
+
+    Args:
+        operation (Operation): Opération à sérialiser.
+
+    Returns:
+        str: Ligne en clair (non chiffrée), sans saut de ligne.
+    """
+    date_str = operation.date.strftime('%d/%m/%Y')
+
+    # On construit une ligne texte de type 'OPE*date*libellé*...*budget'
+    return (f"OPE*{date_str}*{operation.libelle}*{operation.compte}"
+            f"*{formater_montant(operation.montant)}*{operation.mode}"
+            f"*{operation.passee}*{operation.budget}")
+
+
+def chemin_journal(identifiant: str, dossier_users: str = DOSSIER_USERS) -> str:
+    """
+    Renvoie le chemin du journal des opérations d'un utilisateur (users/journal/<identifiant>.jnl).
+
+    Args:
+        identifiant (str): Identifiant de l'utilisateur.
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
+
+    Returns:
+        str: Chemin du fichier journal.
+    """
+    return os.path.join(dossier_users, "journal", f"{identifiant}.jnl")
+
+
+def compter_entrees_journal(identifiant: str, dossier_users: str = DOSSIER_USERS) -> int:
+    """
+    Compte les entrées du journal d'un utilisateur (une par ligne), sans les décrypter ni les vérifier.
+
+    Une dernière ligne sans fin de ligne (écriture interrompue) compte pour une entrée.
+
+    Args:
+        identifiant (str): Identifiant de l'utilisateur.
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
+
+    Returns:
+        int: Nombre de lignes du journal, 0 s'il n'existe pas.
+    """
+    nb_lignes, dernier_bloc = 0, b''
+    try:
+        with open(chemin_journal(identifiant, dossier_users), 'rb') as journal:
+            for bloc in iter(lambda: journal.read(TAILLE_BLOC_LECTURE), b''):
+                nb_lignes += bloc.count(b'\n')
+                dernier_bloc = bloc
+    except FileNotFoundError:
+        return 0
+    return nb_lignes + (not dernier_bloc.endswith(b'\n') and dernier_bloc != b'')
+
+
+def hash_chaine(hash_precedent: str, ligne: str) -> str:
+    """
+    Calcule le maillon suivant de la chaîne de hash du journal.
+
+    Chaque entrée du journal est liée à la précédente (et la première au hash du fichier
+    utilisateur), ce qui permet de détecter toute entrée modifiée, supprimée ou réordonnée.
+
+    Args:
+        hash_precedent (str): Hash de l'entrée précédente (ou du fichier utilisateur pour la première).
+        ligne (str): Ligne en clair de l'entrée.
+
+    Returns:
+        str: Hash SHA-256 (hexadécimal) de l'entrée.
+    """
+    return hashlib.sha256(f"{hash_precedent}\n{ligne}".encode("utf-8")).hexdigest()
+
+
+@chronometre()
+def ajout_journal(
+    lst_ope: list,
+    identifiant: str,
+    cle_cryptage: int,
+    hash_precedent: str,
+    dossier_users: str = DOSSIER_USERS
+) -> str | None:
+    """
+    Ajoute des opérations à la fin du journal de l'utilisateur, sans réécrire son fichier.
+
+    Chaque opération est écrite sur une ligne chiffrée de la forme
+    'OPE*<date>*<libellé>*<compte>*<montant>*<mode>*<état>*<budget>*<hash_chainé>',
+    où le hash chaîné est calculé par hash_chaine à partir du hash de l'entrée précédente.
+    Le coût d'un enregistrement ne dépend donc que du nombre d'opérations ajoutées.
+
+    Args:
+        lst_ope (list): Opérations à ajouter au journal.
+        identifiant (str): Identifiant de l'utilisateur.
+        cle_cryptage (int): Clé utilisée pour chiffrer les lignes.
+        hash_precedent (str): Dernier hash de la chaîne (celui du fichier si le journal est vide).
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
+
+    Returns:
+        str | None: Nouveau dernier hash de la chaîne, ou None en cas d'erreur d'écriture.
+    """
+    chemin = chemin_journal(identifiant, dossier_users)
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+
+    lignes = []
+    for operation in lst_ope:
+        ligne = formater_ligne_operation(operation)
+        hash_precedent = hash_chaine(hash_precedent, ligne)
+        lignes.append(f"{ligne}*{hash_precedent}\n")
+
+    try:
+        with open(chemin, "a", encoding="utf-8") as journal:
+            journal.write(cryptage("".join(lignes), cle_cryptage))
+            journal.flush()
+            os.fsync(journal.fileno())
+    except OSError as e:
+        print(f"Erreur lors de l'écriture du journal : {e}")
+        return None
+
+    return hash_precedent
+
+
+@chronometre()
 def enregistrement_modif(
     lst_cpt: list,
     lst_ope: list,
     lst_bud: list,
     identifiant: int,
-    cle_cryptage: int
-) -> None:
+    cle_cryptage: int,
+    dossier_users: str = DOSSIER_USERS,
+    format_fichier: str = FORMAT_FICHIER_USERS,
+    points_reprise: PointsReprise = None,
+    version: int = 1
+) -> str | None:
     """
     Enregistre de façon sécurisée toutes les données de l'utilisateur dans un fichier chiffré,
     en créant une sauvegarde (.bak) et un fichier temporaire (.tmp) au préalable.
 
+    Le fichier temporaire a un nom unique : deux écritures simultanées ne partagent jamais le même.
+    Pour que plusieurs sessions d'un même utilisateur ne s'écrasent pas, l'appelant tient son verrou
+    d'écriture (voir verrou_utilisateur.py).
+
     Les lignes enregistrées suivent une convention :
+        - VER*<version> (version des données, voir lire_version_fichier)
         - CPT*<nom_du_compte>
         - OPE*<date>*<libellé>*<compte>*<montant>*<mode>*<état>*<budget>
         - BUD*<libellé>*<montant>*<compte>
+        - SOL*<compte>*<mm/aaaa>*<solde>*<solde_passe> (points de reprise des soldes, voir points_reprise.py)
         - HASH*<valeur_sha256> (ajouté automatiquement à la fin)
 
+    Au format binaire (voir format_binaire.py), les mêmes données sont écrites dans <identifiant>.bin
+    (sans les points de reprise : les opérations y sont chargées en entier).
+    Le fichier de l'autre format, s'il existe, est alors déplacé dans le dossier de sauvegarde :
+    un utilisateur n'a jamais qu'un seul fichier à jour.
+
+    Le fichier complet contenant toutes les opérations, l'éventuel journal de l'utilisateur
+    (voir ajout_journal) est supprimé une fois le fichier remplacé : c'est la compaction du journal.
+
     Args:
         lst_cpt (list): Liste des comptes utilisateur.
-        lst_ope (list): Liste des opérations utilisateur (tuples).
-        lst_bud (list): Liste des budgets utilisateur (listes).
+        lst_ope (list): Liste des opérations utilisateur (voir modeles.Operation).
+        lst_bud (list): Liste des budgets utilisateur (voir modeles.Budget).
         identifiant (int): Identifiant numérique de l'utilisateur (sert à nommer le fichier).
         cle_cryptage (int): Clé utilisée pour chiffrer le fichier.
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
+        format_fichier (str): FORMAT_TEXTE ou FORMAT_BINAIRE.
+        points_reprise (PointsReprise, optional): Points de reprise des opérations, s'ils sont déjà calculés.
+        version (int): Version des données écrite dans le fichier (celle du fichier remplacé + 1).
 
     Returns:
-        None
+        str | None: Hash du contenu enregistré (ligne 'HASH*'), ou None en cas d'erreur.
     """
     # Définition des dossiers et chemins de fichiers
-    dossier_users = "../users"
     dossier_temp = os.path.join(dossier_users, "temp")
     dossier_backup = os.path.join(dossier_users, "backup")
 
@@ -55,69 +213,189 @@ def enregistrement_modif(
     os.makedirs(dossier_backup, exist_ok=True)
 
     # Chemins complets des fichiers à manipuler
-    chemin_original = os.path.join(dossier_users, f"{identifiant}.txt")
-    chemin_temporaire = os.path.join(dossier_temp, f"{identifiant}.tmp")
-    chemin_backup = os.path.join(dossier_backup, f"{identifiant}.bak")
+    binaire = format_fichier == FORMAT_BINAIRE
+    extension, extension_autre = ('.bin', '.txt') if binaire else ('.txt', '.bin')
+    chemin_original = os.path.join(dossier_users, f"{identifiant}{extension}")
+    chemin_autre_format = os.path.join(dossier_users, f"{identifiant}{extension_autre}")
+    chemin_backup = os.path.join(dossier_backup, f"{identifiant}{extension}.bak" if binaire else f"{identifiant}.bak")
+    chemin_temporaire = None
 
     try:
-        lignes = []
+        if binaire:
+            contenu, hash_val = serialiser_binaire(lst_cpt, lst_ope, lst_bud, cle_cryptage, version)
+        else:
+            contenu, hash_val = _serialiser_texte(lst_cpt, lst_ope, lst_bud, cle_cryptage,
+                                                  points_reprise or PointsReprise.calculer(lst_ope), version)
+
+        # Écriture dans un fichier temporaire au nom unique (ex : temp/12345678.k3j9x_a1.tmp)
+        descripteur, chemin_temporaire = tempfile.mkstemp(
+            dir=dossier_temp, prefix=f"{identifiant}.", suffix=f"{extension}.tmp" if binaire else ".tmp")
+        with open(descripteur, "wb") as f:
+            f.write(contenu)
 
-        # Encodage des comptes
-        for compte in lst_cpt:
-            lignes.append(f"CPT*{compte}")
+        # Sauvegarde de l'ancien fichier si existant
+        if os.path.exists(chemin_original):
+            shutil.copy(chemin_original, chemin_backup)
 
-        # Encodage des opérations avec formatage de la date
-        for operation in lst_ope:
-            date_str = operation[IDX_OPE_DATE].strftime('%d/%m/%Y')
+        # Remplace le fichier utilisateur par le fichier temporaire (opération atomique)
+        os.replace(chemin_temporaire, chemin_original)
 
-            # On convertit tous les champs de l'opération (sauf la date) en texte
-            # afin de pouvoir les assembler proprement dans une ligne formatée
-            champs_op = [date_str] + list(map(str, operation[IDX_OPE_LIB:]))
+        # Changement de format : l'ancien fichier est mis de côté pour ne pas être relu à la place du nouveau
+        if os.path.exists(chemin_autre_format):
+            os.replace(chemin_autre_format, os.path.join(dossier_backup, f"{identifiant}{extension_autre}.bak"))
 
-            # On construit une ligne texte de type 'OPE*date*libellé*...*budget'
-            lignes.append("OPE*" + "*".join(champs_op))
+        # Les opérations du journal sont désormais incluses dans le fichier : il devient inutile
+        if os.path.exists(chemin_journal(identifiant, dossier_users)):
+            os.remove(chemin_journal(identifiant, dossier_users))
 
-        # Encodage des budgets
-        for budget in lst_bud:
-            # On transforme chaque budget en ligne texte formatée 'BUD*libellé*montant*compte'
-            lignes.append("BUD*" + "*".join(map(str, budget)))
+        return hash_val
 
-        # Regroupe toutes les lignes dans une chaîne unique
-        contenu_en_clair = "\n".join(lignes)
+    except Exception as e:
+        print(f"Erreur lors de l'enregistrement sécurisé : {e}")
 
-        # Calcul du hash du contenu clair (empreinte numérique)
-        hash_val = hashlib.sha256(contenu_en_clair.encode("utf-8")).hexdigest()
+        # Nettoyage du fichier temporaire en cas d'erreur
+        if chemin_temporaire is not None and os.path.exists(chemin_temporaire):
+            os.remove(chemin_temporaire)
+        return None
 
-        # Ajoute la ligne de hash à la fin (convention : "HASH*<valeur>")
-        contenu_complet = contenu_en_clair + f"\nHASH*{hash_val}"
 
-        # Chiffrement du contenu complet (avec la ligne de hash)
-        texte_chiffre = cryptage(contenu_complet, cle_cryptage)
+@chronometre()
+def _serialiser_texte(lst_cpt: list, lst_ope: list, lst_bud: list, cle_cryptage: int,
+                      points_reprise: PointsReprise, version: int = 1) -> tuple:
+    """
+    Construit le contenu chiffré d'un fichier utilisateur au format texte (voir enregistrement_modif).
 
-        # Écriture dans un fichier temporaire
-        with open(chemin_temporaire, "w", encoding="utf-8") as f:
-            f.write(texte_chiffre)
+    Args:
+        lst_cpt (list): Liste des comptes utilisateur.
+        lst_ope (list): Liste des opérations utilisateur (voir modeles.Operation).
+        lst_bud (list): Liste des budgets utilisateur (voir modeles.Budget).
+        cle_cryptage (int): Clé utilisée pour chiffrer le fichier.
+        points_reprise (PointsReprise): Points de reprise des soldes de ces opérations.
+        version (int): Version des données (ligne 'VER', la première du fichier).
 
-        # Sauvegarde de l'ancien fichier si existant
-        if os.path.exists(chemin_original):
-            shutil.copy(chemin_original, chemin_backup)
+    Returns:
+        tuple: (contenu chiffré encodé en UTF-8 (bytes), hash du contenu en clair (str))
+    """
+    # Version des données en tête de fichier : lue seule par lire_version_fichier, couverte par le hash
+    lignes = [f"VER*{version}"]
 
-        # Remplace le fichier utilisateur par le fichier temporaire (opération atomique)
-        os.replace(chemin_temporaire, chemin_original)
+    # Encodage des comptes
+    for compte in lst_cpt:
+        lignes.append(f"CPT*{compte}")
 
-    except Exception as e:
-        print(f"Erreur lors de l'enregistrement sécurisé : {e}")
+    # Encodage des opérations avec formatage de la date
+    for operation in lst_ope:
+        lignes.append(formater_ligne_operation(operation))
 
-        # Nettoyage du fichier temporaire en cas d'erreur
-        if os.path.exists(chemin_temporaire):
-            os.remove(chemin_temporaire)
+    # Encodage des budgets
+    for budget in lst_bud:
+        # On transforme chaque budget en ligne texte formatée 'BUD*libellé*montant*compte'
+        lignes.append(f"BUD*{budget[IDX_BUD_NOM]}*{formater_montant(budget[IDX_BUD_MONTANT])}"
+                      f"*{budget[IDX_BUD_CPT]}")
+
+    # Points de reprise des soldes, couverts eux aussi par le hash
+    lignes.extend(points_reprise.lignes())
+
+    # Regroupe toutes les lignes dans une chaîne unique
+    contenu_en_clair = "\n".join(lignes)
 
+    # Calcul du hash du contenu clair (empreinte numérique)
+    hash_val = hashlib.sha256(contenu_en_clair.encode("utf-8")).hexdigest()
 
+    # Ajoute la ligne de hash à la fin (convention : "HASH*<valeur>")
+    contenu_complet = contenu_en_clair + f"\nHASH*{hash_val}"
+
+    # Chiffrement du contenu complet (avec la ligne de hash)
+    texte_chiffre = cryptage(contenu_complet, cle_cryptage)
+
+    return texte_chiffre.encode("utf-8"), hash_val
+
+
+class LectureVerifiee:
+    """
+    Lecture en flux d'un fichier utilisateur chiffré, avec vérification de son intégrité au passage.
+
+    Le fichier est lu par blocs de taille_bloc caractères ; chaque bloc est décrypté puis découpé
+    en lignes, et chaque ligne est ajoutée au hash (hashlib.sha256().update) avant d'être produite.
+    Seule la dernière ligne non vide est retenue, jusqu'à ce qu'on sache si c'est la ligne 'HASH*'
+    finale : la mémoire utilisée ne dépend pas de la taille du fichier.
+
+    Les lignes sont produites avant que le hash ne soit vérifié : le résultat de la lecture ne doit
+    être utilisé qu'une fois le parcours terminé, si l'attribut valide vaut True.
+
+    Attributes:
+        valide (bool | None): True si le hash stocké correspond au contenu, False sinon,
+                              None tant que le fichier n'a pas été entièrement parcouru.
+        hash (str | None): Hash recalculé du contenu (hors ligne 'HASH*'), une fois le parcours terminé.
+    """
+
+    def __init__(self, chemin_fichier: str, cle: int, taille_bloc: int = TAILLE_BLOC_LECTURE):
+        self.chemin_fichier = chemin_fichier
+        self.cle = cle
+        self.taille_bloc = taille_bloc
+        self.valide = None
+        self.hash = None
+
+    def _blocs_de_lignes(self):
+        """Produit, bloc par bloc, les listes de lignes décryptées du fichier (la dernière sans son saut de ligne)."""
+        reste = ''
+        debut = True
+        with open(self.chemin_fichier, mode='r', encoding='utf-8') as fichier:
+            while bloc := fichier.read(self.taille_bloc):
+                compter('utils.caracteres_lus', len(bloc))
+                with mesurer('utils.decryptage'):
+                    bloc = decryptage(bloc, cle=self.cle)
+                if debut:
+                    # Équivalent du strip() en début de fichier
+                    bloc = bloc.lstrip()
+                    debut = not bloc
+                lignes = (reste + bloc).split('\n')
+                reste = lignes.pop()
+                yield lignes
+        yield [reste]
+
+    def __iter__(self):
+        empreinte = hashlib.sha256()
+        separateur = ''
+        en_attente = []     # dernière ligne non vide, suivie des lignes vides lues après elle
+
+        for lignes in self._blocs_de_lignes():
+            # Recherche de la dernière ligne non vide du bloc : elle est retenue avec les lignes qui la suivent
+            i = len(lignes) - 1
+            while i >= 0 and not lignes[i].strip():
+                i -= 1
+            if i < 0:
+                if en_attente:
+                    en_attente.extend(lignes)
+                continue
+
+            # Les lignes retenues jusqu'ici ne sont pas la fin du fichier : hash (en une fois) et production
+            a_produire = en_attente + lignes[:i]
+            if a_produire:
+                with mesurer('utils.hash'):
+                    empreinte.update((separateur + '\n'.join(a_produire)).encode('utf-8'))
+                separateur = '\n'
+                yield from a_produire
+            en_attente = lignes[i:]
+
+        # Équivalent du strip() en fin de fichier : la dernière ligne non vide doit être la ligne de hash
+        derniere = en_attente[0].rstrip() if en_attente else ''
+        if not derniere.startswith("HASH*"):
+            print("Ligne de hash manquante dans le fichier.")
+            self.valide = False
+            return
+        self.hash = empreinte.hexdigest()
+        self.valide = self.hash == derniere.split('*', 1)[1]
+
+
+@chronometre()
 def verifier_integrite_fichier(chemin_fichier: str, cle: int) -> bool:
     """
     Vérifie l'intégrité d'un fichier utilisateur chiffré en comparant le hash stocké
     avec le hash recalculé sur le contenu brut (hors ligne 'HASH*').
 
+    Le fichier est parcouru en flux (voir LectureVerifiee), sans jamais être chargé en entier.
+
     Args:
         chemin_fichier (str): Chemin du fichier à vérifier.
         cle (int): Clé de décryptage à utiliser.
@@ -126,30 +404,39 @@ def verifier_integrite_fichier(chemin_fichier: str, cle: int) -> bool:
         bool: True si le fichier est valide, False si modifié/corrompu.
     """
     try:
-        # Lecture du fichier chiffré
-        with open(chemin_fichier, mode='r', encoding='utf-8') as fichier:
-            contenu_chiffre = fichier.read()
+        lecture = LectureVerifiee(chemin_fichier, cle)
+        for _ in lecture:
+            pass
+        return bool(lecture.valide)
 
-        # Déchiffrement complet du fichier
-        contenu_clair = decryptage(contenu_chiffre, cle=cle).strip()
+    except Exception as e:
+        print(f"Erreur pendant la vérification d'intégrité : {e}")
+        return False
 
-        # Séparation des lignes
-        lignes = contenu_clair.split('\n')
 
-        # Vérification de la présence de la ligne HASH
-        if not lignes[-1].startswith("HASH*"):
-            print("Ligne de hash manquante dans le fichier.")
-            return False
-
-        # Extraction du hash stocké
-        hash_attendu = lignes[-1].split('*', 1)[1]
+def lire_version_fichier(identifiant: str, cle: int, dossier_users: str = DOSSIER_USERS) -> int:
+    """
+    Lit la version des données du fichier personnel d'un utilisateur, sans lire le reste du fichier.
 
-        # Recalcul du hash sur le contenu sans la ligne 'HASH*'
-        contenu_sans_hash = '\n'.join(lignes[:-1])
-        hash_recalcule = hashlib.sha256(contenu_sans_hash.encode("utf-8")).hexdigest()
+    La version est incrémentée à chaque réécriture du fichier (voir enregistrement_modif) : une session
+    qui a chargé la version n sait, si le fichier n'est plus à la version n, qu'une autre session l'a
+    réécrit depuis.
 
-        return hash_recalcule == hash_attendu
+    Args:
+        identifiant (str): Identifiant de l'utilisateur.
+        cle (int): Clé de décryptage de l'utilisateur.
+        dossier_users (str): Dossier contenant les fichiers utilisateurs.
 
-    except Exception as e:
-        print(f"Erreur pendant la vérification d'intégrité : {e}")
-        return False
+    Returns:
+        int: Version des données, 0 si le fichier est absent ou n'en contient pas (fichier antérieur).
+    """
+    if est_au_format_binaire(identifiant, dossier_users):
+        return lire_version_binaire(os.path.join(dossier_users, f"{identifiant}.bin"))
+    try:
+        with open(os.path.join(dossier_users, f"{identifiant}.txt"), 'r', encoding='utf-8') as fichier:
+            champs = decryptage(fichier.readline(), cle).strip().split('*')
+    except (OSError, UnicodeDecodeError):
+        return 0
+    if len(champs) == 2 and champs[0] == 'VER' and champs[1].isdigit():
+        return int(champs[1])
+    return 0
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#   verrou_utilisateur.py
+#   |--------------------------------------------|   #
+#   |--------Gestion de Banque (avec IHM)--------|   #
+#   |--Groupe 2 (MOUSSA, ASSEMAT, JIN, ZAMOURI)--|   #
+#   |---Verrou des fichiers d'un utilisateur-----|   #
+#   |--------------------------------------------|   #
+# Plusieurs sessions d'un même utilisateur (plusieurs instances de l'application, ou un serveur et
+# une application) peuvent lire et écrire ses fichiers en même temps. Un verrou consultatif, posé sur
+# users/verrous/<identifiant>.lock, sérialise leurs accès :
+#   - partagé pour lire le fichier et le journal (plusieurs lectures simultanées),
+#   - exclusif pour les écrire (vérification de la version, puis écriture).
+# Le verrou ne concerne qu'un utilisateur : les enregistrements de deux utilisateurs ne s'attendent jamais.
+# Sous Windows (msvcrt), il n'existe pas de verrou partagé : les lectures y sont aussi exclusives.
+# --Imports-- #
+import os
+
+from constantes import DOSSIER_USERS
+
+try:
+    import fcntl        # POSIX
+except ImportError:
+    fcntl = None
+    import msvcrt       # Windows
+
+
+# --Classes-- #
+class VerrouUtilisateur:
+    """
+    Verrou consultatif des fichiers d'un utilisateur : with VerrouUtilisateur(identifiant): ...
+
+    Le verrou est attaché au fichier ouvert : deux verrous ouverts séparément s'excluent, qu'ils
+    appartiennent à deux processus ou à deux threads du même processus. Il n'est pas réentrant.
+
+    Attributes:
+        chemin (str): Chemin du fichier de verrou (jamais supprimé : le supprimer pendant qu'un
+                      autre processus l'attend lui ferait verrouiller un fichier orphelin).
+        exclusif (bool): True pour un verrou d'écriture, False pour un verrou de lecture (partagé).
+    """
+
+    def __init__(self, identifiant: str, dossier_users: str = DOSSIER_USERS, exclusif: bool = True):
+        self.chemin = chemin_verrou(identifiant, dossier_users)
+        self.exclusif = exclusif
+        self._descripteur = None
+
+    def __enter__(self) -> 'VerrouUtilisateur':
+        os.makedirs(os.path.dirname(self.chemin), exist_ok=True)
+        self._descripteur = os.open(self.chemin, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._descripteur, fcntl.LOCK_EX if self.exclusif else fcntl.LOCK_SH)
+            else:
+                # LK_LOCK abandonne après une dizaine de secondes d'attente : on recommence jusqu'à l'obtenir
+                while True:
+                    try:
+                        msvcrt.locking(self._descripteur, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass
+        except BaseException:
+            os.close(self._descripteur)
+            self._descripteur = None
+            raise
+        return self
+
+    def __exit__(self, *exception):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._descripteur, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._descripteur, 0, os.SEEK_SET)
+                msvcrt.locking(self._descripteur, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._descripteur)
+            self._descripteur = None
+        return False
+
+
+# --Fonctions-- #
+def chemin_verrou(identifiant: str, dossier_users: str = DOSSIER_USERS) -> str:
+    """Renvoie le chemin du fichier de verrou d'un utilisateur (users/verrous/<identifiant>.lock)."""
+    return os.path.join(dossier_users, "verrous", f"{identifiant}.lock")